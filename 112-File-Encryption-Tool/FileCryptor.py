@@ -1,26 +1,14 @@
 import threading
+import multiprocessing
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, simpledialog
 import ttkbootstrap as tb
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.backends import default_backend
 import os
 import sys
-import base64
-
-# ===== Secure Key Derivation =====
-def derive_key(password: str, salt: bytes) -> bytes:
-    """Derive a Fernet key from a password using PBKDF2HMAC and salt."""
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=390_000,
-        backend=default_backend()
-    )
-    return base64.urlsafe_b64encode(kdf.derive(password.encode()))
+import time
+
+from crypto_engine import ALGORITHMS, Cancelled, encrypt_file, decrypt_file, output_path
+from batch_crypto import process_batch
 
 class FileEncryptor:
     def __init__(self, root):
@@ -53,6 +41,14 @@ class FileEncryptor:
                                    command=self.show_about_guide)
         self.about_btn.grid(row=0, column=4, padx=5)
 
+        # ===== Cipher =====
+        cipher_frame = tb.Frame(self.root)
+        cipher_frame.pack(pady=(0, 5))
+        tb.Label(cipher_frame, text="Cipher:").pack(side=tk.LEFT, padx=(0, 5))
+        self.algorithm = tk.StringVar(value="AES-256-GCM")
+        tb.Combobox(cipher_frame, textvariable=self.algorithm, values=list(ALGORITHMS),
+                    state="readonly", width=20).pack(side=tk.LEFT)
+
         # ===== Log area =====
         self.log_area = scrolledtext.ScrolledText(self.root, wrap=tk.WORD, font=("Arial", 12))
         self.log_area.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
@@ -88,10 +84,16 @@ class FileEncryptor:
         self.cancel_event.clear()
 
     # ===== Worker =====
-    def _process_worker(self, file_paths, password, encrypt=True):
-        total_files = len(file_paths)
-        step = 100 / total_files
-        current_progress = 0
+    def _process_worker(self, file_paths, password, encrypt=True, algorithm="AES-256-GCM"):
+        # Progress follows bytes, so one large file moves the bar as it streams
+        sizes = {path: os.path.getsize(path) for path in file_paths if os.path.isfile(path)}
+        total_bytes = max(1, sum(sizes.values()))
+        done_bytes = 0
+
+        def on_chunk(n):
+            nonlocal done_bytes
+            done_bytes += n
+            self.root.after(0, self._set_progress, done_bytes, total_bytes)
 
         for file_path in file_paths:
             if self.cancel_event.is_set():
@@ -100,39 +102,62 @@ class FileEncryptor:
                 return
 
             filename = os.path.basename(file_path)
+            start = done_bytes
+            started = time.perf_counter()
             try:
-                with open(file_path, "rb") as f:
-                    data = f.read()
-
+                out_file = output_path(file_path, encrypt)
                 if encrypt:
-                    salt = os.urandom(16)
-                    key = derive_key(password, salt)
-                    fernet = Fernet(key)
-                    encrypted = fernet.encrypt(data)
-                    out_file = file_path + ".enc"
-                    with open(out_file, "wb") as f:
-                        f.write(salt + encrypted)  # prepend salt
+                    encrypt_file(file_path, out_file, password, algorithm,
+                                 progress=on_chunk, cancel=self.cancel_event.is_set)
                 else:
-                    salt = data[:16]
-                    encrypted_data = data[16:]
-                    key = derive_key(password, salt)
-                    fernet = Fernet(key)
-                    decrypted = fernet.decrypt(encrypted_data)
-                    out_file = file_path[:-4] if file_path.endswith(".enc") else file_path + ".dec"
-                    with open(out_file, "wb") as f:
-                        f.write(decrypted)
+                    decrypt_file(file_path, out_file, password,
+                                 progress=on_chunk, cancel=self.cancel_event.is_set)
 
-                self._log(f"{'Encrypted' if encrypt else 'Decrypted'}: {filename}")
+                elapsed = max(time.perf_counter() - started, 1e-6)
+                self._log(f"{'Encrypted' if encrypt else 'Decrypted'}: {filename} "
+                          f"({sizes.get(file_path, 0) / elapsed / 1e6:.1f} MB/s)")
 
+            except Cancelled:
+                continue  # Partial output is removed; the check above ends the run
             except Exception as e:
                 self._log(f"Error processing {filename}: {str(e)}")
 
-            current_progress += step
-            self.root.after(0, self.progress.step, step)
+            done_bytes = start + sizes.get(file_path, 0)
+            self.root.after(0, self._set_progress, done_bytes, total_bytes)
 
         self.root.after(0, self._reset_ui)
         self._log("Process completed.")
 
+    def _batch_worker(self, file_paths, password, encrypt=True, algorithm="AES-256-GCM"):
+        """Several files: one KDF for the whole batch, files spread over a process pool"""
+        verb = "Encrypted" if encrypt else "Decrypted"
+
+        def on_file(stats, path, error):
+            filename = os.path.basename(path)
+            self._log(f"Error processing {filename}: {error}" if error else f"{verb}: {filename}")
+            self.root.after(0, self._set_batch_progress, stats)
+
+        try:
+            stats = process_batch(list(file_paths), password, encrypt, algorithm,
+                                  progress=on_file, cancel=self.cancel_event.is_set)
+        except Exception as e:
+            self._log(f"Batch failed: {e}")
+        else:
+            self._log(f"{'Process cancelled' if stats['cancelled'] else 'Process completed'}: "
+                      f"{stats['files'] - stats['failed']} file(s) {verb.lower()}, {stats['failed']} failed, "
+                      f"{stats['bytes'] / 1e6:.1f} MB in {stats['seconds']:.1f}s "
+                      f"({stats['mb_per_s']:.1f} MB/s, {stats['files_per_s']:.1f} files/s)")
+        self.root.after(0, self._reset_ui)
+
+    def _set_batch_progress(self, stats):
+        self.progress["value"] = 100 * stats["files"] / max(1, stats["total_files"])
+        self.progress_label.config(text=f"{stats['files']}/{stats['total_files']} files · "
+                                        f"{stats['mb_per_s']:.1f} MB/s · {stats['files_per_s']:.1f} files/s")
+
+    def _set_progress(self, done, total):
+        self.progress["value"] = 100 * done / total
+        self.progress_label.config(text=f"{done / 1e6:.1f} / {total / 1e6:.1f} MB")
+
     # ===== Start =====
     def start_process(self, encrypt=True):
         action = "Encrypt" if encrypt else "Decrypt"
@@ -152,7 +177,9 @@ class FileEncryptor:
         self.progress_label.config(text="Preparing...")
         self.progress["value"] = 0
 
-        threading.Thread(target=self._process_worker, args=(file_paths, password, encrypt), daemon=True).start()
+        worker = self._batch_worker if len(file_paths) > 1 else self._process_worker
+        threading.Thread(target=worker, args=(file_paths, password, encrypt, self.algorithm.get()),
+                         daemon=True).start()
 
     # ===== About =====
     def show_about_guide(self):
@@ -168,10 +195,13 @@ class FileEncryptor:
         sections = {
             "About FileCryptor": (
                 "FileCryptor is a secure and easy-to-use desktop tool for encrypting and decrypting files.\n"
-                "It uses password-based encryption (PBKDF2 + Fernet) to protect your data."
+                "It uses password-based encryption (PBKDF2 + AES-256-GCM or ChaCha20-Poly1305) to protect your data.\n"
+                "Files are encrypted in 1 MB chunks, so even very large files need little memory.\n"
+                "Files encrypted by older versions (Fernet) can still be decrypted."
             ),
             "Key Features": (
-                "- Encrypt and decrypt multiple files\n"
+                "- Encrypt and decrypt multiple files of any size\n"
+                "- Batches: one password derivation per batch, files processed in parallel\n"
                 "- Password protected with secure KDF\n"
                 "- Cancel operations anytime\n"
                 "- Real-time progress bar\n"
@@ -196,6 +226,7 @@ class FileEncryptor:
                   command=guide_window.destroy).pack(pady=10)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Batch workers re-import this file
     app = tb.Window(themename="cosmo")
     FileEncryptor(app)
     app.mainloop()
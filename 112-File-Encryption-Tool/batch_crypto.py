@@ -0,0 +1,143 @@
+"""
+Batch encryption / decryption on a process pool.
+
+Encrypting: PBKDF2 runs once in the parent for a fresh batch salt; every file
+gets its own HKDF subkey and salt (see crypto_engine, KDF_BATCH), so 5,000
+small files cost one KDF instead of 5,000.
+
+Decrypting: the parent reads the headers, derives each batch master key once
+and hands the keys to the workers; files from older versions or encrypted
+one at a time still run their own KDF, in parallel.
+
+Small files are grouped into one task (up to GROUP_BYTES / GROUP_FILES) to
+keep inter-process overhead low; the workers overlap reading, sealing and
+writing of different files.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+import crypto_engine as engine
+
+# ===== Config =====
+GROUP_BYTES = 8 << 20
+GROUP_FILES = 64
+POLL_INTERVAL = 0.2
+
+# ===== Worker state (set by the pool initializer) =====
+_cancel = None
+_password = None
+
+
+def _init_worker(cancel_event, password: str, masters: Dict[Tuple[bytes, int], bytes]):
+    global _cancel, _password
+    _cancel, _password = cancel_event, password
+    for (salt, iterations), key in masters.items():
+        engine.remember_master(password, salt, iterations, key)
+
+
+def _encrypt_group(paths: List[str], master: bytes, batch_salt: bytes, algorithm: str):
+    results = []
+    for path in paths:
+        if _cancel.is_set():
+            break
+        try:
+            size = engine.encrypt_file_batch(path, engine.output_path(path, True), master, batch_salt,
+                                             algorithm=algorithm, cancel=_cancel.is_set)
+            results.append((path, size, None))
+        except engine.Cancelled:
+            break
+        except Exception as e:
+            results.append((path, 0, str(e)))
+    return results
+
+
+def _decrypt_group(paths: List[str]):
+    results = []
+    for path in paths:
+        if _cancel.is_set():
+            break
+        try:
+            size = engine.decrypt_file(path, engine.output_path(path, False), _password, cancel=_cancel.is_set)
+            results.append((path, size, None))
+        except engine.Cancelled:
+            break
+        except Exception as e:
+            results.append((path, 0, str(e)))
+    return results
+
+
+def group_files(paths: List[str], sizes: Dict[str, int]) -> List[List[str]]:
+    """Consecutive small files share a task; large files get one each"""
+    groups, current, current_bytes = [], [], 0
+    for path in paths:
+        if current and (current_bytes + sizes[path] > GROUP_BYTES or len(current) >= GROUP_FILES):
+            groups.append(current)
+            current, current_bytes = [], 0
+        current.append(path)
+        current_bytes += sizes[path]
+    if current:
+        groups.append(current)
+    return groups
+
+
+def process_batch(paths: List[str], password: str, encrypt: bool = True, algorithm: str = "AES-256-GCM",
+                  workers: Optional[int] = None,
+                  progress: Optional[Callable[[dict, str, Optional[str]], None]] = None,
+                  cancel: Optional[Callable[[], bool]] = None) -> dict:
+    """
+    Encrypt or decrypt paths in parallel. progress(stats, path, error) is
+    called for every finished file; stats holds files, failed, bytes,
+    total_bytes, total_files, seconds, mb_per_s and files_per_s.
+    """
+    sizes = {path: os.path.getsize(path) for path in paths}
+    stats = {"files": 0, "failed": 0, "bytes": 0, "total_files": len(paths),
+             "total_bytes": sum(sizes.values()), "seconds": 0.0, "mb_per_s": 0.0, "files_per_s": 0.0,
+             "cancelled": False}
+    start = time.perf_counter()
+
+    masters = {}
+    if encrypt:
+        batch_salt = os.urandom(engine.SALT_SIZE)
+        master = engine.derive_raw_key(password, batch_salt, engine.ITERATIONS)
+    else:
+        for path in paths:
+            found = engine.batch_salt_of(path)
+            if found and found not in masters:
+                masters[found] = engine.master_key(password, *found)
+
+    cancel_event = multiprocessing.Event()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, initializer=_init_worker,
+                             initargs=(cancel_event, password, masters)) as pool:
+        if encrypt:
+            pending = {pool.submit(_encrypt_group, group, master, batch_salt, algorithm)
+                       for group in group_files(paths, sizes)}
+        else:
+            pending = {pool.submit(_decrypt_group, group) for group in group_files(paths, sizes)}
+
+        while pending:
+            done, pending = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            if cancel and cancel() and not cancel_event.is_set():
+                cancel_event.set()
+                stats["cancelled"] = True
+                for future in pending:
+                    future.cancel()
+            for future in done:
+                if future.cancelled():
+                    continue
+                for path, size, error in future.result():
+                    stats["files"] += 1
+                    stats["failed"] += error is not None
+                    stats["bytes"] += sizes[path] if error is None else 0
+                    elapsed = max(time.perf_counter() - start, 1e-6)
+                    stats.update(seconds=elapsed, mb_per_s=stats["bytes"] / elapsed / 1e6,
+                                 files_per_s=stats["files"] / elapsed)
+                    if progress:
+                        progress(dict(stats), path, error)
+
+    stats["seconds"] = max(time.perf_counter() - start, 1e-6)
+    stats["mb_per_s"] = stats["bytes"] / stats["seconds"] / 1e6
+    stats["files_per_s"] = stats["files"] / stats["seconds"]
+    return stats
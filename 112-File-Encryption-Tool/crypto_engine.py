@@ -0,0 +1,299 @@
+"""
+Streaming file encryption for FileCryptor.
+
+Container format (version 1), all integers big-endian:
+
+    header  MAGIC (6) | version u8 | aead u8 | kdf u8 | chunk_size u32
+            | kdf params length u16 | kdf params | nonce prefix (7)
+    chunks  ciphertext of chunk_size plaintext bytes + 16 byte tag, repeated;
+            the last chunk may be shorter (or empty)
+
+Every chunk is sealed with AES-256-GCM or ChaCha20-Poly1305 under the nonce
+    nonce prefix (7) | chunk index u32 | final flag u8
+with the whole header as associated data, so chunks cannot be reordered,
+dropped, moved to another file, or truncated away without the tag check
+failing (the last chunk must carry the final flag). Only two chunks are ever
+held in memory, whatever the file size.
+
+KDF_PBKDF2 params: iterations u32 | salt (16); the chunk key is
+PBKDF2-HMAC-SHA256(password, salt).
+
+KDF_BATCH params: iterations u32 | batch salt (16) | file salt (16); the
+chunk key is HKDF-SHA256(master, file salt) with master =
+PBKDF2-HMAC-SHA256(password, batch salt). A batch pays for PBKDF2 once, and
+every file still carries everything needed to decrypt it on its own.
+
+Files written by older versions (16 byte salt + Fernet token) are still
+decrypted, in memory as before.
+"""
+import base64
+import io
+import os
+import struct
+from typing import Callable, Dict, Optional, Tuple
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+# ===== Format =====
+MAGIC = b"FCRYPT"
+VERSION = 1
+CHUNK_SIZE = 1 << 20
+TAG_SIZE = 16
+SALT_SIZE = 16
+NONCE_PREFIX_SIZE = 7
+ITERATIONS = 390_000
+
+AEAD_AES_GCM = 1
+AEAD_CHACHA20 = 2
+ALGORITHMS = {"AES-256-GCM": AEAD_AES_GCM, "ChaCha20-Poly1305": AEAD_CHACHA20}
+_CIPHERS = {AEAD_AES_GCM: AESGCM, AEAD_CHACHA20: ChaCha20Poly1305}
+
+KDF_PBKDF2 = 1
+KDF_BATCH = 2
+HKDF_INFO = b"FileCryptor v1 file key"
+
+_FIXED = struct.Struct(">6sBBBIH")  # magic, version, aead, kdf, chunk size, kdf params length
+_PBKDF2_PARAMS = struct.Struct(">I16s")  # iterations, salt
+_BATCH_PARAMS = struct.Struct(">I16s16s")  # iterations, batch salt, file salt
+_NONCE_TAIL = struct.Struct(">IB")  # chunk index, final flag
+MAX_CHUNK_INDEX = 0xFFFFFFFF
+
+
+class CryptoError(Exception):
+    """Wrong password, damaged file or unsupported format"""
+
+
+class Cancelled(Exception):
+    pass
+
+
+# ===== Secure Key Derivation =====
+def derive_raw_key(password: str, salt: bytes, iterations: int = ITERATIONS) -> bytes:
+    """32 byte key from a password using PBKDF2HMAC and salt."""
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=iterations,
+        backend=default_backend()
+    )
+    return kdf.derive(password.encode())
+
+
+_masters: Dict[tuple, bytes] = {}
+MAX_MASTERS = 16
+
+
+def master_key(password: str, salt: bytes, iterations: int = ITERATIONS) -> bytes:
+    """PBKDF2 master key of a batch, remembered so each batch salt is derived once per process"""
+    cache_key = (password, salt, iterations)
+    if cache_key not in _masters:
+        if len(_masters) >= MAX_MASTERS:
+            _masters.clear()
+        _masters[cache_key] = derive_raw_key(password, salt, iterations)
+    return _masters[cache_key]
+
+
+def remember_master(password: str, salt: bytes, iterations: int, key: bytes):
+    """Seed the cache with a master key derived elsewhere (e.g. by the parent of a worker process)"""
+    _masters[(password, salt, iterations)] = key
+
+
+def file_key(master: bytes, file_salt: bytes) -> bytes:
+    """Per-file subkey of a batch master key"""
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=file_salt, info=HKDF_INFO,
+                backend=default_backend()).derive(master)
+
+
+def derive_key(password: str, salt: bytes) -> bytes:
+    """Derive a Fernet key from a password using PBKDF2HMAC and salt (legacy format)."""
+    return base64.urlsafe_b64encode(derive_raw_key(password, salt))
+
+
+# ===== Header =====
+def build_header(aead: int, kdf: int, kdf_params: bytes, chunk_size: int = CHUNK_SIZE,
+                 nonce_prefix: Optional[bytes] = None) -> bytes:
+    nonce_prefix = nonce_prefix or os.urandom(NONCE_PREFIX_SIZE)
+    return _FIXED.pack(MAGIC, VERSION, aead, kdf, chunk_size, len(kdf_params)) + kdf_params + nonce_prefix
+
+
+def read_header(f) -> Tuple[bytes, int, int, int, bytes, bytes]:
+    """(raw header, aead, kdf, chunk size, kdf params, nonce prefix) from an open file"""
+    fixed = f.read(_FIXED.size)
+    if len(fixed) < _FIXED.size:
+        raise CryptoError("File is too short to be encrypted")
+    magic, version, aead, kdf, chunk_size, params_len = _FIXED.unpack(fixed)
+    if magic != MAGIC:
+        raise CryptoError("Not a FileCryptor container")
+    if version != VERSION:
+        raise CryptoError(f"Unsupported format version {version}")
+    if aead not in _CIPHERS or not 0 < chunk_size <= 1 << 30:
+        raise CryptoError("Unsupported or damaged header")
+    rest = f.read(params_len + NONCE_PREFIX_SIZE)
+    if len(rest) < params_len + NONCE_PREFIX_SIZE:
+        raise CryptoError("Damaged header")
+    return fixed + rest, aead, kdf, chunk_size, rest[:params_len], rest[params_len:]
+
+
+def parse_header(header: bytes):
+    return read_header(io.BytesIO(header))
+
+
+def is_container(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def header_key(password: str, kdf: int, kdf_params: bytes) -> bytes:
+    """Chunk key for a header's KDF settings"""
+    try:
+        if kdf == KDF_PBKDF2:
+            iterations, salt = _PBKDF2_PARAMS.unpack(kdf_params)
+            return derive_raw_key(password, salt, iterations)
+        if kdf == KDF_BATCH:
+            iterations, batch_salt, file_salt = _BATCH_PARAMS.unpack(kdf_params)
+            return file_key(master_key(password, batch_salt, iterations), file_salt)
+    except struct.error:
+        raise CryptoError("Damaged header") from None
+    raise CryptoError(f"Unsupported key derivation {kdf}")
+
+
+# ===== Streaming =====
+def _nonce(prefix: bytes, index: int, final: bool) -> bytes:
+    if index > MAX_CHUNK_INDEX:
+        raise CryptoError("File has too many chunks for this format")
+    return prefix + _NONCE_TAIL.pack(index, final)
+
+
+def _chunks(f, size: int):
+    """(chunk, is_last) pairs with one chunk of lookahead; an empty file yields one empty last chunk"""
+    current = f.read(size)
+    while True:
+        following = f.read(size) if len(current) == size else b""
+        yield current, not following
+        if not following:
+            return
+        current = following
+
+
+def _write_atomic(dst: str, produce: Callable):
+    """Write through dst.part, renamed only once produce() succeeded"""
+    part = dst + ".part"
+    try:
+        with open(part, "wb") as out:
+            result = produce(out)
+        os.replace(part, dst)
+        return result
+    finally:
+        if os.path.exists(part):
+            os.remove(part)
+
+
+def encrypt_stream(src, out, key: bytes, header: bytes, progress: Optional[Callable[[int], None]] = None,
+                   cancel: Optional[Callable[[], bool]] = None) -> int:
+    """Seal src into out under key; returns plaintext bytes. progress(n) gets each chunk's size."""
+    _, aead, _, chunk_size, _, prefix = parse_header(header)
+    cipher = _CIPHERS[aead](key)
+    out.write(header)
+    total = 0
+    for index, (chunk, last) in enumerate(_chunks(src, chunk_size)):
+        if cancel and cancel():
+            raise Cancelled()
+        out.write(cipher.encrypt(_nonce(prefix, index, last), chunk, header))
+        total += len(chunk)
+        if progress:
+            progress(len(chunk))
+    return total
+
+
+def decrypt_stream(src, out, password: str, progress: Optional[Callable[[int], None]] = None,
+                   cancel: Optional[Callable[[], bool]] = None, key_for=header_key) -> int:
+    """Open a container from src into out; returns plaintext bytes. Raises CryptoError on any tampering."""
+    header, aead, kdf, chunk_size, params, prefix = read_header(src)
+    cipher = _CIPHERS[aead](key_for(password, kdf, params))
+    total = 0
+    for index, (block, last) in enumerate(_chunks(src, chunk_size + TAG_SIZE)):
+        if cancel and cancel():
+            raise Cancelled()
+        try:
+            chunk = cipher.decrypt(_nonce(prefix, index, last), block, header)
+        except InvalidTag:
+            if last:
+                raise CryptoError("Wrong password, or the file is damaged or truncated") from None
+            raise CryptoError(f"Wrong password, or the file is damaged (chunk {index})") from None
+        out.write(chunk)
+        total += len(chunk)
+        if progress:
+            progress(len(chunk))
+    return total
+
+
+# ===== Files =====
+def encrypt_file(src_path: str, dst_path: str, password: str, algorithm: str = "AES-256-GCM",
+                 chunk_size: int = CHUNK_SIZE, progress=None, cancel=None) -> int:
+    """Encrypt one file into the streaming container with its own salt"""
+    salt = os.urandom(SALT_SIZE)
+    key = derive_raw_key(password, salt)
+    header = build_header(ALGORITHMS[algorithm], KDF_PBKDF2, _PBKDF2_PARAMS.pack(ITERATIONS, salt), chunk_size)
+    with open(src_path, "rb") as src:
+        return _write_atomic(dst_path, lambda out: encrypt_stream(src, out, key, header, progress, cancel))
+
+
+def decrypt_legacy(src_path: str, dst_path: str, password: str) -> int:
+    """Old format: 16 byte salt + one Fernet token (needs the whole file in memory)"""
+    with open(src_path, "rb") as f:
+        data = f.read()
+    try:
+        decrypted = Fernet(derive_key(password, data[:16])).decrypt(data[16:])
+    except InvalidToken:
+        raise CryptoError("Wrong password, or the file is damaged") from None
+    _write_atomic(dst_path, lambda out: out.write(decrypted))
+    return len(decrypted)
+
+
+def encrypt_file_batch(src_path: str, dst_path: str, master: bytes, batch_salt: bytes,
+                       iterations: int = ITERATIONS, algorithm: str = "AES-256-GCM",
+                       chunk_size: int = CHUNK_SIZE, progress=None, cancel=None) -> int:
+    """Encrypt one file of a batch: HKDF subkey of the batch master key, fresh file salt"""
+    file_salt = os.urandom(SALT_SIZE)
+    params = _BATCH_PARAMS.pack(iterations, batch_salt, file_salt)
+    header = build_header(ALGORITHMS[algorithm], KDF_BATCH, params, chunk_size)
+    with open(src_path, "rb") as src:
+        return _write_atomic(dst_path, lambda out: encrypt_stream(src, out, file_key(master, file_salt),
+                                                                  header, progress, cancel))
+
+
+def batch_salt_of(path: str) -> Optional[Tuple[bytes, int]]:
+    """(batch salt, iterations) of a batch-encrypted container, else None"""
+    try:
+        with open(path, "rb") as f:
+            _, _, kdf, _, params, _ = read_header(f)
+    except (CryptoError, OSError):
+        return None
+    if kdf != KDF_BATCH or len(params) != _BATCH_PARAMS.size:
+        return None
+    iterations, batch_salt, _ = _BATCH_PARAMS.unpack(params)
+    return batch_salt, iterations
+
+
+def decrypt_file(src_path: str, dst_path: str, password: str, progress=None, cancel=None) -> int:
+    """Decrypt a container or a legacy Fernet file; dst only appears once fully authenticated"""
+    if not is_container(src_path):
+        result = decrypt_legacy(src_path, dst_path, password)
+        if progress:
+            progress(os.path.getsize(src_path))
+        return result
+    with open(src_path, "rb") as src:
+        return _write_atomic(dst_path, lambda out: decrypt_stream(src, out, password, progress, cancel))
+
+
+def output_path(file_path: str, encrypt: bool) -> str:
+    if encrypt:
+        return file_path + ".enc"
+    return file_path[:-4] if file_path.endswith(".enc") else file_path + ".dec"
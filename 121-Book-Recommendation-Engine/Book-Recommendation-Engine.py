@@ -3,16 +3,13 @@ import webbrowser
 import tkinter as tk
 from tkinter import messagebox
 from dataclasses import dataclass
-from typing import List, Tuple, Dict
+from typing import List, Tuple
 import requests
-import io
 import json
 import os
 
-from PIL import Image, ImageTk
-
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from field_tfidf import FieldTfidfModel
+from image_service import ImageService
 
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
@@ -21,11 +18,13 @@ from ttkbootstrap.widgets.scrolled import ScrolledText
 # ---------------- CONFIG ---------------- #
 RESULTS_PER_PAGE = 6
 OPENLIBRARY_SEARCH_URL = "https://openlibrary.org/search.json"
+MODES = ("All", "Author")
+COVER_SIZE = (120, 180)
 
 # ---------------- GLOBAL STATE ---------------- #
 all_ranked_books: List[Tuple["Book", float]] = []
 current_page = 1
-cover_cache: Dict[str, ImageTk.PhotoImage] = {}
+images = ImageService()  # Disk + memory cover cache shared by every page
 
 # ---------------- DATA STRUCTURE ---------------- #
 @dataclass(frozen=True)
@@ -61,31 +60,21 @@ def fetch_books(query: str, limit=40) -> List[Book]:
     return books
 
 # ---------------- RECOMMENDATION ENGINE ---------------- #
-def recommend_books(query: str, candidates: List[Book], mode: str) -> List[Tuple[Book, float]]:
-    docs = [b.text_blob(mode) for b in candidates]
-    vectorizer = TfidfVectorizer(stop_words="english")
-    tfidf = vectorizer.fit_transform(docs + [query])
-    scores = cosine_similarity(tfidf[-1], tfidf[:-1]).flatten()
-    ranked = list(zip(candidates, scores))
-    ranked.sort(key=lambda x: x[1], reverse=True)
-    return ranked
+# One vectorizer per mode, fitted once per candidate set
+book_model = FieldTfidfModel({mode: (lambda b, m=mode: b.text_blob(m)) for mode in MODES})
+
+def recommend_books(query: str, candidates: List[Book], modes: List[str]) -> List[Tuple[Book, float]]:
+    """Rank candidates by the summed cosine similarity of every selected mode"""
+    return book_model.rank(query, {mode: 1.0 for mode in modes}, items=candidates)
 
 # ---------------- UI HELPERS ---------------- #
 def open_url(url: str):
     webbrowser.open_new_tab(url)
 
-def load_cover(url: str, size=(120, 180)):
-    if not url:
-        return None
-    if url in cover_cache:
-        return cover_cache[url]
-    try:
-        img = Image.open(io.BytesIO(requests.get(url).content)).resize(size)
-        photo = ImageTk.PhotoImage(img)
-        cover_cache[url] = photo
-        return photo
-    except:
-        return None
+def set_image(label, photo):
+    if label.winfo_exists():
+        label.configure(image=photo)
+        label.image = photo
 
 # ---------------- DISPLAY MAIN ---------------- #
 def insert_book(container_widget, book: Book):
@@ -106,15 +95,7 @@ def insert_book(container_widget, book: Book):
     container_widget.insert("end", "\n\n")
     container_widget.configure(state="disabled")
 
-    def async_load():
-        img = load_cover(book.cover_url)
-        if img:
-            def set_img():
-                if art_label.winfo_exists():
-                    art_label.configure(image=img)
-                    art_label.image = img
-            container_widget.after(0, set_img)
-    threading.Thread(target=async_load, daemon=True).start()
+    images.request(book.cover_url, COVER_SIZE, container_widget, lambda photo: set_image(art_label, photo))
 
 def display_page():
     text.configure(state="normal")
@@ -124,6 +105,8 @@ def display_page():
     for book, score in all_ranked_books[start:end]:
         insert_book(text, book)
     text.configure(state="disabled")
+    # Covers of the next page load while this one is being read
+    images.prefetch((b.cover_url for b, _ in all_ranked_books[end:end + RESULTS_PER_PAGE]), COVER_SIZE, text)
     update_pagination()
 
 # ---------------- PAGINATION ---------------- #
@@ -159,11 +142,7 @@ def perform_search():
 def search_thread(query: str):
     selected_modes = get_selected_modes()
     books = fetch_books(query)
-    ranked_list = []
-    for mode in selected_modes:
-        ranked = recommend_books(query, books, mode)
-        ranked_list.extend(ranked)
-    ranked_list.sort(key=lambda x: x[1], reverse=True)
+    ranked_list = recommend_books(query, books, selected_modes)
     seen = set()
     final_list = []
     for book, score in ranked_list:
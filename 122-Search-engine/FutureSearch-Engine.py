@@ -1,24 +1,31 @@
 import threading
 import webbrowser
 import tkinter as tk
+from tkinter import filedialog
 from urllib.parse import urlparse
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from typing import List
 
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from rank_bm25 import BM25Okapi
 from ddgs import DDGS
 
+from search_index import InvertedIndex
+from query_cache import QueryCache
+from ranking import Ranker, FUSIONS, ENGLISH_STOP_WORDS
+
 # ---------------- CONFIG ---------------- #
 RESULTS_PER_PAGE = 5
+RANKING_FUSION = "minmax"  # raw-mean, minmax, zscore or rrf
 
 # ---------------- GLOBAL STATE ---------------- #
 all_ranked_results: List["SearchResult"] = []
 current_page = 1
+search_index = InvertedIndex()  # Every fetched result is added to the local index
+query_cache = QueryCache()  # Raw and ranked results per normalized query
+ranker = Ranker(fusion=FUSIONS[RANKING_FUSION](), stop_words=ENGLISH_STOP_WORDS)
+page_frames = {}  # page number -> rendered page, reset on every new search
 
 # ---------------- DATA STRUCTURE ---------------- #
 @dataclass
@@ -59,24 +66,41 @@ def fetch_search_results(query: str) -> List[SearchResult]:
     return results
 
 def rank_results(query: str, results: List[SearchResult]) -> List[tuple]:
-    if not results:
-        return []
-    docs = [f"{r.title} {r.snippet}" for r in results]
-    vectorizer = TfidfVectorizer(stop_words="english")
-    tfidf_matrix = vectorizer.fit_transform(docs + [query])
-    tfidf_scores = cosine_similarity(tfidf_matrix[-1], tfidf_matrix[:-1]).flatten()
-    bm25 = BM25Okapi([d.lower().split() for d in docs])
-    bm25_scores = bm25.get_scores(query.lower().split())
+    # Corpus statistics persist across searches, scores are normalized before fusion
+    return ranker.rank(query, results, key=lambda r: r.url, text=lambda r: f"{r.title} {r.snippet}")
+
+def index_results(results: List[SearchResult]):
+    search_index.add_documents((r.url, r.title, r.snippet, "") for r in results if r.url)
+
+def search_offline(query: str) -> List[tuple]:
     ranked = []
-    for i, res in enumerate(results):
-        score = (tfidf_scores[i] + bm25_scores[i]) / 2
-        ranked.append((res, score))
-    return sorted(ranked, key=lambda x: x[1], reverse=True)
+    for doc, score in search_index.search(query, k=100):
+        ranked.append((SearchResult(
+            title=doc.title,
+            url=doc.url,
+            display_url=short_display_url(doc.url),
+            snippet=doc.snippet
+        ), score))
+    return ranked
 
 # ---------------- DISPLAY ---------------- #
-def display_page():
+def clear_pages():
     for widget in results_frame.winfo_children():
         widget.destroy()
+    page_frames.clear()
+
+def display_page():
+    # Pages already rendered for this search are shown again instead of rebuilt
+    for frame in page_frames.values():
+        frame.pack_forget()
+    canvas.yview_moveto(0)
+    if current_page in page_frames:
+        page_frames[current_page].pack(fill=X)
+        return
+
+    page = tb.Frame(results_frame)
+    page.pack(fill=X)
+    page_frames[current_page] = page
 
     start = (current_page - 1) * RESULTS_PER_PAGE
     end = start + RESULTS_PER_PAGE
@@ -84,7 +108,7 @@ def display_page():
 
     if not page_results:
         tb.Label(
-            results_frame,
+            page,
             text="No results found.",
             font=("Segoe UI", 12),
             foreground="#333333"
@@ -93,7 +117,7 @@ def display_page():
 
     for res, score in page_results:
         # Frame without extra background, inherits parent
-        card = tb.Frame(results_frame, padding=15)
+        card = tb.Frame(page, padding=15)
         card.pack(fill=X, pady=8, padx=5)
 
         # Title (clickable with hover effect)
@@ -159,30 +183,46 @@ def perform_search():
 
     # Disable search button and show "Searching..." text
     search_button.config(state=DISABLED)
-    for widget in results_frame.winfo_children():
-        widget.destroy()
+    clear_pages()
     tb.Label(results_frame, text="Searching...", font=("Segoe UI", 12)).pack(pady=8, padx=5)
     
     # Start the search in a separate thread
-    threading.Thread(target=search_thread, args=(query,), daemon=True).start()
+    threading.Thread(target=search_thread, args=(query, offline_var.get()), daemon=True).start()
 
 
-def search_thread(query):
+def search_thread(query, offline=False):
     global all_ranked_results, current_page
 
     try:
-        # Fetch and rank results
-        results = fetch_search_results(query)
-        all_ranked_results = rank_results(query, results)
+        # Fetch and rank results, or answer from the local index when offline
+        if offline:
+            all_ranked_results = search_offline(query)
+            results = []
+        else:
+            # Repeated queries are answered from the cache without network or re-ranking
+            raw = query_cache.get_or_compute(
+                "raw", query, lambda: [asdict(r) for r in fetch_search_results(query)])
+            results = [SearchResult(**r) for r in raw or []]
+            ranked = query_cache.get_or_compute(
+                "ranked", query,
+                lambda: [[asdict(r), float(score)] for r, score in rank_results(query, results)])
+            all_ranked_results = [(SearchResult(**r), score) for r, score in ranked or []]
         current_page = 1
 
         # Schedule the UI update on the main thread
         app.after(0, lambda: (
+            clear_pages(),
             display_page(),
+            cache_label.config(text=query_cache.summary()),
             update_pagination(),
             search_button.config(state=NORMAL)  # Re-enable search button
         ))
 
+        # Grow the local index after the UI has its results
+        if results:
+            index_results(results)
+            app.after(0, update_index_status)
+
     except Exception as e:
         # Show error on the main thread
         app.after(0, lambda: (
@@ -190,6 +230,28 @@ def search_thread(query):
             search_button.config(state=NORMAL)
         ))
 
+# ---------------- LOCAL INDEX ---------------- #
+def update_index_status(text=None):
+    index_label.config(text=text or f"Local index: {search_index.doc_count:,} documents")
+
+def index_folder():
+    folder = filedialog.askdirectory(title="Select a folder to index")
+    if not folder:
+        return
+    index_button.config(state=DISABLED)
+
+    def worker():
+        try:
+            search_index.add_folder(
+                folder,
+                progress=lambda n: app.after(0, lambda: update_index_status(f"Indexing... {n:,} files added"))
+            )
+        except Exception as e:
+            app.after(0, tb.Messagebox.show_error, "Index Error", str(e))
+        app.after(0, lambda: (update_index_status(), index_button.config(state=NORMAL)))
+
+    threading.Thread(target=worker, daemon=True).start()
+
 # ---------------- UI ---------------- #
 app = tb.Window(title="FutureSearch Engine", themename="flatly", size=(980, 720))
 
@@ -202,8 +264,19 @@ query_entry = tb.Entry(top_frame, font=("Segoe UI", 12))
 query_entry.pack(fill=X, pady=8)
 query_entry.bind("<Return>", lambda e: perform_search())
 # Assign the search button to a variable
-search_button = tb.Button(top_frame, text="Search", bootstyle="success", command=perform_search)
-search_button.pack(anchor=E)
+options_frame = tb.Frame(top_frame)
+options_frame.pack(fill=X)
+offline_var = tk.BooleanVar(value=False)
+tb.Checkbutton(options_frame, text="Offline (local index)", variable=offline_var,
+               bootstyle="round-toggle").pack(side=LEFT)
+index_button = tb.Button(options_frame, text="Index Folder...", bootstyle="secondary-outline",
+                         command=index_folder)
+index_button.pack(side=LEFT, padx=10)
+index_label = tb.Label(options_frame, font=("Segoe UI", 9), foreground="#666666")
+index_label.pack(side=LEFT)
+update_index_status()
+search_button = tb.Button(options_frame, text="Search", bootstyle="success", command=perform_search)
+search_button.pack(side=RIGHT)
 
 
 # Scrollable results
@@ -234,5 +307,7 @@ page_label = tb.Label(nav_frame, text="Page 1", font=("Segoe UI", 10))
 page_label.pack(side=LEFT, padx=10)
 next_btn = tb.Button(nav_frame, text="Next →", bootstyle="secondary", command=next_page)
 next_btn.pack(side=LEFT)
+cache_label = tb.Label(nav_frame, text=query_cache.summary(), font=("Segoe UI", 9), foreground="#666666")
+cache_label.pack(side=RIGHT)
 
 app.mainloop()
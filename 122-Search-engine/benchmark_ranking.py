@@ -0,0 +1,76 @@
+"""
+Ranking latency and quality benchmark.
+
+Ranks every query in ranking_judgments.json against all judged documents with
+each fusion stage and reports mean latency and nDCG@10.
+
+    python benchmark_ranking.py [--judgments ranking_judgments.json] [--repeats 200]
+"""
+import json
+import math
+import time
+import argparse
+
+from ranking import Ranker, FUSIONS, ENGLISH_STOP_WORDS
+
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+    from rank_bm25 import BM25Okapi
+except ImportError:
+    TfidfVectorizer = None
+
+
+def ndcg(ranked_ids, relevance, k=10):
+    dcg = sum((2 ** relevance.get(doc_id, 0) - 1) / math.log2(i + 2)
+              for i, doc_id in enumerate(ranked_ids[:k]))
+    ideal = sorted(relevance.values(), reverse=True)[:k]
+    idcg = sum((2 ** grade - 1) / math.log2(i + 2) for i, grade in enumerate(ideal))
+    return dcg / idcg if idcg else 0.0
+
+
+def legacy_rank(query, docs, text):
+    """The apps' original rank_results: refit TF-IDF and BM25 per call, average raw scores"""
+    texts = [text(d) for d in docs]
+    tfidf = TfidfVectorizer(stop_words="english").fit_transform(texts + [query])
+    tfidf_scores = cosine_similarity(tfidf[-1], tfidf[:-1]).flatten()
+    bm25_scores = BM25Okapi([t.lower().split() for t in texts]).get_scores(query.lower().split())
+    return sorted(zip(docs, (tfidf_scores + bm25_scores) / 2), key=lambda x: x[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ranking pipeline benchmark")
+    parser.add_argument("--judgments", default="ranking_judgments.json")
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(args.judgments, encoding="utf-8") as f:
+        judgments = json.load(f)
+    docs = judgments["documents"]
+    key = lambda d: d["id"]
+    text = lambda d: f"{d['title']} {d['snippet']}"
+
+    print(f"{len(judgments['queries'])} queries x {len(docs)} documents")
+    if TfidfVectorizer is not None:
+        scores, start = [], time.perf_counter()
+        for q in judgments["queries"]:
+            ranked = legacy_rank(q["query"], docs, text)
+            scores.append(ndcg([d["id"] for d, _ in ranked], q["relevance"]))
+        per_query = (time.perf_counter() - start) / len(judgments["queries"]) * 1000
+        print(f"{'legacy':>10}: nDCG@10 {sum(scores) / len(scores):.4f} | {per_query:.3f} ms/query")
+    for name, fusion_cls in FUSIONS.items():
+        ranker = Ranker(fusion=fusion_cls(), stop_words=ENGLISH_STOP_WORDS)
+        ranker.add_documents(docs, key, text)  # Corpus statistics built once
+        scores, elapsed = [], 0.0
+        for q in judgments["queries"]:
+            start = time.perf_counter()
+            for _ in range(args.repeats):
+                ranked = ranker.rank(q["query"], docs, key, text)
+            elapsed += time.perf_counter() - start
+            scores.append(ndcg([d["id"] for d, _ in ranked], q["relevance"]))
+        per_query = elapsed / (args.repeats * len(judgments["queries"])) * 1000
+        print(f"{name:>10}: nDCG@10 {sum(scores) / len(scores):.4f} | {per_query:.3f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
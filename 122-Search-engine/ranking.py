@@ -0,0 +1,189 @@
+"""
+Reusable ranking pipeline for the search apps.
+
+A Ranker keeps corpus statistics (document frequencies, lengths, cached term
+counts) that are built once and updated as new documents are seen, runs a
+list of scorers over the candidates and combines their scores with a
+pluggable fusion stage:
+
+    ranker = Ranker(fusion=MinMaxFusion())
+    ranked = ranker.rank(query, docs, key=lambda d: d["url"], text=lambda d: d["title"] + " " + d["snippet"])
+
+Scores from different scorers live on different scales (cosine is 0..1,
+BM25 is unbounded), which is why they are normalized before being combined.
+"""
+import re
+import math
+from collections import Counter
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+TOKEN_RE = re.compile(r"\w+")
+ENGLISH_STOP_WORDS = frozenset(
+    "a about an and are as at be been but by can for from has have how i if in into is it "
+    "its of on or that the their there these this to was we what when where which who why "
+    "will with you your".split()
+)
+
+# ---------------- TOKENIZER ---------------- #
+def make_tokenizer(stop_words: Optional[frozenset] = None) -> Callable[[str], List[str]]:
+    def tokenize(text: str) -> List[str]:
+        tokens = TOKEN_RE.findall(text.lower())
+        return [t for t in tokens if t not in stop_words] if stop_words else tokens
+    return tokenize
+
+# ---------------- CORPUS STATISTICS ---------------- #
+class CorpusStats:
+    """Document frequencies and lengths over every document seen so far"""
+
+    def __init__(self, tokenizer: Callable[[str], List[str]]):
+        self.tokenize = tokenizer
+        self.doc_terms: Dict[Hashable, Counter] = {}
+        self.df: Counter = Counter()
+        self.total_length = 0
+
+    @property
+    def doc_count(self) -> int:
+        return len(self.doc_terms)
+
+    @property
+    def avg_length(self) -> float:
+        return self.total_length / self.doc_count if self.doc_count else 1.0
+
+    def add(self, key: Hashable, text: str) -> Counter:
+        """Add a document once; later calls with the same key reuse its term counts"""
+        terms = self.doc_terms.get(key)
+        if terms is None:
+            terms = self.doc_terms[key] = Counter(self.tokenize(text))
+            self.df.update(terms.keys())
+            self.total_length += sum(terms.values())
+        return terms
+
+    def idf(self, term: str) -> float:
+        df = self.df.get(term, 0)
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+# ---------------- SCORERS ---------------- #
+class TfidfScorer:
+    """Cosine similarity between sublinear TF-IDF vectors"""
+
+    name = "tfidf"
+
+    def score(self, stats: CorpusStats, query_terms: Counter, docs: List[Counter]) -> List[float]:
+        idf = {t: stats.idf(t) for t in query_terms}
+        q_weights = {t: (1 + math.log(tf)) * idf[t] for t, tf in query_terms.items()}
+        q_norm = math.sqrt(sum(w * w for w in q_weights.values())) or 1.0
+        scores = []
+        for terms in docs:
+            dot = 0.0
+            for t, w in q_weights.items():
+                tf = terms.get(t)
+                if tf:
+                    dot += w * (1 + math.log(tf)) * idf[t]
+            if dot:
+                d_norm = math.sqrt(sum(((1 + math.log(tf)) * stats.idf(t)) ** 2 for t, tf in terms.items()))
+                dot /= q_norm * (d_norm or 1.0)
+            scores.append(dot)
+        return scores
+
+
+class BM25Scorer:
+    name = "bm25"
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+    def score(self, stats: CorpusStats, query_terms: Counter, docs: List[Counter]) -> List[float]:
+        idf = {t: stats.idf(t) for t in query_terms}
+        avg = stats.avg_length
+        scores = []
+        for terms in docs:
+            norm = self.k1 * (1 - self.b + self.b * sum(terms.values()) / avg)
+            total = 0.0
+            for t in query_terms:
+                tf = terms.get(t)
+                if tf:
+                    total += idf[t] * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(total)
+        return scores
+
+# ---------------- FUSION STAGES ---------------- #
+class RawMeanFusion:
+    """Plain average of raw scores (the apps' original behaviour, kept as a baseline)"""
+
+    name = "raw-mean"
+
+    def fuse(self, score_lists: List[List[float]], weights: Sequence[float]) -> List[float]:
+        return [sum(w * s for w, s in zip(weights, col)) / sum(weights) for col in zip(*score_lists)]
+
+
+class MinMaxFusion(RawMeanFusion):
+    name = "minmax"
+
+    @staticmethod
+    def normalize(scores: List[float]) -> List[float]:
+        lo, hi = min(scores), max(scores)
+        if hi == lo:
+            return [0.0] * len(scores)
+        return [(s - lo) / (hi - lo) for s in scores]
+
+    def fuse(self, score_lists, weights):
+        return super().fuse([self.normalize(s) for s in score_lists], weights)
+
+
+class ZScoreFusion(RawMeanFusion):
+    name = "zscore"
+
+    @staticmethod
+    def normalize(scores: List[float]) -> List[float]:
+        mean = sum(scores) / len(scores)
+        std = math.sqrt(sum((s - mean) ** 2 for s in scores) / len(scores))
+        if not std:
+            return [0.0] * len(scores)
+        return [(s - mean) / std for s in scores]
+
+    def fuse(self, score_lists, weights):
+        return super().fuse([self.normalize(s) for s in score_lists], weights)
+
+
+class ReciprocalRankFusion:
+    """Sum of weight / (k + rank); ignores score magnitudes entirely"""
+
+    name = "rrf"
+
+    def __init__(self, k: int = 60):
+        self.k = k
+
+    def fuse(self, score_lists, weights):
+        fused = [0.0] * len(score_lists[0])
+        for w, scores in zip(weights, score_lists):
+            order = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+            for rank, i in enumerate(order, start=1):
+                fused[i] += w / (self.k + rank)
+        return fused
+
+
+FUSIONS = {f.name: f for f in (RawMeanFusion, MinMaxFusion, ZScoreFusion, ReciprocalRankFusion)}
+
+# ---------------- RANKER ---------------- #
+class Ranker:
+    def __init__(self, scorers=None, fusion=None, weights: Optional[Sequence[float]] = None,
+                 stop_words: Optional[frozenset] = None):
+        self.scorers = scorers or [TfidfScorer(), BM25Scorer()]
+        self.fusion = fusion or MinMaxFusion()
+        self.weights = list(weights or [1.0] * len(self.scorers))
+        self.stats = CorpusStats(make_tokenizer(stop_words))
+
+    def add_documents(self, docs, key: Callable, text: Callable):
+        """Grow the corpus statistics without ranking anything"""
+        for doc in docs:
+            self.stats.add(key(doc), text(doc))
+
+    def rank(self, query: str, docs: list, key: Callable, text: Callable) -> List[Tuple[object, float]]:
+        if not docs:
+            return []
+        doc_terms = [self.stats.add(key(d), text(d)) for d in docs]
+        query_terms = Counter(self.stats.tokenize(query))
+        score_lists = [s.score(self.stats, query_terms, doc_terms) for s in self.scorers]
+        fused = self.fusion.fuse(score_lists, self.weights)
+        return sorted(zip(docs, fused), key=lambda x: x[1], reverse=True)
@@ -0,0 +1,413 @@
+"""
+Persistent inverted index for FutureSearch.
+
+Documents are stored in a single SQLite file. Posting lists are split into
+blocks of BLOCK_SIZE entries; each block stores (doc id delta, term frequency)
+pairs as varints together with the block's max tf and min doc length, which
+give a per-term BM25 upper bound for MaxScore top-k pruning.
+
+    python search_index.py ingest <folder>          # index local text files
+    python search_index.py query "<query>"          # offline search
+    python search_index.py bench --docs 1000000     # synthetic benchmark
+"""
+import os
+import re
+import sys
+import math
+import heapq
+import itertools
+import sqlite3
+import time
+import random
+import argparse
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+# ---------------- CONFIG ---------------- #
+INDEX_FILE = "futuresearch_index.db"
+BLOCK_SIZE = 128
+BM25_K1 = 1.5
+BM25_B = 0.75
+TEXT_EXTENSIONS = {".txt", ".md", ".rst", ".html", ".htm", ".csv", ".json", ".py"}
+MAX_FILE_BYTES = 5 * 1024 * 1024
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or "
+    "that the this to was were will with".split()
+)
+
+# ---------------- DATA STRUCTURE ---------------- #
+@dataclass
+class IndexedDocument:
+    doc_id: int
+    title: str
+    url: str
+    snippet: str
+
+# ---------------- TOKENIZER ---------------- #
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOP_WORDS]
+
+# ---------------- VARINT CODEC ---------------- #
+def encode_block(doc_ids: List[int], tfs: List[int], prev_doc: int) -> bytes:
+    """Delta-encode doc ids starting from prev_doc and interleave them with tfs as varints"""
+    out = bytearray()
+    for doc_id, tf in zip(doc_ids, tfs):
+        for value in (doc_id - prev_doc, tf):
+            while value >= 0x80:
+                out.append((value & 0x7F) | 0x80)
+                value >>= 7
+            out.append(value)
+        prev_doc = doc_id
+    return bytes(out)
+
+
+def decode_block(data: bytes, prev_doc: int) -> Tuple[List[int], List[int]]:
+    doc_ids, tfs = [], []
+    value = shift = 0
+    is_tf = False
+    for byte in data:
+        if byte & 0x80:
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            continue
+        value |= byte << shift
+        if is_tf:
+            tfs.append(value)
+        else:
+            prev_doc += value
+            doc_ids.append(prev_doc)
+        is_tf = not is_tf
+        value = shift = 0
+    return doc_ids, tfs
+
+# ---------------- POSTING CURSOR ---------------- #
+class PostingCursor:
+    """Iterates one term's posting list, decoding blocks only when needed"""
+
+    def __init__(self, index: "InvertedIndex", term: str, idf: float, blocks: list):
+        self.index = index
+        self.term = term
+        self.idf = idf
+        # blocks: (block_no, first_doc, last_doc, max_tf, min_len)
+        self.blocks = blocks
+        self.last_docs = [b[2] for b in blocks]
+        self.upper_bound = max(index.bm25(idf, b[3], b[4]) for b in blocks)
+        self.block_pos = -1
+        self.doc_ids: List[int] = []
+        self.tfs: List[int] = []
+        self.pos = 0
+        self.doc = 0
+        self._load_block(0)
+
+    def _load_block(self, block_pos: int):
+        if block_pos >= len(self.blocks):
+            self.doc = math.inf
+            return
+        block_no, first_doc = self.blocks[block_pos][:2]
+        self.doc_ids, self.tfs = self.index.read_block(self.term, block_no, first_doc)
+        self.block_pos = block_pos
+        self.pos = 0
+        self.doc = self.doc_ids[0]
+
+    def next(self):
+        self.pos += 1
+        if self.pos < len(self.doc_ids):
+            self.doc = self.doc_ids[self.pos]
+        else:
+            self._load_block(self.block_pos + 1)
+
+    def seek(self, target: int):
+        """Move to the first posting with doc id >= target, skipping whole blocks"""
+        if self.doc >= target:
+            return
+        if self.doc_ids[-1] < target:
+            self._load_block(bisect_left(self.last_docs, target, self.block_pos + 1))
+            if self.doc >= target:
+                return
+        self.pos = bisect_left(self.doc_ids, target, self.pos)
+        self.doc = self.doc_ids[self.pos]
+
+    def score(self) -> float:
+        return self.index.bm25(self.idf, self.tfs[self.pos], self.index.lengths[self.doc])
+
+# ---------------- INDEX ---------------- #
+class InvertedIndex:
+    def __init__(self, path: str = INDEX_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY, url TEXT UNIQUE, title TEXT, snippet TEXT, length INTEGER);
+            CREATE TABLE IF NOT EXISTS terms (
+                term TEXT PRIMARY KEY, df INTEGER, blocks INTEGER) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS blocks (
+                term TEXT, block_no INTEGER, first_doc INTEGER, last_doc INTEGER,
+                count INTEGER, max_tf INTEGER, min_len INTEGER, data BLOB,
+                PRIMARY KEY (term, block_no)) WITHOUT ROWID;
+        """)
+        meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+        self.doc_count = meta.get("doc_count", 0)
+        self.total_length = meta.get("total_length", 0)
+        # Doc lengths indexed by doc id, kept in memory for scoring
+        self.lengths = array("I", [0])
+        for doc_id, length in self.conn.execute("SELECT id, length FROM docs ORDER BY id"):
+            self.lengths.extend([0] * (doc_id - len(self.lengths)))
+            self.lengths.append(length)
+
+    def close(self):
+        self.conn.close()
+
+    # ---------- BM25 ---------- #
+    @property
+    def avg_length(self) -> float:
+        return self.total_length / self.doc_count if self.doc_count else 1.0
+
+    def idf(self, df: int) -> float:
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+    def bm25(self, idf: float, tf: int, length: int) -> float:
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / self.avg_length)
+        return idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+    # ---------- INGEST ---------- #
+    def add_documents(self, docs: Iterable[Tuple[str, str, str, str]]) -> int:
+        """Index (url, title, snippet, body) tuples, skipping urls already indexed.
+
+        Returns the number of newly indexed documents.
+        """
+        with self.lock, self.conn:
+            postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+            added = 0
+            for url, title, snippet, body in docs:
+                tokens = tokenize(f"{title} {snippet} {body}")
+                cur = self.conn.execute(
+                    "INSERT OR IGNORE INTO docs (url, title, snippet, length) VALUES (?, ?, ?, ?)",
+                    (url, title, snippet, len(tokens)))
+                if not cur.rowcount:
+                    continue
+                doc_id = cur.lastrowid
+                self.lengths.extend([0] * (doc_id - len(self.lengths)))
+                self.lengths.append(len(tokens))
+                for term, tf in Counter(tokens).items():
+                    postings[term].append((doc_id, tf))
+                self.doc_count += 1
+                self.total_length += len(tokens)
+                added += 1
+            for term, entries in postings.items():
+                self._append_postings(term, entries)
+            self.conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                                  [("doc_count", self.doc_count), ("total_length", self.total_length)])
+        return added
+
+    def _append_postings(self, term: str, entries: List[Tuple[int, int]]):
+        """Append postings (ascending doc ids) to a term, topping up its last block first"""
+        row = self.conn.execute("SELECT df, blocks FROM terms WHERE term = ?", (term,)).fetchone()
+        df, block_count = row if row else (0, 0)
+        doc_ids = [d for d, _ in entries]
+        tfs = [tf for _, tf in entries]
+        if block_count:
+            last = self.conn.execute(
+                "SELECT first_doc, count, data FROM blocks WHERE term = ? AND block_no = ?",
+                (term, block_count - 1)).fetchone()
+            if last[1] < BLOCK_SIZE:
+                old_ids, old_tfs = decode_block(last[2], last[0] - 1)
+                doc_ids, tfs = old_ids + doc_ids, old_tfs + tfs
+                block_count -= 1
+        rows = []
+        for start in range(0, len(doc_ids), BLOCK_SIZE):
+            ids, block_tfs = doc_ids[start:start + BLOCK_SIZE], tfs[start:start + BLOCK_SIZE]
+            # First doc id is stored delta-encoded from first_doc - 1
+            rows.append((term, block_count, ids[0], ids[-1], len(ids), max(block_tfs),
+                         min(self.lengths[d] for d in ids), encode_block(ids, block_tfs, ids[0] - 1)))
+            block_count += 1
+        self.conn.executemany("INSERT OR REPLACE INTO blocks VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self.conn.execute("INSERT OR REPLACE INTO terms VALUES (?, ?, ?)",
+                          (term, df + len(entries), block_count))
+
+    def add_folder(self, folder: str, progress=None) -> int:
+        """Index every text file under folder, committing in batches"""
+        added = 0
+        batch = []
+        for root, _, files in os.walk(folder):
+            for name in files:
+                path = os.path.join(root, name)
+                if os.path.splitext(name)[1].lower() not in TEXT_EXTENSIONS:
+                    continue
+                try:
+                    if os.path.getsize(path) > MAX_FILE_BYTES:
+                        continue
+                    with open(path, encoding="utf-8", errors="ignore") as f:
+                        body = f.read()
+                except OSError:
+                    continue
+                snippet = " ".join(body.split())[:300] or "No description available."
+                batch.append((f"file://{os.path.abspath(path)}", name, snippet, body))
+                if len(batch) >= 500:
+                    added += self.add_documents(batch)
+                    batch = []
+                    if progress:
+                        progress(added)
+        added += self.add_documents(batch)
+        if progress:
+            progress(added)
+        return added
+
+    # ---------- QUERY ---------- #
+    def read_block(self, term: str, block_no: int, first_doc: int) -> Tuple[List[int], List[int]]:
+        data = self.conn.execute("SELECT data FROM blocks WHERE term = ? AND block_no = ?",
+                                 (term, block_no)).fetchone()[0]
+        return decode_block(data, first_doc - 1)
+
+    def _cursors(self, query: str) -> List[PostingCursor]:
+        cursors = []
+        for term in set(tokenize(query)):
+            row = self.conn.execute("SELECT df FROM terms WHERE term = ?", (term,)).fetchone()
+            if not row:
+                continue
+            blocks = self.conn.execute(
+                "SELECT block_no, first_doc, last_doc, max_tf, min_len FROM blocks "
+                "WHERE term = ? ORDER BY block_no", (term,)).fetchall()
+            cursors.append(PostingCursor(self, term, self.idf(row[0]), blocks))
+        return cursors
+
+    def search_ids(self, query: str, k: int = 25) -> List[Tuple[int, float]]:
+        """Top-k (doc id, BM25 score) using MaxScore dynamic pruning"""
+        with self.lock:
+            cursors = sorted(self._cursors(query), key=lambda c: c.upper_bound)
+            if not cursors:
+                return []
+            # prefix[i] = sum of upper bounds of cursors[0..i]
+            prefix, total = [], 0.0
+            for c in cursors:
+                total += c.upper_bound
+                prefix.append(total)
+
+            heap: List[Tuple[float, int]] = []
+            threshold = 0.0
+            first_essential = 0
+            while first_essential < len(cursors):
+                essential = cursors[first_essential:]
+                doc = min(c.doc for c in essential)
+                if doc == math.inf:
+                    break
+                score = 0.0
+                for c in essential:
+                    if c.doc == doc:
+                        score += c.score()
+                        c.next()
+                # Non-essential lists can only add their upper bounds, check before seeking
+                for i in range(first_essential - 1, -1, -1):
+                    if score + prefix[i] <= threshold:
+                        break
+                    c = cursors[i]
+                    c.seek(doc)
+                    if c.doc == doc:
+                        score += c.score()
+                if len(heap) < k:
+                    heapq.heappush(heap, (score, -doc))
+                elif score > heap[0][0]:
+                    heapq.heapreplace(heap, (score, -doc))
+                else:
+                    continue
+                if len(heap) == k:
+                    threshold = heap[0][0]
+                    while first_essential < len(cursors) and prefix[first_essential] <= threshold:
+                        first_essential += 1
+            return [(-neg_doc, score) for score, neg_doc in sorted(heap, reverse=True)]
+
+    def get_documents(self, doc_ids: List[int]) -> Dict[int, IndexedDocument]:
+        if not doc_ids:
+            return {}
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT id, title, url, snippet FROM docs WHERE id IN ({','.join('?' * len(doc_ids))})",
+                doc_ids).fetchall()
+        return {row[0]: IndexedDocument(*row) for row in rows}
+
+    def search(self, query: str, k: int = 25) -> List[Tuple[IndexedDocument, float]]:
+        hits = self.search_ids(query, k)
+        docs = self.get_documents([doc_id for doc_id, _ in hits])
+        return [(docs[doc_id], score) for doc_id, score in hits if doc_id in docs]
+
+# ---------------- CLI ---------------- #
+def synthetic_corpus(count: int, vocab_size: int = 50000, seed: int = 7):
+    """Yield documents whose words follow a Zipf-like distribution"""
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(vocab_size)]
+    cum_weights = list(itertools.accumulate(1 / (i + 1) for i in range(vocab_size)))
+    for n in range(count):
+        words = rng.choices(vocab, cum_weights=cum_weights, k=rng.randint(20, 80))
+        yield (f"synthetic://{n}", f"Document {n}", " ".join(words[:20]), " ".join(words[20:]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FutureSearch offline index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_ingest = sub.add_parser("ingest", help="Index a folder of text files")
+    p_ingest.add_argument("folder")
+    p_query = sub.add_parser("query", help="Search the index")
+    p_query.add_argument("query")
+    p_query.add_argument("-k", type=int, default=10)
+    p_bench = sub.add_parser("bench", help="Build a synthetic index and time queries")
+    p_bench.add_argument("--docs", type=int, default=1_000_000)
+    p_bench.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--index", default=INDEX_FILE)
+    args = parser.parse_args()
+
+    if args.command == "bench" and args.index == INDEX_FILE:
+        args.index = f"bench_{args.docs}.db"
+    index = InvertedIndex(args.index)
+
+    if args.command == "ingest":
+        added = index.add_folder(args.folder, progress=lambda n: print(f"\rIndexed {n} files", end=""))
+        print(f"\nAdded {added} documents, {index.doc_count} total")
+
+    elif args.command == "query":
+        start = time.perf_counter()
+        results = index.search(args.query, args.k)
+        elapsed = (time.perf_counter() - start) * 1000
+        for doc, score in results:
+            print(f"{score:7.3f}  {doc.title}  {doc.url}")
+        print(f"{len(results)} results in {elapsed:.1f} ms over {index.doc_count} documents")
+
+    elif args.command == "bench":
+        if index.doc_count < args.docs:
+            start = time.perf_counter()
+            corpus = synthetic_corpus(args.docs)
+            batch = []
+            for n, doc in enumerate(corpus):
+                if n < index.doc_count:
+                    continue
+                batch.append(doc)
+                if len(batch) == 20000:
+                    index.add_documents(batch)
+                    batch = []
+                    print(f"\rIndexed {index.doc_count} documents", end="", file=sys.stderr)
+            index.add_documents(batch)
+            print(f"\nBuilt index in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+        rng = random.Random(11)
+        queries = [" ".join(f"w{rng.randint(0, 2000)}" for _ in range(rng.randint(1, 4)))
+                   for _ in range(args.queries)]
+        timings = []
+        for q in queries:
+            start = time.perf_counter()
+            index.search_ids(q, 10)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        print(f"{index.doc_count} docs | {len(queries)} queries | "
+              f"p50 {timings[len(timings) // 2]:.1f} ms | p95 {timings[int(len(timings) * 0.95)]:.1f} ms")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
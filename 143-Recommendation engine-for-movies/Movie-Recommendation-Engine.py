@@ -3,10 +3,13 @@ import webbrowser
 import tkinter as tk
 from tkinter import messagebox
 from dataclasses import dataclass
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple
 import requests
-import io
-from PIL import Image, ImageTk  # pip install pillow
+import os
+
+from image_service import ImageService
+from movie_fetcher import OmdbClient
+from movie_scoring import MovieScorer
 
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
@@ -16,11 +19,14 @@ from ttkbootstrap.widgets.scrolled import ScrolledText
 RESULTS_PER_PAGE = 6
 OMDB_API_KEY = "YOUR_OMDB_API_KEY"  # ← replace with your OMDb API key
 OMDB_SEARCH_URL = "http://www.omdbapi.com/"
+POSTER_SIZE = (100, 150)
 
 # ---------------- GLOBAL STATE ---------------- #
 all_ranked_movies: List[Tuple["Movie", float]] = []
 current_page = 1
-poster_cache: Dict[str, ImageTk.PhotoImage] = {}
+images = ImageService()  # Disk + memory poster cache shared by every page
+omdb = OmdbClient(OMDB_API_KEY, OMDB_SEARCH_URL)
+movie_scorer = MovieScorer()  # Every fetched or cached movie, pre-tokenized
 
 # ---------------- DATA STRUCTURE ---------------- #
 @dataclass
@@ -36,40 +42,29 @@ class Movie:
     rating: float = 0.0
 
 # ---------------- SEARCH / FETCH ---------------- #
+def movie_from_details(imdb_id: str, detail_resp: dict) -> Movie:
+    genres = detail_resp.get("Genre", "")
+    actors = detail_resp.get("Actors", "")
+    return Movie(
+        title=detail_resp.get("Title", "Unknown"),
+        imdb_id=imdb_id,
+        url=f"https://www.imdb.com/title/{imdb_id}/",
+        description=detail_resp.get("Plot", ""),
+        poster_url=detail_resp.get("Poster", ""),
+        genres=[g.strip() for g in genres.split(",")] if genres else [],
+        director=detail_resp.get("Director", ""),
+        actors=[a.strip() for a in actors.split(",")] if actors else [],
+        rating=float(detail_resp.get("imdbRating", 0.0)) if detail_resp.get("imdbRating") not in (None, "N/A") else 0.0
+    )
+
 def fetch_movies(query: str) -> List[Movie]:
     """Fetch movies from OMDb API matching the query."""
     movies: List[Movie] = []
     try:
-        params = {"apikey": OMDB_API_KEY, "s": query, "type": "movie"}
-        resp = requests.get(OMDB_SEARCH_URL, params=params, timeout=10)
-        data = resp.json()
-
-        if data.get("Response") != "True":
-            return []
-
-        for item in data.get("Search", []):
-            imdb_id = item.get("imdbID")
-            detail_resp = requests.get(
-                OMDB_SEARCH_URL,
-                params={"apikey": OMDB_API_KEY, "i": imdb_id, "plot": "short"},
-                timeout=10
-            ).json()
-
-            genres = detail_resp.get("Genre", "")
-            actors = detail_resp.get("Actors", "")
-            movies.append(
-                Movie(
-                    title=detail_resp.get("Title", "Unknown"),
-                    imdb_id=imdb_id,
-                    url=f"https://www.imdb.com/title/{imdb_id}/",
-                    description=detail_resp.get("Plot", ""),
-                    poster_url=detail_resp.get("Poster", ""),
-                    genres=[g.strip() for g in genres.split(",")] if genres else [],
-                    director=detail_resp.get("Director", ""),
-                    actors=[a.strip() for a in actors.split(",")] if actors else [],
-                    rating=float(detail_resp.get("imdbRating", 0.0)) if detail_resp.get("imdbRating") != "N/A" else 0.0
-                )
-            )
+        # Detail lookups run concurrently and are cached per IMDb ID
+        for detail_resp in omdb.search(query):
+            if detail_resp.get("Response") == "True":
+                movies.append(movie_from_details(detail_resp.get("imdbID", ""), detail_resp))
     except requests.RequestException as e:
         messagebox.showerror("API Error", f"Network error: {e}")
     except Exception as e:
@@ -79,44 +74,39 @@ def fetch_movies(query: str) -> List[Movie]:
 # ---------------- RECOMMENDATION ENGINE ---------------- #
 def recommend_movies(query: str, candidates: List[Movie], top_n=RESULTS_PER_PAGE) -> List[Tuple[Movie, float]]:
     """
-    Simple content-based recommendation:
-    Scores movies by overlap with query in title, description, and genres
+    Content-based recommendation over every movie seen so far:
+    whole-word query matches in title, description and genres, plus genre,
+    actor and director overlap, scored with sparse matrix products
     """
-    query_tokens = set(query.lower().split())
-    recommendations: List[Tuple[Movie, float]] = []
-
-    for movie in candidates:
-        text_to_match = " ".join([
-            movie.title.lower(),
-            movie.description.lower(),
-            " ".join(movie.genres or [])
-        ])
-        score = sum(1 for token in query_tokens if token in text_to_match)
-        recommendations.append((movie, score))
-
-    # Sort descending by score
-    recommendations.sort(key=lambda x: x[1], reverse=True)
-    return recommendations[:top_n]
+    movie_scorer.add(candidates)
+    recommendations = movie_scorer.recommend(query, top_n=top_n)
+
+    # Fresh search hits are always listed, even without a keyword match
+    seen = {movie.imdb_id for movie, _ in recommendations}
+    recommendations += [(movie, 0.0) for movie in candidates if movie.imdb_id not in seen]
+    return recommendations
+
+def load_cached_catalog():
+    """Add every movie in the OMDb detail cache to the scorer"""
+    movies = []
+    for name in os.listdir(omdb.cache_dir):
+        if name.endswith(".json"):
+            detail_resp = omdb.cached_details(name[:-5])
+            if detail_resp and detail_resp.get("Response") == "True":
+                movies.append(movie_from_details(name[:-5], detail_resp))
+    movie_scorer.add(movies)
 
 # ---------------- UI HELPERS ---------------- #
 def open_url(url: str):
     webbrowser.open_new_tab(url)
 
-def load_image(url: str, size=(100, 150)) -> Optional[ImageTk.PhotoImage]:
-    """Load poster image from URL, with caching."""
-    if not url or url == "N/A":
-        return None
-    if url in poster_cache:
-        return poster_cache[url]
-    try:
-        resp = requests.get(url, timeout=10)
-        img = Image.open(io.BytesIO(resp.content))
-        img = img.resize(size, Image.ANTIALIAS)
-        photo = ImageTk.PhotoImage(img)
-        poster_cache[url] = photo
-        return photo
-    except Exception:
-        return None
+def poster_url(movie: "Movie") -> str:
+    return "" if movie.poster_url == "N/A" else movie.poster_url
+
+def set_image(label, photo):
+    if label.winfo_exists():
+        label.configure(image=photo)
+        label.image = photo
 
 def display_page():
     text.configure(state="normal")
@@ -142,17 +132,21 @@ def display_page():
         text.insert("end", f"{movie.url}  |  Rating: {movie.rating}\n", f"url_{idx}")
         text.tag_config(f"url_{idx}", foreground="#006621", font=("Segoe UI", 10))
 
-        # Poster
-        poster = load_image(movie.poster_url)
-        if poster:
-            text.image_create("end", image=poster)
+        # Poster, filled in by the image service without blocking the UI
+        if poster_url(movie):
+            poster_label = tk.Label(text)
+            text.window_create("end", window=poster_label)
             text.insert("end", "\n")
+            images.request(poster_url(movie), POSTER_SIZE, text,
+                           lambda photo, label=poster_label: set_image(label, photo))
 
         # Description & genres
         genres = ", ".join(movie.genres or [])
         text.insert("end", f"{movie.description}\nGenres: {genres}\n\n")
 
     text.configure(state="disabled")
+    # Posters of the next page load while this one is being read
+    images.prefetch((poster_url(m) for m, _ in all_ranked_movies[end:end + RESULTS_PER_PAGE]), POSTER_SIZE, text)
     update_pagination()
 
 # ---------------- PAGINATION ---------------- #
@@ -187,7 +181,7 @@ def search_thread(query: str):
     current_page = 1
     candidates = fetch_movies(query)
     all_ranked_movies = recommend_movies(query, candidates, top_n=50)  # get top 50 recommendations
-    display_page()
+    app.after(0, display_page)
 
 # ---------------- UI SETUP ---------------- #
 app = tb.Window(title="Movie Recommendation Engine", themename="flatly", size=(980, 720), resizable=(True, True))
@@ -225,4 +219,7 @@ page_label.pack(side=tk.LEFT, padx=10)
 next_btn = tb.Button(nav, text="Next →", bootstyle="secondary", command=next_page)
 next_btn.pack(side=tk.LEFT)
 
+# Previously fetched movies are recommendable before the first search
+threading.Thread(target=load_cached_catalog, daemon=True).start()
+
 app.mainloop()
@@ -0,0 +1,101 @@
+"""
+Page fetch latency against a local stub OMDb server with simulated round-trip time.
+
+Compares the old fetch pattern (search + one sequential requests.get per hit)
+with OmdbClient cold (pooled, concurrent details) and warm (details cached).
+
+    python benchmark_fetch.py [--rtt 0.05] [--hits 10]
+"""
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+from movie_fetcher import OmdbClient
+
+
+def make_handler(rtt, hits):
+    class StubOmdb(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Allow keep-alive
+
+        def do_GET(self):
+            params = parse_qs(urlparse(self.path).query)
+            time.sleep(rtt)
+            if "s" in params:
+                body = {"Response": "True", "Search": [
+                    {"Title": f"Movie {n}", "imdbID": f"tt{n:07d}"} for n in range(hits)]}
+            else:
+                imdb_id = params["i"][0]
+                body = {"Response": "True", "imdbID": imdb_id, "Title": f"Movie {imdb_id}",
+                        "Genre": "Drama, Comedy", "Actors": "A, B", "Director": "C",
+                        "Plot": "A stub plot.", "Poster": "N/A", "imdbRating": "7.1"}
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return StubOmdb
+
+
+def sequential_fetch(url, query):
+    """The recommender's original pattern: fresh connection per request, details one by one"""
+    data = requests.get(url, params={"apikey": "x", "s": query, "type": "movie"}, timeout=10).json()
+    return [requests.get(url, params={"apikey": "x", "i": item["imdbID"], "plot": "short"}, timeout=10).json()
+            for item in data["Search"]]
+
+
+def timed(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OMDb fetch benchmark against a local stub server")
+    parser.add_argument("--rtt", type=float, default=0.05, help="Simulated round-trip time (s)")
+    parser.add_argument("--hits", type=int, default=10, help="Hits per search page")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.rtt, args.hits))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    cache_dir = tempfile.mkdtemp(prefix="omdb_bench_")
+
+    try:
+        old = timed(lambda: sequential_fetch(url, "stub"), args.repeats)
+
+        def cold():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            client = OmdbClient("x", url, cache_dir, max_workers=args.hits)
+            client.search("stub")
+            client.close()
+
+        cold_time = timed(cold, args.repeats)
+        client = OmdbClient("x", url, cache_dir, max_workers=args.hits)
+        warm_time = timed(lambda: client.search("stub"), args.repeats)
+        client.close()
+
+        for name, t in (("sequential", old), ("pooled cold", cold_time), ("pooled warm", warm_time)):
+            print(f"{name:>12}: {t * 1000:8.1f} ms  ({t / args.rtt:5.1f} x RTT)")
+    finally:
+        server.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Scoring latency of MovieScorer over a synthetic catalog.
+
+    python benchmark_scoring.py [--movies 100000]
+"""
+import time
+import random
+import argparse
+from dataclasses import dataclass, field
+from typing import List
+
+from movie_scoring import MovieScorer
+
+WORDS = ("love war space alien detective murder city night dark family road lost king queen "
+         "heist robot future past island ocean secret dream ghost house school game team").split()
+GENRES = ["Action", "Comedy", "Drama", "Horror", "Sci-Fi", "Romance", "Thriller", "Animation"]
+FIRST = ["Tom", "Emma", "Chris", "Anna", "Leo", "Kate", "Sam", "Maya", "John", "Zoe"]
+LAST = ["Hanks", "Stone", "Nolan", "Lee", "Park", "Smith", "Brown", "Garcia", "Kim", "Scott"]
+
+
+@dataclass
+class StubMovie:
+    title: str
+    imdb_id: str
+    description: str
+    genres: List[str] = field(default_factory=list)
+    actors: List[str] = field(default_factory=list)
+    director: str = ""
+
+
+def synthetic_movies(count, seed=3):
+    rng = random.Random(seed)
+    name = lambda: f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+    return [StubMovie(
+        title=" ".join(rng.choices(WORDS, k=3)).title(),
+        imdb_id=f"tt{n:08d}",
+        description=" ".join(rng.choices(WORDS, k=25)),
+        genres=rng.sample(GENRES, 2),
+        actors=[name() for _ in range(3)],
+        director=name(),
+    ) for n in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MovieScorer benchmark")
+    parser.add_argument("--movies", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    movies = synthetic_movies(args.movies)
+    start = time.perf_counter()
+    scorer = MovieScorer(movies)
+    scorer.recommend("warmup")  # Materialize the sparse matrices
+    print(f"Built scorer for {len(scorer)} movies in {time.perf_counter() - start:.2f} s")
+
+    rng = random.Random(5)
+    queries = [f"{rng.choice(WORDS)} {rng.choice(GENRES)} {rng.choice(LAST)}" for _ in range(args.queries)]
+    timings = []
+    for q in queries:
+        start = time.perf_counter()
+        scorer.recommend(q, top_n=50)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"{args.queries} queries | p50 {timings[len(timings) // 2]:.2f} ms | max {timings[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Pooled OMDb client for the movie recommender.
+
+One search request is followed by the detail requests for every hit, which
+run concurrently on a small thread pool over a shared keep-alive Session.
+Detail payloads are cached on disk per IMDb ID, so a page costs about two
+round trips cold and one (the search) once its details are cached.
+"""
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ---------------- CONFIG ---------------- #
+OMDB_URL = "http://www.omdbapi.com/"
+CACHE_DIR = "omdb_cache"
+MAX_WORKERS = 10  # OMDb returns 10 hits per search page
+TIMEOUT = 10
+
+
+class OmdbClient:
+    def __init__(self, api_key: str, base_url: str = OMDB_URL, cache_dir: Optional[str] = CACHE_DIR,
+                 max_workers: int = MAX_WORKERS):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.cache_dir = cache_dir
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="omdb")
+        self.memory: Dict[str, dict] = {}
+        self.lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _get(self, **params) -> dict:
+        resp = self.session.get(self.base_url, params={"apikey": self.api_key, **params}, timeout=TIMEOUT)
+        resp.raise_for_status()
+        return resp.json()
+
+    # ---------- DETAIL CACHE ---------- #
+    def _cache_path(self, imdb_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{imdb_id}.json")
+
+    def cached_details(self, imdb_id: str) -> Optional[dict]:
+        with self.lock:
+            if imdb_id in self.memory:
+                return self.memory[imdb_id]
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._cache_path(imdb_id), encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        with self.lock:
+            self.memory[imdb_id] = data
+        return data
+
+    def _store_details(self, imdb_id: str, data: dict):
+        with self.lock:
+            self.memory[imdb_id] = data
+        if self.cache_dir:
+            tmp = self._cache_path(imdb_id) + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self._cache_path(imdb_id))
+
+    def details(self, imdb_id: str) -> dict:
+        data = self.cached_details(imdb_id)
+        if data is None:
+            data = self._get(i=imdb_id, plot="short")
+            if data.get("Response") == "True":
+                self._store_details(imdb_id, data)
+        return data
+
+    # ---------- SEARCH ---------- #
+    def search(self, query: str) -> List[dict]:
+        """Search hits with their detail payloads, in search order"""
+        data = self._get(s=query, type="movie")
+        if data.get("Response") != "True":
+            return []
+        ids = [item["imdbID"] for item in data.get("Search", []) if item.get("imdbID")]
+        return list(self.executor.map(self.details, ids))
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.session.close()
@@ -0,0 +1,144 @@
+"""
+Vectorized content scoring for the movie recommender.
+
+Every movie added to a MovieScorer is tokenized once into a row of a sparse
+binary term matrix (title, plot and genres, whole words only) and one-hot rows
+for its genres, actors and director. A query is scored against all movies with
+one sparse matrix-vector product per field; top-k uses argpartition.
+
+Movies only need title, imdb_id, description, genres, actors and director
+attributes.
+"""
+import re
+import threading
+from array import array
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+TOKEN_RE = re.compile(r"\w+")
+
+# ---------------- CONFIG ---------------- #
+TEXT_WEIGHT = 1.0
+GENRE_WEIGHT = 1.0
+ACTOR_WEIGHT = 1.5
+DIRECTOR_WEIGHT = 1.5
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+# ---------------- SPARSE FIELD ---------------- #
+class SparseField:
+    """Binary rows over a growing vocabulary, materialized to CSR on demand"""
+
+    def __init__(self):
+        self.vocab: Dict[str, int] = {}
+        self.indices = array("i")
+        self.indptr = array("q", [0])
+        self.cached = None
+
+    def add_row(self, keys: Iterable[str]):
+        cols = {self.vocab.setdefault(k, len(self.vocab)) for k in keys if k}
+        self.indices.extend(sorted(cols))
+        self.indptr.append(len(self.indices))
+        self.cached = None
+
+    def matrix(self) -> sparse.csr_matrix:
+        if self.cached is None:
+            # Copy out of the arrays so they stay resizable
+            indices = np.frombuffer(self.indices, dtype=np.int32).copy() if self.indices else np.zeros(0, np.int32)
+            data = np.ones(len(indices), dtype=np.float32)
+            self.cached = sparse.csr_matrix(
+                (data, indices, np.frombuffer(self.indptr, dtype=np.int64).copy()),
+                shape=(len(self.indptr) - 1, max(1, len(self.vocab))))
+        return self.cached
+
+    def query_vector(self, keys: Dict[str, float]) -> np.ndarray:
+        vec = np.zeros(max(1, len(self.vocab)), dtype=np.float32)
+        for key, weight in keys.items():
+            col = self.vocab.get(key)
+            if col is not None:
+                vec[col] = weight
+        return vec
+
+
+class EntityField(SparseField):
+    """One-hot names (genres, actors, directors) with a word index for query matching"""
+
+    def __init__(self):
+        super().__init__()
+        self.words: Dict[str, List[int]] = {}  # word -> columns of names containing it
+        self.name_lengths: List[int] = []
+
+    def add_row(self, keys: Iterable[str]):
+        keys = [k for k in keys if k]
+        for key in keys:
+            if key not in self.vocab:
+                words = set(tokenize(key))
+                for word in words:
+                    self.words.setdefault(word, []).append(len(self.name_lengths))
+                self.name_lengths.append(max(1, len(words)))
+                self.vocab[key] = len(self.vocab)
+        super().add_row(keys)
+
+    def overlap(self, query_tokens: set) -> np.ndarray:
+        """Fraction of each name's words that appear in the query"""
+        vec = np.zeros(max(1, len(self.vocab)), dtype=np.float32)
+        for token in query_tokens:
+            for col in self.words.get(token, ()):
+                vec[col] += 1.0 / self.name_lengths[col]
+        return vec
+
+# ---------------- SCORER ---------------- #
+class MovieScorer:
+    def __init__(self, movies: Iterable = ()):
+        self.movies: List = []
+        self.rows: Dict[str, int] = {}  # imdb_id -> row
+        self.text = SparseField()
+        self.fields = {"genre": EntityField(), "actor": EntityField(), "director": EntityField()}
+        self.lock = threading.Lock()
+        self.add(movies)
+
+    def __len__(self):
+        return len(self.movies)
+
+    def add(self, movies: Iterable) -> int:
+        """Add movies not seen before (by IMDb ID); returns how many were added"""
+        added = 0
+        with self.lock:
+            for movie in movies:
+                if movie.imdb_id in self.rows:
+                    continue
+                self.rows[movie.imdb_id] = len(self.movies)
+                self.movies.append(movie)
+                genres = movie.genres or []
+                self.text.add_row(tokenize(" ".join([movie.title, movie.description, " ".join(genres)])))
+                self.fields["genre"].add_row(g.lower() for g in genres)
+                self.fields["actor"].add_row(a.lower() for a in movie.actors or [])
+                self.fields["director"].add_row(d.strip().lower() for d in (movie.director or "").split(","))
+                added += 1
+        return added
+
+    def scores(self, query: str) -> np.ndarray:
+        query_tokens = set(tokenize(query))
+        with self.lock:
+            if not self.movies:
+                return np.zeros(0, dtype=np.float32)
+            total = TEXT_WEIGHT * (self.text.matrix() @ self.text.query_vector(dict.fromkeys(query_tokens, 1.0)))
+            for name, weight in (("genre", GENRE_WEIGHT), ("actor", ACTOR_WEIGHT), ("director", DIRECTOR_WEIGHT)):
+                field = self.fields[name]
+                overlap = field.overlap(query_tokens)
+                if overlap.any():
+                    total += weight * (field.matrix() @ overlap)
+            return total
+
+    def recommend(self, query: str, top_n: int = 50) -> List[Tuple[object, float]]:
+        """Top-n movies with a positive score, best first"""
+        scores = self.scores(query)
+        matching = np.flatnonzero(scores > 0)
+        if len(matching) > top_n:
+            matching = matching[np.argpartition(scores[matching], -top_n)[-top_n:]]
+        order = matching[np.argsort(-scores[matching], kind="stable")]
+        return [(self.movies[i], float(scores[i])) for i in order]
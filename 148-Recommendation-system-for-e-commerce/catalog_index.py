@@ -0,0 +1,277 @@
+"""
+Persistent ANN index over the product catalog.
+
+The build step embeds every product (hashed TF-IDF reduced with truncated SVD)
+into an L2-normalized float32 matrix stored as a memory-mapped .npy file, then
+groups the rows into an IVF index: spherical k-means centroids plus one
+contiguous block of rows per centroid. A query only scores the rows of its
+NPROBE nearest centroids, so search and "similar to this product" cost
+sub-linear time and read a few contiguous slices of the memory map.
+
+    python catalog_index.py build [products.json]       # (re)build the index
+    python catalog_index.py query "wireless headphones"
+    python catalog_index.py bench --products 1000000    # synthetic catalog
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+
+# ---------------- CONFIG ---------------- #
+INDEX_DIR = "catalog_index"
+HASH_FEATURES = 2 ** 17
+DIM = 128
+SVD_SAMPLE = 100_000
+KMEANS_SAMPLE = 50_000
+KMEANS_ITERATIONS = 12
+NPROBE = 16
+CHUNK = 50_000
+
+
+def product_text(p: dict) -> str:
+    return f"{p.get('name', '')} {p.get('brand', '')} {p.get('category', '')} {p.get('description', '')}"
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return x / norms
+
+# ---------------- EMBEDDING ---------------- #
+class Embedder:
+    """Hashed TF-IDF followed by a truncated SVD projection"""
+
+    def __init__(self, idf: np.ndarray, components: np.ndarray):
+        self.hasher = HashingVectorizer(n_features=len(idf), alternate_sign=False, norm=None,
+                                        stop_words="english")
+        self.idf = idf.astype(np.float32)
+        self.components = components.astype(np.float32)  # (dim, n_features)
+        # Row-major (n_features, dim) so a sparse product only touches rows of present terms
+        self.projection = np.ascontiguousarray(self.components.T)
+
+    @classmethod
+    def fit(cls, texts: Sequence[str], dim: int = DIM, n_features: int = HASH_FEATURES, seed: int = 0):
+        hasher = HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None, stop_words="english")
+        counts = hasher.transform(texts)
+        tfidf = TfidfTransformer(sublinear_tf=True).fit(counts)
+        dim = max(1, min(dim, counts.shape[0] - 1))
+        svd = TruncatedSVD(n_components=dim, random_state=seed).fit(tfidf.transform(counts))
+        return cls(tfidf.idf_, svd.components_)
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        counts = self.hasher.transform(texts)
+        counts.data = 1 + np.log(counts.data)  # Sublinear tf, as in fit
+        weighted = counts.multiply(self.idf).tocsr()
+        if weighted.shape[0] > 64:
+            return _normalize(np.asarray(weighted @ self.projection, dtype=np.float32))
+        # For a few queries, gathering the rows of present terms beats a full sparse product
+        out = np.empty((weighted.shape[0], self.projection.shape[1]), dtype=np.float32)
+        for i in range(weighted.shape[0]):
+            lo, hi = weighted.indptr[i], weighted.indptr[i + 1]
+            out[i] = weighted.data[lo:hi].astype(np.float32) @ self.projection[weighted.indices[lo:hi]]
+        return _normalize(out)
+
+# ---------------- K-MEANS ---------------- #
+def spherical_kmeans(x: np.ndarray, k: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centroids = x[rng.choice(len(x), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(x @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        empty = ~sums.any(axis=1)
+        sums[empty] = x[rng.choice(len(x), size=int(empty.sum()))]  # Reseed empty clusters
+        centroids = _normalize(sums)
+    return centroids
+
+# ---------------- INDEX ---------------- #
+class CatalogIndex:
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        load = lambda name, **kw: np.load(os.path.join(path, f"{name}.npy"), **kw)
+        self.embedder = Embedder(load("idf"), load("components"))
+        self.centroids = load("centroids")
+        self.offsets = load("offsets")
+        self.ids = load("ids", mmap_mode="r")  # position -> product row
+        self.positions = load("positions", mmap_mode="r")  # product row -> position
+        self.vectors = load("vectors", mmap_mode="r")  # ordered by cluster
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ---------- BUILD ---------- #
+    @classmethod
+    def build(cls, texts: Sequence[str], path: str = INDEX_DIR, source: dict = None,
+              dim: int = DIM, progress: Callable[[str], None] = None) -> "CatalogIndex":
+        if len(texts) < 2:
+            raise ValueError("Need at least two products to build an index")
+        say = progress or (lambda msg: None)
+        os.makedirs(path, exist_ok=True)
+        rng = np.random.default_rng(0)
+        n = len(texts)
+
+        say("Fitting embedding")
+        sample = rng.choice(n, size=min(n, SVD_SAMPLE), replace=False)
+        embedder = Embedder.fit([texts[i] for i in sample], dim)
+        dim = embedder.components.shape[0]
+
+        say("Embedding catalog")
+        raw = np.lib.format.open_memmap(os.path.join(path, "raw.npy"), mode="w+", dtype=np.float32, shape=(n, dim))
+        for start in range(0, n, CHUNK):
+            raw[start:start + CHUNK] = embedder.embed(texts[start:start + CHUNK])
+            say(f"Embedded {min(n, start + CHUNK):,} / {n:,}")
+
+        say("Clustering")
+        n_lists = max(1, min(int(4 * np.sqrt(n)), n // 8 or 1))
+        sample = rng.choice(n, size=min(n, max(KMEANS_SAMPLE, 4 * n_lists)), replace=False)
+        centroids = spherical_kmeans(np.asarray(raw[np.sort(sample)]), n_lists)
+        assign = np.empty(n, dtype=np.int32)
+        for start in range(0, n, CHUNK):
+            assign[start:start + CHUNK] = np.argmax(raw[start:start + CHUNK] @ centroids.T, axis=1)
+
+        # Rows of each list are stored contiguously so a probe is one slice read
+        ids = np.argsort(assign, kind="stable").astype(np.int64)
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=n_lists), out=offsets[1:])
+        positions = np.empty(n, dtype=np.int64)
+        positions[ids] = np.arange(n)
+        vectors = np.lib.format.open_memmap(os.path.join(path, "vectors.npy"), mode="w+", dtype=np.float32, shape=(n, dim))
+        for start in range(0, n, CHUNK):
+            vectors[start:start + CHUNK] = raw[ids[start:start + CHUNK]]
+        vectors.flush()
+        del raw, vectors
+        os.remove(os.path.join(path, "raw.npy"))
+
+        for name, arr in (("idf", embedder.idf), ("components", embedder.components), ("centroids", centroids),
+                          ("offsets", offsets), ("ids", ids), ("positions", positions)):
+            np.save(os.path.join(path, f"{name}.npy"), arr)
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"count": n, "dim": dim, "lists": n_lists, "source": source or {}}, f, indent=2)
+        say("Index ready")
+        return cls(path)
+
+    @staticmethod
+    def source_signature(products_file: str) -> dict:
+        st = os.stat(products_file)
+        return {"size": st.st_size, "mtime": st.st_mtime}
+
+    def is_current(self, products_file: str) -> bool:
+        return self.meta.get("source") == self.source_signature(products_file)
+
+    # ---------- SEARCH ---------- #
+    def search_vector(self, vec: np.ndarray, k: int = 10, nprobe: int = NPROBE,
+                      exclude: int = -1) -> List[Tuple[int, float]]:
+        """Top-k (product row, cosine) among the rows of the nprobe closest lists"""
+        nprobe = min(nprobe, len(self.centroids))
+        lists = np.argpartition(-(self.centroids @ vec), nprobe - 1)[:nprobe]
+        best_rows, best_scores = [], []
+        for lst in lists:
+            lo, hi = self.offsets[lst], self.offsets[lst + 1]
+            if lo == hi:
+                continue
+            scores = self.vectors[lo:hi] @ vec
+            take = min(k + 1, hi - lo)
+            top = np.argpartition(-scores, take - 1)[:take]
+            best_rows.append(np.asarray(self.ids[lo:hi])[top])
+            best_scores.append(scores[top])
+        if not best_rows:
+            return []
+        rows, scores = np.concatenate(best_rows), np.concatenate(best_scores)
+        keep = rows != exclude
+        rows, scores = rows[keep], scores[keep]
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [(int(rows[i]), float(scores[i])) for i in order]
+
+    def search(self, query: str, k: int = 10, nprobe: int = NPROBE) -> List[Tuple[int, float]]:
+        return self.search_vector(self.embedder.embed([query])[0], k, nprobe)
+
+    def similar(self, row: int, k: int = 10, nprobe: int = NPROBE) -> List[Tuple[int, float]]:
+        vec = np.asarray(self.vectors[self.positions[row]])
+        return self.search_vector(vec, k, nprobe, exclude=row)
+
+# ---------------- CLI ---------------- #
+def synthetic_products(count: int, seed: int = 1) -> List[dict]:
+    rng = np.random.default_rng(seed)
+    nouns = np.array("headphones shoes watch shirt jacket lamp chair desk phone case bottle bag camera "
+                     "speaker keyboard mouse monitor blender kettle pan knife tent backpack sofa rug".split())
+    adjectives = np.array("wireless running smart cotton leather wooden portable steel waterproof "
+                          "ergonomic compact vintage premium lightweight foldable digital".split())
+    brands = np.array([f"Brand{i}" for i in range(200)])
+    cats = np.array("Electronics Footwear Clothing Home Kitchen Outdoor Office Sports".split())
+    a = rng.integers(0, len(adjectives), (count, 3))
+    nn = rng.integers(0, len(nouns), count)
+    return [{"name": f"{adjectives[a[i, 0]]} {nouns[nn[i]]}", "brand": brands[i % len(brands)],
+             "category": cats[nn[i] % len(cats)],
+             "description": f"{adjectives[a[i, 1]]} {adjectives[a[i, 2]]} {nouns[nn[i]]} with {nouns[(nn[i] + i) % len(nouns)]}"}
+            for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Product catalog ANN index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build")
+    p_build.add_argument("products", nargs="?", default="products.json")
+    p_query = sub.add_parser("query")
+    p_query.add_argument("query")
+    p_query.add_argument("-k", type=int, default=10)
+    p_bench = sub.add_parser("bench")
+    p_bench.add_argument("--products", type=int, default=1_000_000)
+    p_bench.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--index", default=INDEX_DIR)
+    args = parser.parse_args()
+    log = lambda msg: print(msg, file=sys.stderr)
+
+    if args.command == "build":
+        with open(args.products, encoding="utf-8") as f:
+            products = json.load(f)
+        start = time.perf_counter()
+        index = CatalogIndex.build([product_text(p) for p in products], args.index,
+                                   CatalogIndex.source_signature(args.products), progress=log)
+        print(f"Indexed {len(index):,} products in {time.perf_counter() - start:.1f} s")
+
+    elif args.command == "query":
+        index = CatalogIndex(args.index)
+        start = time.perf_counter()
+        hits = index.search(args.query, args.k)
+        print(f"{len(hits)} hits in {(time.perf_counter() - start) * 1000:.2f} ms")
+        for row, score in hits:
+            print(f"{score:.3f}  row {row}")
+
+    elif args.command == "bench":
+        path = args.index if args.index != INDEX_DIR else f"bench_catalog_{args.products}"
+        products = synthetic_products(args.products)
+        texts = [product_text(p) for p in products]
+        start = time.perf_counter()
+        index = CatalogIndex.build(texts, path, progress=log)
+        print(f"Built {len(index):,}-product index ({index.meta['lists']} lists) in {time.perf_counter() - start:.1f} s")
+
+        rng = np.random.default_rng(2)
+        queries = [products[i]["name"] for i in rng.integers(0, len(products), args.queries)]
+        vecs = index.embedder.embed(queries)
+        timings, recall = [], []
+        for q, vec in zip(queries, vecs):
+            start = time.perf_counter()
+            hits = index.search(q, 10)
+            timings.append((time.perf_counter() - start) * 1000)
+            # Brute-force top 10 over the full matrix; ties make recall a lower bound
+            exact = set(index.ids[np.argsort(-(index.vectors @ vec))[:10]].tolist())
+            recall.append(len(exact & {row for row, _ in hits}) / 10)
+        timings.sort()
+        print(f"{args.queries} queries | p50 {timings[len(timings) // 2]:.2f} ms | "
+              f"p95 {timings[int(len(timings) * 0.95)]:.2f} ms | recall@10 {np.mean(recall):.3f}")
+        start = time.perf_counter()
+        for row in rng.integers(0, len(products), args.queries):
+            index.similar(int(row), 10)
+        print(f"similar(): {(time.perf_counter() - start) / args.queries * 1000:.2f} ms/lookup")
+
+
+if __name__ == "__main__":
+    main()
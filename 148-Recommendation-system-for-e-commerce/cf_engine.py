@@ -0,0 +1,158 @@
+"""
+Implicit-feedback item-item collaborative filtering.
+
+Interactions (views, opens, favorites) are appended to a JSON-lines log with
+the session they happened in. Items that show up in the same session
+co-occur; similarity is the cosine of their co-occurrence counts
+(C = R^T R over the session x item matrix R). The top-N neighbours of every
+item are kept in a lookup table, so serving a recommendation is a dict read.
+
+On startup the log is replayed with one sparse matrix product. New
+interactions update the co-occurrence rows and the neighbour lists of the
+affected items incrementally.
+"""
+import os
+import json
+import math
+import time
+import heapq
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# ---------------- CONFIG ---------------- #
+INTERACTIONS_FILE = "interactions.jsonl"
+TOP_N = 20
+EVENT_WEIGHTS = {"view": 1.0, "open": 2.0, "favorite": 5.0}
+FAVORITES_SESSION = "favorites"  # Every favorite also lands in this shared session
+
+
+class ItemCF:
+    def __init__(self, log_file: Optional[str] = INTERACTIONS_FILE, top_n: int = TOP_N):
+        self.log_file = log_file
+        self.top_n = top_n
+        self.lock = threading.RLock()
+        self.sessions: Dict[str, Dict[str, float]] = defaultdict(dict)  # session -> item -> weight
+        self.cooc: Dict[str, Dict[str, float]] = defaultdict(dict)  # item -> item -> co-occurrence
+        self.table: Dict[str, List[Tuple[str, float]]] = {}  # item -> top-N neighbours
+        self.payloads: Dict[str, dict] = {}  # item -> data needed to display it
+        if log_file and os.path.exists(log_file):
+            self.fit(self._read_log())
+
+    def _read_log(self) -> List[dict]:
+        events = []
+        with open(self.log_file, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    continue  # Torn last line after a crash
+        return events
+
+    # ---------- BATCH TRAINING ---------- #
+    def fit(self, events: Iterable[dict]):
+        """Rebuild everything from (session, item, event[, payload]) records"""
+        with self.lock:
+            self.sessions.clear()
+            for e in events:
+                weight = EVENT_WEIGHTS.get(e.get("event"), 1.0)
+                sessions = [e["session"]]
+                if e.get("event") == "favorite" and e["session"] != FAVORITES_SESSION:
+                    sessions.append(FAVORITES_SESSION)  # Same rule as record()
+                for session in sessions:
+                    items = self.sessions[session]
+                    items[e["item"]] = max(items.get(e["item"], 0.0), weight)
+                if e.get("payload"):
+                    self.payloads[e["item"]] = e["payload"]
+
+            item_ids = {item: i for i, item in enumerate({it for s in self.sessions.values() for it in s})}
+            names = [None] * len(item_ids)
+            for item, i in item_ids.items():
+                names[i] = item
+            rows, cols, vals = [], [], []
+            for r, items in enumerate(self.sessions.values()):
+                for item, w in items.items():
+                    rows.append(r)
+                    cols.append(item_ids[item])
+                    vals.append(w)
+            R = sparse.csr_matrix((vals, (rows, cols)), shape=(len(self.sessions), len(item_ids)), dtype=np.float64)
+            C = (R.T @ R).tocsr()
+
+            self.cooc.clear()
+            for i in range(C.shape[0]):
+                lo, hi = C.indptr[i], C.indptr[i + 1]
+                self.cooc[names[i]] = {names[j]: float(v) for j, v in zip(C.indices[lo:hi], C.data[lo:hi])}
+            self.table = {item: self._neighbours(item) for item in self.cooc}
+
+    # ---------- INCREMENTAL UPDATES ---------- #
+    def record(self, session: str, item: str, event: str, payload: Optional[dict] = None):
+        """Log one interaction and update the affected neighbour lists"""
+        entry = {"session": session, "item": item, "event": event, "ts": time.time()}
+        if payload:
+            entry["payload"] = payload
+        with self.lock:
+            if self.log_file:
+                with open(self.log_file, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+            if payload:
+                self.payloads[item] = payload
+            self._add(session, item, EVENT_WEIGHTS.get(event, 1.0))
+            if event == "favorite" and session != FAVORITES_SESSION:
+                self._add(FAVORITES_SESSION, item, EVENT_WEIGHTS["favorite"])
+
+    def _add(self, session: str, item: str, weight: float):
+        items = self.sessions[session]
+        old = items.get(item, 0.0)
+        if weight <= old:
+            return
+        delta = weight - old
+        items[item] = weight
+        # C[item, j] changes by delta * R[s, j]; the diagonal by weight^2 - old^2
+        row = self.cooc[item]
+        for other, w in items.items():
+            if other == item:
+                row[item] = row.get(item, 0.0) + weight * weight - old * old
+            else:
+                row[other] = row.get(other, 0.0) + delta * w
+                self.cooc[other][item] = row[other]
+        # The diagonal feeds every cosine involving item, so refresh all its neighbours
+        for other in list(row):
+            self.table[other] = self._neighbours(other)
+
+    def _neighbours(self, item: str) -> List[Tuple[str, float]]:
+        row = self.cooc.get(item, {})
+        norm = row.get(item, 0.0)
+        if not norm:
+            return []
+        scored = ((other, c / math.sqrt(norm * self.cooc[other][other]))
+                  for other, c in row.items() if other != item and c > 0)
+        return heapq.nlargest(self.top_n, scored, key=lambda x: x[1])
+
+    def seed(self, session: str, items: Iterable[Tuple[str, dict]], event: str = "favorite"):
+        """Record items that predate the log (e.g. existing favorites) once"""
+        with self.lock:
+            known = self.sessions.get(session, {})
+            for item, payload in items:
+                if item not in known:
+                    self.record(session, item, event, payload)
+
+    # ---------- SERVING ---------- #
+    def neighbours(self, item: str) -> List[Tuple[str, float]]:
+        return self.table.get(item, [])
+
+    def recommend(self, items: Iterable[str], k: int = 20) -> List[Tuple[str, float]]:
+        """Sum of neighbour scores over items, excluding the items themselves"""
+        items = set(items)
+        scores: Dict[str, float] = defaultdict(float)
+        with self.lock:
+            for item in items:
+                for other, score in self.table.get(item, []):
+                    if other not in items:
+                        scores[other] += score
+        return heapq.nlargest(k, scores.items(), key=lambda x: x[1])
+
+    def payload(self, item: str) -> Optional[dict]:
+        return self.payloads.get(item)
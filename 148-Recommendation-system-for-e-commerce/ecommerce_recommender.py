@@ -3,15 +3,15 @@ import webbrowser
 import tkinter as tk
 from tkinter import messagebox
 from dataclasses import dataclass
-from typing import List, Tuple, Dict
-import io
+from typing import List, Tuple
 import json
 import os
-import requests
+import uuid
 
-from PIL import Image, ImageTk
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from field_tfidf import FieldTfidfModel
+from catalog_index import CatalogIndex, INDEX_DIR, product_text
+from cf_engine import ItemCF, FAVORITES_SESSION
+from image_service import ImageService
 
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
@@ -21,12 +21,18 @@ from ttkbootstrap.widgets.scrolled import ScrolledText
 RESULTS_PER_PAGE = 6
 FAVORITES_FILE = "product_favorites.json"
 PRODUCTS_FILE = "products.json"
+MODES = ("All", "Category", "Brand")
+ANN_MIN_PRODUCTS = 50_000  # Larger catalogs search through the ANN index
+ANN_CANDIDATES = 200
+IMAGE_SIZE = (120, 180)
 
 # ---------------- GLOBAL STATE ---------------- #
 all_ranked_products: List[Tuple["Product", float]] = []
 current_page = 1
-image_cache: Dict[str, ImageTk.PhotoImage] = {}
+images = ImageService()  # Disk + memory product image cache shared by every page
 favorites: List["Product"] = []
+catalog_index = None  # CatalogIndex, opened or built in the background
+session_id = uuid.uuid4().hex  # Interactions in one run co-occur
 
 # ---------------- DATA STRUCTURE ---------------- #
 @dataclass(frozen=True)
@@ -85,6 +91,8 @@ def load_products() -> List[Product]:
         return [Product(**p) for p in json.load(f)]
 
 products = load_products()
+product_rows = {p: i for i, p in enumerate(products)}
+products_by_name = {p.name: p for p in products}
 
 # ---------------- FAVORITES ---------------- #
 def load_favorites():
@@ -97,37 +105,87 @@ def save_favorites():
     with open(FAVORITES_FILE, "w", encoding="utf-8") as f:
         json.dump([p.__dict__ for p in favorites], f, indent=2)
 
+# ---------------- COLLABORATIVE FILTERING ---------------- #
+# Trained from interactions.jsonl; neighbours are looked up, not recomputed
+item_cf = ItemCF()
+
+def record_interaction(product: Product, event: str):
+    item_cf.record(session_id, product.name, event, product.__dict__)
+
+def recommended_for_you(k: int = 30):
+    """Products that co-occur with the favorites in past sessions"""
+    recommended = []
+    for name, score in item_cf.recommend([p.name for p in favorites], k):
+        product = products_by_name.get(name)
+        if product is None and item_cf.payload(name):
+            product = Product(**item_cf.payload(name))
+        if product is not None:
+            recommended.append((product, score))
+    return recommended
+
 # ---------------- RECOMMENDATION ENGINE ---------------- #
-def recommend_products(query: str, candidates: List[Product], mode: str):
-    docs = [p.text_blob(mode) for p in candidates]
-    vectorizer = TfidfVectorizer(stop_words="english")
-    tfidf = vectorizer.fit_transform(docs + [query])
-    scores = cosine_similarity(tfidf[-1], tfidf[:-1]).flatten()
-    ranked = list(zip(candidates, scores))
-    ranked.sort(key=lambda x: x[1], reverse=True)
-    return ranked
+# The catalog is vectorized once per mode, searches only transform the query
+product_model = FieldTfidfModel({mode: (lambda p, m=mode: p.text_blob(m)) for mode in MODES}).fit(products)
+
+def recommend_products(query: str, modes: List[str]):
+    """Rank the catalog by the summed cosine similarity of every selected mode"""
+    weights = {mode: 1.0 for mode in modes}
+    if catalog_index is not None:
+        # Only the approximate nearest neighbours are re-ranked exactly, with the catalog's own IDF
+        rows = [row for row, _ in catalog_index.search(query, ANN_CANDIDATES)]
+        return product_model.rank(query, weights, rows=rows)
+    return product_model.rank(query, weights)
+
+def recommend_products_batch(queries: List[str], modes: List[str]):
+    """Rank the catalog for many queries with one sparse product per mode"""
+    return product_model.rank_batch(queries, {mode: 1.0 for mode in modes})
+
+def similar_products(product: Product, k: int = 30):
+    if catalog_index is not None:
+        return [(products[row], score) for row, score in catalog_index.similar(product_rows[product], k)]
+    ranked = product_model.rank(product.text_blob("All"), {"All": 1.0})
+    return [(p, s) for p, s in ranked if p != product][:k]
+
+def open_catalog_index() -> CatalogIndex:
+    """Open the ANN index, rebuilding it when products.json has changed"""
+    try:
+        index = CatalogIndex(INDEX_DIR)
+        if index.is_current(PRODUCTS_FILE):
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+    return CatalogIndex.build([product_text(p.__dict__) for p in products], INDEX_DIR,
+                              CatalogIndex.source_signature(PRODUCTS_FILE))
+
+def load_catalog_index():
+    """Background start-up of the ANN path; until it is ready searches score the catalog exactly"""
+    global catalog_index
+    if len(products) < ANN_MIN_PRODUCTS:
+        return  # Exact scoring of the whole catalog is fast enough
+    try:
+        index = open_catalog_index()
+        # Candidates are re-ranked from the catalog-wide fields: fit them here, not on the first search
+        product_model.prepare()
+    except Exception as e:
+        app.after(0, messagebox.showerror, "Catalog Index Error",
+                  f"Fast search is unavailable, using exact scoring:\n{e}")
+        return
+    catalog_index = index
 
 # ---------------- UI HELPERS ---------------- #
 def open_url(url: str):
     webbrowser.open_new_tab(url)
 
-def load_image(url: str, size=(120, 180)):
-    if url in image_cache:
-        return image_cache[url]
-    try:
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        img = Image.open(io.BytesIO(response.content)).resize(size)
-        photo = ImageTk.PhotoImage(img)
-        image_cache[url] = photo
-        return photo
-    except:
-        return None
+def set_image(label, photo):
+    if label.winfo_exists():
+        label.configure(image=photo)
+        label.image = photo
 
 def add_to_favorites(product: Product):
     if product not in favorites:
         favorites.append(product)
         save_favorites()
+        record_interaction(product, "favorite")
         messagebox.showinfo("Saved", "Added to Favorites")
 
 # ---------------- DISPLAY ---------------- #
@@ -148,21 +206,17 @@ def insert_product(container, product: Product):
     tb.Button(btns, text="★ Favorite", bootstyle="warning",
               command=lambda p=product: add_to_favorites(p)).pack(side=tk.LEFT, padx=2)
     tb.Button(btns, text="↗ View", bootstyle="info",
-              command=lambda u=product.url: open_url(u)).pack(side=tk.LEFT, padx=2)
+              command=lambda p=product: (record_interaction(p, "open"), open_url(p.url))).pack(side=tk.LEFT, padx=2)
+    tb.Button(btns, text="≈ Similar", bootstyle="secondary",
+              command=lambda p=product: show_similar(p)).pack(side=tk.LEFT, padx=2)
 
     container.configure(state="normal")
     container.window_create("end", window=frame)
     container.insert("end", "\n\n")
     container.configure(state="disabled")
 
-    # -------------------- Download image in background -------------------- #
-    def download_image():
-        img = load_image(product.image_url)
-        if img:
-            # Update widget safely in main thread
-            app.after(0, lambda: setattr(img_label, 'image', img) or img_label.configure(image=img))
-
-    threading.Thread(target=download_image, daemon=True).start()
+    # -------------------- Image from the shared cache/pool -------------------- #
+    images.request(product.image_url, IMAGE_SIZE, container, lambda photo: set_image(img_label, photo))
 
 # ---------------- PAGINATION ---------------- #
 def display_page():
@@ -173,6 +227,8 @@ def display_page():
     for product, _ in all_ranked_products[start:end]:
         insert_product(text, product)
     text.configure(state="disabled")
+    # Images of the next page load while this one is being read
+    images.prefetch((p.image_url for p, _ in all_ranked_products[end:end + RESULTS_PER_PAGE]), IMAGE_SIZE, text)
     update_pagination()
 
 def next_page():
@@ -204,11 +260,7 @@ def perform_search():
 
 def search_thread(query: str):
     modes = get_selected_modes()
-    ranked = []
-    for mode in modes:
-        ranked.extend(recommend_products(query, products, mode))
-
-    ranked.sort(key=lambda x: x[1], reverse=True)
+    ranked = recommend_products(query, modes)
     seen = set()
     final = []
     for p, s in ranked:
@@ -224,12 +276,37 @@ def search_thread(query: str):
 
     app.after(0, update)
 
+def show_ranked(ranked: List[Tuple[Product, float]]):
+    global all_ranked_products, current_page
+    current_page = 1
+    all_ranked_products = ranked
+    display_page()
+
+def show_similar(product: Product):
+    record_interaction(product, "view")
+
+    def worker():
+        similar = similar_products(product)
+        app.after(0, lambda: show_ranked(similar))
+
+    threading.Thread(target=worker, daemon=True).start()
+
+def show_for_you():
+    recommended = recommended_for_you()
+    if not recommended:
+        messagebox.showinfo("For You", "Favorite or view a few products first")
+        return
+    show_ranked(recommended)
+
 # ---------------- UI SETUP ---------------- #
 app = tb.Window(title="E-Commerce Recommendation System",
                 themename="darkly",
                 size=(1000, 680))
 
 load_favorites()
+# Favorites saved before the interaction log existed still count as feedback
+item_cf.seed(FAVORITES_SESSION, [(p.name, p.__dict__) for p in favorites])
+threading.Thread(target=load_catalog_index, daemon=True).start()
 
 top = tb.Frame(app, padding=15)
 top.pack(fill=tk.X)
@@ -258,6 +335,10 @@ tb.Button(mode_frame, text="Search",
           bootstyle="primary",
           command=perform_search).pack(side=tk.LEFT, padx=10)
 
+tb.Button(mode_frame, text="For You",
+          bootstyle="success",
+          command=show_for_you).pack(side=tk.LEFT)
+
 result_frame = tb.Frame(app)
 result_frame.pack(fill=tk.BOTH, expand=True)
 
@@ -0,0 +1,143 @@
+# benchmark_server.py
+"""
+Measure edit throughput of server_diff_graceful.py as the number of documents grows.
+
+Each document gets its own writers (which wait for the server's ack before
+sending the next edit) and readers (which only receive broadcasts). The server
+and the clients of each document run in separate processes so client load
+does not steal the server's CPU.
+
+    python benchmark_server.py --docs 1 2 4 8 --writers 4 --readers 4 --seconds 5
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import sys
+import time
+
+import websockets
+
+import server_diff_graceful
+
+# ---------------- SERVER PROCESS ---------------- #
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_server(port):
+    sys.stdout = open(os.devnull, "w")  # Silence per-connection logging
+    try:
+        asyncio.run(server_diff_graceful.main(port))
+    except KeyboardInterrupt:
+        pass
+
+
+async def wait_for_server(uri, timeout=10):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            async with websockets.connect(uri) as ws:
+                await ws.send("benchmark-probe")
+                return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+# ---------------- CLIENTS ---------------- #
+async def writer(uri, doc, name, stop_at, latencies):
+    """Insert one character at a time, waiting for the ack of each edit"""
+    async with websockets.connect(uri) as ws:
+        await ws.send(name)
+        await ws.send(json.dumps({"type": "subscribe", "doc": doc}))
+        length = len(json.loads(await ws.recv())["content"])
+        while time.perf_counter() < stop_at:
+            ops = [{"tag": "equal", "i1": 0, "i2": length},
+                   {"tag": "insert", "i1": length, "i2": length, "text": "x"}]
+            start = time.perf_counter()
+            await ws.send(json.dumps({"type": "diff", "doc": doc, "ops": ops}))
+            while True:
+                data = json.loads(await ws.recv())
+                if data["type"] == "ack":
+                    break
+                if data["type"] == "diff":
+                    length += 1  # Another writer's insert on the same document
+            latencies.append(time.perf_counter() - start)
+            length += 1
+
+
+async def reader(uri, doc, name, stop_at):
+    """Subscribe to a document and drain broadcasts until the run ends"""
+    async with websockets.connect(uri) as ws:
+        await ws.send(name)
+        await ws.send(json.dumps({"type": "subscribe", "doc": doc}))
+        while True:
+            remaining = stop_at - time.perf_counter()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(ws.recv(), remaining)
+            except asyncio.TimeoutError:
+                return
+
+# ---------------- BENCHMARK ---------------- #
+async def drive_document(uri, doc, writers, readers, stop_at):
+    latencies = []
+    await asyncio.gather(
+        *(writer(uri, doc, f"{doc}-w{i}", stop_at, latencies) for i in range(writers)),
+        *(reader(uri, doc, f"{doc}-r{i}", stop_at) for i in range(readers)))
+    return latencies
+
+
+def run_document(args):
+    uri, doc, writers, readers, seconds = args
+    return asyncio.run(drive_document(uri, doc, writers, readers, time.perf_counter() + seconds))
+
+
+def run_round(pool, uri, docs, writers, readers, seconds):
+    names = [f"doc-{d}" for d in range(docs)]
+    jobs = [(uri, name, writers, readers, seconds) for name in names]
+    return dict(zip(names, pool.map(run_document, jobs)))
+
+
+def report(docs, latencies, seconds):
+    everything = [x for lat in latencies.values() for x in lat]
+    per_doc = [len(lat) / seconds for lat in latencies.values()]
+    p50 = statistics.median(everything) * 1000
+    p99 = statistics.quantiles(everything, n=100)[98] * 1000
+    print(f"{docs:>5} docs | {len(everything) / seconds:>9.0f} edits/s total | "
+          f"{min(per_doc):>7.0f}-{max(per_doc):<7.0f} edits/s per doc | "
+          f"p50 {p50:6.2f} ms | p99 {p99:6.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collaborative server throughput benchmark")
+    parser.add_argument("--docs", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--writers", type=int, default=4, help="Writers per document")
+    parser.add_argument("--readers", type=int, default=4, help="Readers per document")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    port = free_port()
+    uri = f"ws://127.0.0.1:{port}"
+    server = multiprocessing.Process(target=run_server, args=(port,), daemon=True)
+    server.start()
+    try:
+        asyncio.run(wait_for_server(uri))
+        with multiprocessing.Pool(max(args.docs)) as pool:
+            for docs in args.docs:
+                latencies = run_round(pool, uri, docs, args.writers, args.readers, args.seconds)
+                report(docs, latencies, args.seconds)
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
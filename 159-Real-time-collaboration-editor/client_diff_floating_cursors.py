@@ -37,6 +37,9 @@ if not username:
     app.destroy()
     exit()
 
+document_name = simpledialog.askstring("Document", "Document to open:", initialvalue="default", parent=app) or "default"
+app.title(f"Collaborative Editor (Floating Cursors) - {document_name}")
+
 # ---------------- STATE ---------------- #
 ignore_event = False
 last_content = ""
@@ -110,17 +113,20 @@ async def connect_to_server():
     global ignore_event, last_content
     async with websockets.connect(SERVER_URI) as ws:
         await ws.send(username)
+        await ws.send(json.dumps({"type": "subscribe", "doc": document_name}))
 
         async def send_diff(ops):
-            await ws.send(json.dumps({"type": "diff", "ops": ops}))
+            await ws.send(json.dumps({"type": "diff", "doc": document_name, "ops": ops}))
 
         async def send_cursor(pos):
-            await ws.send(json.dumps({"type": "cursor", "position": pos}))
+            await ws.send(json.dumps({"type": "cursor", "doc": document_name, "position": pos}))
 
         async def receive_messages():
             global ignore_event, last_content
             async for message in ws:
                 data = json.loads(message)
+                if data.get("doc", document_name) != document_name:
+                    continue  # Update for a document we are not editing
                 if data["type"] == "full_update":
                     ignore_event = True
                     text_widget.delete("1.0", "end")
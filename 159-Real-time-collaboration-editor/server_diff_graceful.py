@@ -5,11 +5,31 @@ import websockets
 from difflib import SequenceMatcher
 
 PORT = 8765
+DEFAULT_DOC = "default"  # Every client follows it until it subscribes to another document
+
+# ---------------- DOCUMENT STATE ---------------- #
+class Document:
+    """A named shared document with its own lock, sequence and subscribers"""
+
+    def __init__(self, name):
+        self.name = name
+        self.content = ""
+        self.seq = 0  # Incremented for every applied diff
+        self.subscribers = {}  # websocket -> username
+        self.lock = asyncio.Lock()  # Serializes edits to this document only
+
 
 # ---------------- GLOBAL STATE ---------------- #
-document_content = ""  # Shared document
+documents = {}  # name -> Document
 clients = {}  # websocket -> username
-lock = asyncio.Lock()  # Async lock for safe updates
+
+
+def get_document(name):
+    """Return the document called name, creating it on first use"""
+    doc = documents.get(name)
+    if doc is None:
+        doc = documents[name] = Document(name)
+    return doc
 
 # ---------------- DIFF HELPERS ---------------- #
 def apply_diff(content, ops):
@@ -27,53 +47,107 @@ def apply_diff(content, ops):
     return "".join(new_content)
 
 # ---------------- BROADCAST ---------------- #
-async def broadcast(message, exclude=None):
-    """Send a message to all clients except the sender"""
-    if clients:
-        websockets_to_send = [ws for ws in clients if ws != exclude]
-        if websockets_to_send:
-            await asyncio.gather(*(ws.send(message) for ws in websockets_to_send))
+async def broadcast(doc, message, exclude=None):
+    """Send a message to every subscriber of doc except the sender"""
+    websockets_to_send = [ws for ws in doc.subscribers if ws != exclude]
+    if websockets_to_send:
+        await asyncio.gather(*(ws.send(message) for ws in websockets_to_send),
+                             return_exceptions=True)
+
+# ---------------- SUBSCRIPTIONS ---------------- #
+async def subscribe(websocket, username, name, subscriptions):
+    """Subscribe a client to a document and send it the current content"""
+    doc = get_document(name)
+    async with doc.lock:
+        doc.subscribers[websocket] = username
+        subscriptions.add(name)
+        await websocket.send(json.dumps({
+            "type": "full_update",
+            "doc": doc.name,
+            "seq": doc.seq,
+            "content": doc.content
+        }))
+
+
+def unsubscribe(websocket, name, subscriptions):
+    """Remove a client from a document's subscribers"""
+    doc = documents.get(name)
+    if doc is not None:
+        doc.subscribers.pop(websocket, None)
+    subscriptions.discard(name)
 
 # ---------------- HANDLER ---------------- #
 async def handler(websocket):
-    global document_content
     # Receive initial username
     username = await websocket.recv()
     clients[websocket] = username
+    subscriptions = set()  # Names of documents this client follows
     print(f"[+] {username} connected")
-    
-    # Send full document to new client
-    await websocket.send(json.dumps({"type": "full_update", "content": document_content}))
-    
+
     try:
+        # Send the default document at once, as older clients never subscribe
+        await subscribe(websocket, username, DEFAULT_DOC, subscriptions)
+        implicit_default = True
+
         async for message in websocket:
             data = json.loads(message)
-            
-            async with lock:
-                if data["type"] == "diff":
-                    # Apply diff to server content
-                    document_content = apply_diff(document_content, data["ops"])
-                    # Broadcast diff to others
-                    await broadcast(json.dumps({"type": "diff", "ops": data["ops"], "user": username}), exclude=websocket)
-                
-                elif data["type"] == "cursor":
-                    # Broadcast cursor positions to other clients
-                    await broadcast(json.dumps({
-                        "type": "cursor",
-                        "position": data["position"],
+            msg_type = data["type"]
+
+            if msg_type == "subscribe":
+                if implicit_default and data["doc"] != DEFAULT_DOC:
+                    # Clients that pick their documents stop following the default one
+                    unsubscribe(websocket, DEFAULT_DOC, subscriptions)
+                implicit_default = False
+                await subscribe(websocket, username, data["doc"], subscriptions)
+                continue
+
+            if msg_type == "unsubscribe":
+                unsubscribe(websocket, data["doc"], subscriptions)
+                continue
+
+            # Older clients send no "doc" field and are already subscribed to DEFAULT_DOC
+            name = data.get("doc", DEFAULT_DOC)
+            if name not in subscriptions:
+                await subscribe(websocket, username, name, subscriptions)
+            doc = documents[name]
+
+            if msg_type == "diff":
+                async with doc.lock:
+                    # Apply diff to this document only
+                    doc.content = apply_diff(doc.content, data["ops"])
+                    doc.seq += 1
+                    seq = doc.seq
+                    # Broadcast diff to the document's other subscribers
+                    await broadcast(doc, json.dumps({
+                        "type": "diff",
+                        "doc": name,
+                        "seq": seq,
+                        "ops": data["ops"],
                         "user": username
                     }), exclude=websocket)
-                    
+                await websocket.send(json.dumps({"type": "ack", "doc": name, "seq": seq}))
+
+            elif msg_type == "cursor":
+                # Cursor positions do not change the document, no lock needed
+                await broadcast(doc, json.dumps({
+                    "type": "cursor",
+                    "doc": name,
+                    "position": data["position"],
+                    "user": username
+                }), exclude=websocket)
+
     except websockets.ConnectionClosed:
-        print(f"[-] {username} disconnected")
+        pass
     finally:
-        if websocket in clients:
-            del clients[websocket]
+        print(f"[-] {username} disconnected")
+        for name in list(subscriptions):
+            unsubscribe(websocket, name, subscriptions)
+        clients.pop(websocket, None)
 
 # ---------------- START SERVER ---------------- #
-async def main():
-    async with websockets.serve(handler, "0.0.0.0", PORT):
-        print(f"Diff-Based Collaborative Server running on port {PORT}")
+async def main(port=PORT):
+    async with websockets.serve(handler, "0.0.0.0", port):
+        print(f"Diff-Based Collaborative Server running on port {port}")
         await asyncio.Future()  # run forever
 
 if __name__ == "__main__":
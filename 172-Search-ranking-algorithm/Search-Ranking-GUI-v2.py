@@ -10,16 +10,17 @@ from ttkbootstrap.constants import *
 from ttkbootstrap.widgets.scrolled import ScrolledText
 
 from bs4 import BeautifulSoup
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from rank_bm25 import BM25Okapi
 
 from urllib.parse import urlparse, parse_qs, unquote
 
+from query_cache import QueryCache
+from ranking import Ranker, FUSIONS
+
 
 # ---------------- CONFIG ---------------- #
 
 RESULTS_PER_PAGE = 6
+RANKING_FUSION = "minmax"  # raw-mean, minmax, zscore or rrf
 
 
 # ---------------- GLOBAL STATE ---------------- #
@@ -27,6 +28,8 @@ RESULTS_PER_PAGE = 6
 all_ranked_results = []
 current_page = 1
 favorites = set()
+ranker = Ranker(fusion=FUSIONS[RANKING_FUSION]())
+query_cache = QueryCache()  # Raw and ranked results per normalized query
 
 
 # ---------------- URL CLEANING ---------------- #
@@ -85,21 +88,8 @@ def fetch_search_results(query):
 
 
 def rank_results(query, results):
-    docs = [r["title"] + " " + r["snippet"] for r in results]
-
-    vectorizer = TfidfVectorizer()
-    tfidf = vectorizer.fit_transform(docs + [query])
-    tfidf_scores = cosine_similarity(tfidf[-1], tfidf[:-1]).flatten()
-
-    bm25 = BM25Okapi([d.split() for d in docs])
-    bm25_scores = bm25.get_scores(query.split())
-
-    ranked = []
-    for i, res in enumerate(results):
-        score = (tfidf_scores[i] + bm25_scores[i]) / 2
-        ranked.append((res, score))
-
-    return sorted(ranked, key=lambda x: x[1], reverse=True)
+    # Corpus statistics persist across searches, scores are normalized before fusion
+    return ranker.rank(query, results, key=lambda r: r["url"], text=lambda r: r["title"] + " " + r["snippet"])
 
 
 # ---------------- UI HELPERS ---------------- #
@@ -189,19 +179,32 @@ def perform_search():
     threading.Thread(target=search_thread, args=(query,), daemon=True).start()
 
 
-def search_thread(query):
-    global all_ranked_results, current_page
-    current_page = 1
-
+def show_searching():
     text.configure(state="normal")
     text.delete("1.0", "end")
     text.insert("end", "Searching...\n")
     text.configure(state="disabled")
 
-    results = fetch_search_results(query)
-    all_ranked_results = rank_results(query, results)
 
-    display_page()
+def search_thread(query):
+    global all_ranked_results, current_page
+    app.after(0, show_searching)
+
+    # Repeated queries are answered from the cache without network or re-ranking
+    try:
+        results = query_cache.get_or_compute("raw", query, lambda: fetch_search_results(query))
+    except requests.RequestException as e:
+        app.after(0, messagebox.showerror, "Search Error", str(e))
+        results = []
+    ranked = []
+    if results:
+        ranked = query_cache.get_or_compute(
+            "ranked", query,
+            lambda: [[res, float(score)] for res, score in rank_results(query, results)])
+    all_ranked_results = [tuple(item) for item in ranked]
+    current_page = 1
+
+    app.after(0, lambda: (display_page(), cache_label.config(text=query_cache.summary())))
 
 
 # ---------------- UI SETUP ---------------- #
@@ -265,6 +268,8 @@ tb.Button(nav, text="← Prev", bootstyle="secondary", command=prev_page).pack(s
 page_label = tb.Label(nav, text="Page 1", font=("Segoe UI", 10))
 page_label.pack(side=LEFT, padx=10)
 tb.Button(nav, text="Next →", bootstyle="secondary", command=next_page).pack(side=LEFT)
+cache_label = tb.Label(nav, text=query_cache.summary(), font=("Segoe UI", 9), foreground="#666666")
+cache_label.pack(side=RIGHT)
 
 # Run
 app.mainloop()
@@ -0,0 +1,176 @@
+"""
+Two-tier query cache for the search apps.
+
+Tier 1 is an in-memory LRU, tier 2 a SQLite table with expiry times, so
+results survive restarts. Entries are keyed by (kind, normalized query);
+"raw" holds fetched results and "ranked" the ranked list. Values must be
+JSON-serializable.
+
+    python query_cache.py            # benchmark against a local stand-in backend
+"""
+import json
+import time
+import random
+import sqlite3
+import argparse
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+# ---------------- CONFIG ---------------- #
+CACHE_FILE = "search_cache.db"
+DEFAULT_TTL = 6 * 60 * 60  # seconds
+MEMORY_ENTRIES = 256
+
+# ---------------- HELPERS ---------------- #
+def normalize_query(query: str) -> str:
+    """Case-fold, unicode-normalize and collapse whitespace so equivalent queries share a key"""
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+# ---------------- CACHE ---------------- #
+class QueryCache:
+    def __init__(self, path: Optional[str] = CACHE_FILE, ttl: float = DEFAULT_TTL,
+                 max_entries: int = MEMORY_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (expires, value)
+        self.lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self.conn = None
+        if path:
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.executescript("""
+                PRAGMA journal_mode=WAL;
+                CREATE TABLE IF NOT EXISTS cache (
+                    kind TEXT, query TEXT, expires REAL, value TEXT,
+                    PRIMARY KEY (kind, query)) WITHOUT ROWID;
+            """)
+            self.purge_expired()
+
+    def get(self, kind: str, query: str) -> Optional[Any]:
+        key = (kind, normalize_query(query))
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry and entry[0] > now:
+                self.memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry[1]
+            if entry:
+                del self.memory[key]
+            if self.conn:
+                row = self.conn.execute(
+                    "SELECT expires, value FROM cache WHERE kind = ? AND query = ?", key).fetchone()
+                if row and row[0] > now:
+                    value = json.loads(row[1])
+                    self._remember(key, row[0], value)
+                    self.stats["disk_hits"] += 1
+                    return value
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, kind: str, query: str, value: Any, ttl: Optional[float] = None):
+        key = (kind, normalize_query(query))
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        with self.lock:
+            self._remember(key, expires, value)
+            if self.conn:
+                with self.conn:
+                    self.conn.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                                      (*key, expires, json.dumps(value)))
+
+    def get_or_compute(self, kind: str, query: str, compute: Callable[[], Any]) -> Any:
+        value = self.get(kind, query)
+        if value is None:
+            value = compute()
+            if value:  # Never cache empty or failed lookups
+                self.put(kind, query, value)
+        return value
+
+    def _remember(self, key: tuple, expires: float, value: Any):
+        self.memory[key] = (expires, value)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def purge_expired(self):
+        if self.conn:
+            with self.lock, self.conn:
+                self.conn.execute("DELETE FROM cache WHERE expires <= ?", (time.time(),))
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+            if self.conn:
+                with self.conn:
+                    self.conn.execute("DELETE FROM cache")
+
+    def summary(self) -> str:
+        s = self.stats
+        return f"Cache: {s['memory_hits']} mem / {s['disk_hits']} disk hits, {s['misses']} misses"
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+
+# ---------------- LOCAL STAND-IN BACKEND ---------------- #
+class LocalBackend:
+    """Deterministic fake search backend with simulated network latency"""
+
+    WORDS = ("python search engine ranking cache index query result page fast local "
+             "network latency memory disk token score vector model data web link").split()
+
+    def __init__(self, latency: float = 0.3):
+        self.latency = latency
+        self.calls = 0
+
+    def fetch(self, query: str, count: int = 25) -> List[Dict[str, str]]:
+        self.calls += 1
+        time.sleep(self.latency)
+        rng = random.Random(normalize_query(query))
+        results = []
+        for i in range(count):
+            words = rng.choices(self.WORDS, k=12) + query.split()
+            rng.shuffle(words)
+            results.append({
+                "title": " ".join(words[:5]).title(),
+                "url": f"https://example.com/{i}/{'-'.join(words[:3])}",
+                "snippet": " ".join(words),
+            })
+        return results
+
+
+def benchmark():
+    parser = argparse.ArgumentParser(description="Query cache benchmark (no network)")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3, help="Simulated backend latency (s)")
+    parser.add_argument("--db", default="bench_search_cache.db")
+    args = parser.parse_args()
+
+    backend = LocalBackend(args.latency)
+    cache = QueryCache(args.db)
+    cache.clear()
+    queries = [f"{random.choice(LocalBackend.WORDS)} {random.choice(LocalBackend.WORDS)} {n}"
+               for n in range(args.queries)]
+
+    def timed(q):
+        start = time.perf_counter()
+        cache.get_or_compute("raw", q, lambda: backend.fetch(q))
+        return (time.perf_counter() - start) * 1000
+
+    cold = [timed(q) for q in queries]
+    warm = [timed(q.upper() + "  ") for _ in range(args.repeats) for q in queries]
+    cache.memory.clear()  # Force the next round through SQLite
+    disk = [timed(q) for q in queries]
+
+    for name, times in (("cold (backend)", cold), ("memory hit", warm), ("disk hit", disk)):
+        times.sort()
+        print(f"{name:>15}: p50 {times[len(times) // 2]:8.3f} ms | max {times[-1]:8.3f} ms")
+    print(f"backend calls: {backend.calls} | {cache.summary()}")
+    cache.close()
+
+
+if __name__ == "__main__":
+    benchmark()
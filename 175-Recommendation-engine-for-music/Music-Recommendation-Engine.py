@@ -3,17 +3,15 @@ import webbrowser
 import tkinter as tk
 from tkinter import messagebox
 from dataclasses import dataclass
-from typing import List, Tuple, Dict
+from typing import List, Tuple
 import requests
-import io
 import json
 import os
 
-from PIL import Image, ImageTk
 import pygame
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from field_tfidf import FieldTfidfModel
+from image_service import ImageService
 
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
@@ -22,13 +20,15 @@ from ttkbootstrap.widgets.scrolled import ScrolledText
 # ---------------- CONFIG ---------------- #
 RESULTS_PER_PAGE = 6
 ITUNES_SEARCH_URL = "https://itunes.apple.com/search"
+MODES = ("All", "Artist", "Genre")
+ARTWORK_SIZE = (120, 120)
 
 pygame.mixer.init()
 
 # ---------------- GLOBAL STATE ---------------- #
 all_ranked_tracks: List[Tuple["Track", float]] = []
 current_page = 1
-artwork_cache: Dict[str, ImageTk.PhotoImage] = {}
+images = ImageService()  # Disk + memory artwork cache shared by every page
 
 # ---------------- DATA STRUCTURE ---------------- #
 @dataclass(frozen=True)
@@ -70,29 +70,22 @@ def fetch_tracks(query: str, limit=40) -> List[Track]:
     return tracks
 
 # ---------------- RECOMMENDATION ENGINE ---------------- #
-def recommend_tracks(query: str, candidates: List[Track], mode: str) -> List[Tuple[Track, float]]:
-    docs = [t.text_blob(mode) for t in candidates]
-    vectorizer = TfidfVectorizer(stop_words="english")
-    tfidf = vectorizer.fit_transform(docs + [query])
-    scores = cosine_similarity(tfidf[-1], tfidf[:-1]).flatten()
+# One vectorizer per mode, fitted once per candidate set
+track_model = FieldTfidfModel({mode: (lambda t, m=mode: t.text_blob(m)) for mode in MODES})
 
-    ranked = list(zip(candidates, scores))
-    ranked.sort(key=lambda x: x[1], reverse=True)
-    return ranked
+def recommend_tracks(query: str, candidates: List[Track], modes: List[str]) -> List[Tuple[Track, float]]:
+    """Rank candidates by the summed cosine similarity of every selected mode"""
+    return track_model.rank(query, {mode: 1.0 for mode in modes}, items=candidates)
 
 # ---------------- UI HELPERS ---------------- #
 def open_url(url: str):
     webbrowser.open_new_tab(url)
 
-def load_image(url: str, size=(120, 120)):
-    if not url:
-        return None
-    if url in artwork_cache:
-        return artwork_cache[url]
-    img = Image.open(io.BytesIO(requests.get(url).content)).resize(size)
-    photo = ImageTk.PhotoImage(img)
-    artwork_cache[url] = photo
-    return photo
+def set_image(label, photo):
+    # Check if the widget still exists
+    if label.winfo_exists():
+        label.configure(image=photo)
+        label.image = photo
 
 # ---------------- DISPLAY MAIN ---------------- #
 
@@ -120,17 +113,7 @@ def insert_track_main(track: Track):
     text.configure(state="disabled")
 
     # ---------------- ASYNC IMAGE LOAD ---------------- #
-    def async_load():
-        photo = load_image(track.artwork_url)
-        if photo:
-            def safe_update():
-                # Check if the widget still exists
-                if art_label.winfo_exists():
-                    art_label.configure(image=photo)
-                    art_label.image = photo
-            text.after(0, safe_update)
-
-    threading.Thread(target=async_load, daemon=True).start()
+    images.request(track.artwork_url, ARTWORK_SIZE, text, lambda photo: set_image(art_label, photo))
 
 def display_page():
     text.configure(state="normal")
@@ -143,6 +126,8 @@ def display_page():
         insert_track_main(track)
 
     text.configure(state="disabled")
+    # Artwork of the next page loads while this one is being read
+    images.prefetch((t.artwork_url for t, _ in all_ranked_tracks[end:end + RESULTS_PER_PAGE]), ARTWORK_SIZE, text)
     update_pagination()
 
 # ---------------- PAGINATION ---------------- #
@@ -179,15 +164,8 @@ def search_thread(query: str):
     selected_modes = get_selected_modes()
     tracks = fetch_tracks(query)
 
-    # If multiple modes selected, we can rank separately
-    ranked_list = []
-
-    for mode in selected_modes:
-        ranked = recommend_tracks(query, tracks, mode)
-        ranked_list.extend(ranked)
-
-    # Sort by score descending
-    ranked_list.sort(key=lambda x: x[1], reverse=True)
+    # Selected modes are combined into one score per track
+    ranked_list = recommend_tracks(query, tracks, selected_modes)
 
     # Remove duplicates
     seen = set()
@@ -0,0 +1,74 @@
+"""
+Fit-once, multi-field TF-IDF model shared by the recommendation modes.
+
+Each field (e.g. "All", "Author") gets its own TfidfVectorizer, fitted on the
+candidate set the first time that field is needed and cached until the
+candidates change. A query is scored as the weighted sum of its cosine
+similarity against each selected field, and many queries can be ranked
+against the same candidates with one sparse matrix product per field.
+"""
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+
+class FieldTfidfModel:
+    def __init__(self, fields: Dict[str, Callable[[object], str]], stop_words: Optional[str] = "english"):
+        self.fields = fields
+        self.stop_words = stop_words
+        self.items: Tuple = ()
+        self.vectorizers: Dict[str, Optional[TfidfVectorizer]] = {}
+        self.matrices: Dict[str, object] = {}
+        self.lock = threading.RLock()
+
+    def fit(self, items: Sequence) -> "FieldTfidfModel":
+        """Use items as the candidate set; cached field matrices survive if it is unchanged"""
+        items = tuple(items)
+        with self.lock:
+            if items != self.items:
+                self.items = items
+                self.vectorizers.clear()
+                self.matrices.clear()
+        return self
+
+    def _field(self, name: str):
+        """Vectorizer and L2-normalized matrix of one field, built on first use"""
+        if name not in self.vectorizers:
+            vectorizer = TfidfVectorizer(stop_words=self.stop_words)
+            try:
+                self.matrices[name] = vectorizer.fit_transform(self.fields[name](i) for i in self.items)
+                self.vectorizers[name] = vectorizer
+            except ValueError:  # Empty vocabulary, e.g. no item has an author
+                self.vectorizers[name] = None
+        return self.vectorizers[name], self.matrices.get(name)
+
+    def score_batch(self, queries: Sequence[str], weights: Dict[str, float]) -> np.ndarray:
+        """(queries x items) weighted sum of per-field cosine similarities"""
+        scores = np.zeros((len(queries), len(self.items)), dtype=np.float64)
+        if not self.items:
+            return scores
+        for name, weight in weights.items():
+            vectorizer, matrix = self._field(name)
+            if vectorizer is None or not weight:
+                continue
+            # Rows are L2-normalized, so the dot product is the cosine similarity
+            scores += weight * (vectorizer.transform(queries) @ matrix.T).toarray()
+        return scores
+
+    def rank_batch(self, queries: Sequence[str], weights: Dict[str, float],
+                   items: Optional[Sequence] = None) -> List[List[Tuple[object, float]]]:
+        """Items sorted by score for every query; passing items refits first if they changed"""
+        with self.lock:
+            if items is not None:
+                self.fit(items)
+            scores = self.score_batch(queries, weights)
+            ranked = []
+            for row in scores:
+                order = np.argsort(-row, kind="stable")
+                ranked.append([(self.items[i], float(row[i])) for i in order])
+            return ranked
+
+    def rank(self, query: str, weights: Dict[str, float], items: Optional[Sequence] = None) -> List[Tuple[object, float]]:
+        return self.rank_batch([query], weights, items)[0]
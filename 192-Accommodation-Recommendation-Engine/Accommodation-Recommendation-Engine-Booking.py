@@ -4,12 +4,14 @@ import webbrowser
 import tkinter as tk
 from tkinter import messagebox
 from dataclasses import dataclass
-from typing import List, Dict
-import io
+from typing import List
 import json
+import uuid
 import ttkbootstrap as tb
 from ttkbootstrap.widgets.scrolled import ScrolledText
-from PIL import Image, ImageTk
+
+from cf_engine import ItemCF, FAVORITES_SESSION
+from image_service import ImageService
 
 # ---------------- CONFIG ---------------- #
 GOOGLE_API_KEY = "YOUR_GOOGLE_API_KEY"
@@ -18,6 +20,7 @@ API_TOKEN = "YOUR_API_TOKEN"
 BASE_URL = "https://demandapi.booking.com/3.1"
 RESULTS_PER_PAGE = 6
 FAVORITES_FILE = "accommodation_favorites.json"
+COVER_SIZE = (120, 80)
 
 HEADERS = {
     "Content-Type": "application/json",
@@ -26,20 +29,12 @@ HEADERS = {
 }
 
 # ---------------- IMAGE CACHE ---------------- #
-cover_cache: Dict[str, ImageTk.PhotoImage] = {}
-
-def load_cover(url: str, size=(120, 80)):
-    if not url:
-        return None
-    if url in cover_cache:
-        return cover_cache[url]
-    try:
-        img = Image.open(io.BytesIO(requests.get(url).content)).resize(size)
-        photo = ImageTk.PhotoImage(img)
-        cover_cache[url] = photo
-        return photo
-    except:
-        return None
+images = ImageService()  # Disk + memory cover cache shared by every page
+
+def set_image(label, photo):
+    if label.winfo_exists():
+        label.configure(image=photo)
+        label.image = photo
 
 # ---------------- DATA STRUCTURE ---------------- #
 @dataclass
@@ -51,6 +46,10 @@ class Accommodation:
     url: str
     image_url: str = ""  # for preview images
 
+    @property
+    def key(self) -> str:
+        return self.url or self.name
+
 # ---------------- ENGINE ---------------- #
 class AccommodationEngine:
     def __init__(self):
@@ -58,7 +57,11 @@ class AccommodationEngine:
         self.current_page = 1
         self.favorites: List[Accommodation] = []
         self.selected_latlng = (None, None)
+        self.session_id = uuid.uuid4().hex  # Interactions in one run co-occur
+        self.item_cf = ItemCF()
         self.load_favorites()
+        # Favorites saved before the interaction log existed still count as feedback
+        self.item_cf.seed(FAVORITES_SESSION, [(a.key, a.__dict__) for a in self.favorites])
         self.build_ui()
 
     # ---------------- FAVORITES ---------------- #
@@ -77,8 +80,31 @@ class AccommodationEngine:
         if acc not in self.favorites:
             self.favorites.append(acc)
             self.save_favorites()
+            self.record_interaction(acc, "favorite")
             messagebox.showinfo("Saved", f"Added {acc.name} to Favorites")
 
+    # ---------------- COLLABORATIVE FILTERING ---------------- #
+    def record_interaction(self, acc: Accommodation, event: str):
+        self.item_cf.record(self.session_id, acc.key, event, acc.__dict__)
+
+    def open_accommodation(self, acc: Accommodation):
+        self.record_interaction(acc, "open")
+        webbrowser.open_new_tab(acc.url)
+
+    def recommended_for_you(self, k: int = 30) -> List[Accommodation]:
+        """Stays that co-occur with the favorites in past sessions, from the neighbour table"""
+        ranked = self.item_cf.recommend([a.key for a in self.favorites], k)
+        return [Accommodation(**self.item_cf.payload(key)) for key, _ in ranked if self.item_cf.payload(key)]
+
+    def show_for_you(self):
+        recommended = self.recommended_for_you()
+        if not recommended:
+            messagebox.showinfo("For You", "Favorite or open a few stays first")
+            return
+        self.results = recommended
+        self.current_page = 1
+        self.display_page()
+
     # ---------------- GOOGLE PLACES AUTOCOMPLETE ---------------- #
     def autocomplete_city(self, query: str):
         url = f"https://maps.googleapis.com/maps/api/place/autocomplete/json"
@@ -195,6 +221,7 @@ class AccommodationEngine:
         self.page_label = tb.Label(nav, text="Page 1"); self.page_label.pack(side=tk.LEFT, padx=10)
         tb.Button(nav, text="Next →", command=self.next_page).pack(side=tk.LEFT)
         tb.Button(nav, text="Favorites", bootstyle="success", command=self.show_favorites).pack(side=tk.RIGHT)
+        tb.Button(nav, text="For You", bootstyle="info", command=self.show_for_you).pack(side=tk.RIGHT, padx=5)
 
         self.app.mainloop()
 
@@ -237,7 +264,7 @@ class AccommodationEngine:
     def search_thread(self, lat, lng, radius, min_p, max_p, min_r, amenities, room_types):
         self.results = self.fetch_accommodations(lat, lng, radius, min_p, max_p, min_r, amenities, room_types)
         self.current_page = 1
-        self.display_page()
+        self.app.after(0, self.display_page)
 
     # ---------------- DISPLAY WITH IMAGE ---------------- #
     def display_page(self):
@@ -248,6 +275,8 @@ class AccommodationEngine:
         for acc in self.results[start:end]:
             self.insert_accommodation(self.text, acc)
         self.text.configure(state="disabled")
+        # Covers of the next page load while this one is being read
+        images.prefetch((a.image_url for a in self.results[end:end + RESULTS_PER_PAGE]), COVER_SIZE, self.text)
         self.page_label.config(text=f"Page {self.current_page}")
 
     def insert_accommodation(self, container_widget, acc: Accommodation):
@@ -264,7 +293,7 @@ class AccommodationEngine:
         btn_frame = tk.Frame(info_frame)
         btn_frame.pack(anchor=tk.W, pady=2)
         tb.Button(btn_frame, text="★ Favorite", bootstyle="warning", command=lambda a=acc: self.add_to_favorites(a)).pack(side=tk.LEFT, padx=2)
-        tb.Button(btn_frame, text="↗ Open", bootstyle="info", command=lambda u=acc.url: webbrowser.open_new_tab(u)).pack(side=tk.LEFT, padx=2)
+        tb.Button(btn_frame, text="↗ Open", bootstyle="info", command=lambda a=acc: self.open_accommodation(a)).pack(side=tk.LEFT, padx=2)
 
         container_widget.configure(state="normal")
         container_widget.window_create("end", window=frame)
@@ -272,15 +301,7 @@ class AccommodationEngine:
         container_widget.configure(state="disabled")
 
         # Async image loading
-        def load_cover_async():
-            img = load_cover(acc.image_url)
-            if img:
-                def set_img():
-                    if art_label.winfo_exists():
-                        art_label.configure(image=img)
-                        art_label.image = img
-                container_widget.after(0, set_img)
-        threading.Thread(target=load_cover_async, daemon=True).start()
+        images.request(acc.image_url, COVER_SIZE, container_widget, lambda photo: set_image(art_label, photo))
 
     # ---------------- PAGINATION ---------------- #
     def next_page(self):
@@ -0,0 +1,144 @@
+"""
+Shared cover/thumbnail loader for the result cards.
+
+Downloads go through one pooled requests.Session with a timeout on a fixed
+worker pool, and the raw bytes are kept on disk under the SHA-1 of the URL.
+Decoded, resized PhotoImages are kept in an in-memory LRU bounded by a byte
+budget, so showing a page again costs no network or decode work.
+
+PhotoImages are only created on the Tk thread: workers decode to PIL images
+and hand them over with widget.after().
+"""
+import io
+import os
+import hashlib
+import threading
+import tkinter as tk
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from PIL import Image, ImageTk
+
+# ---------------- CONFIG ---------------- #
+IMAGE_CACHE_DIR = "image_cache"
+MEMORY_BUDGET = 64 * 1024 * 1024  # Bytes of decoded RGBA pixels kept in memory
+MAX_WORKERS = 4
+TIMEOUT = 10
+
+Key = Tuple[str, Tuple[int, int]]
+
+
+class ImageService:
+    def __init__(self, cache_dir: str = IMAGE_CACHE_DIR, max_bytes: int = MEMORY_BUDGET,
+                 max_workers: int = MAX_WORKERS, timeout: float = TIMEOUT):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        os.makedirs(cache_dir, exist_ok=True)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="images")
+        self.memory: "OrderedDict[Key, ImageTk.PhotoImage]" = OrderedDict()
+        self.used = 0
+        self.pending: Dict[Key, List[Callable]] = {}  # Loads in flight and who is waiting for them
+        self.lock = threading.RLock()
+
+    # ---------- DISK ---------- #
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest())
+
+    def _fetch(self, url: str) -> bytes:
+        path = self._path(url)
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(response.content)
+        os.replace(tmp, path)
+        return response.content
+
+    def _decode(self, url: str, size: Tuple[int, int]) -> Optional[Image.Image]:
+        try:
+            img = Image.open(io.BytesIO(self._fetch(url)))
+            img.draft("RGB", size)  # JPEGs decode straight at a reduced scale
+            return img.convert("RGB").resize(size)
+        except (requests.RequestException, OSError, ValueError):
+            return None
+
+    # ---------- MEMORY ---------- #
+    def get(self, url: str, size: Tuple[int, int]) -> Optional[ImageTk.PhotoImage]:
+        """Cached PhotoImage or None"""
+        key = (url, tuple(size))
+        with self.lock:
+            photo = self.memory.get(key)
+            if photo is not None:
+                self.memory.move_to_end(key)
+            return photo
+
+    def _store(self, key: Key, img: Image.Image) -> ImageTk.PhotoImage:
+        photo = ImageTk.PhotoImage(img)
+        with self.lock:
+            self.memory[key] = photo
+            self.used += img.width * img.height * 4
+            while self.used > self.max_bytes and len(self.memory) > 1:
+                _, old = self.memory.popitem(last=False)
+                self.used -= old.width() * old.height() * 4
+        return photo
+
+    # ---------- LOADING ---------- #
+    def request(self, url: str, size: Tuple[int, int], widget: tk.Misc,
+                callback: Optional[Callable[[ImageTk.PhotoImage], None]] = None):
+        """Deliver the image to callback on the Tk thread, loading it in the pool if needed"""
+        if not url:
+            return
+        key = (url, tuple(size))
+        photo = self.get(url, size)
+        if photo is not None:
+            if callback:
+                callback(photo)
+            return
+        with self.lock:
+            waiting = self.pending.get(key)
+            if waiting is not None:
+                if callback:
+                    waiting.append(callback)
+                return
+            self.pending[key] = [callback] if callback else []
+        # Deliver through the toplevel so a card destroyed mid-load doesn't drop the result
+        self.pool.submit(self._load, key, widget.winfo_toplevel())
+
+    def _load(self, key: Key, widget: tk.Misc):
+        img = self._decode(*key)
+
+        def deliver():
+            with self.lock:
+                callbacks = self.pending.pop(key, [])
+            if img is None:
+                return
+            photo = self.get(*key) or self._store(key, img)
+            for callback in callbacks:
+                try:
+                    callback(photo)
+                except tk.TclError:  # Card was destroyed while loading
+                    pass
+
+        try:
+            widget.after(0, deliver)
+        except (tk.TclError, RuntimeError):  # Window closed
+            with self.lock:
+                self.pending.pop(key, None)
+
+    def prefetch(self, urls: Iterable[str], size: Tuple[int, int], widget: tk.Misc):
+        """Warm the caches for cards that are likely to be shown next"""
+        for url in urls:
+            self.request(url, size, widget)
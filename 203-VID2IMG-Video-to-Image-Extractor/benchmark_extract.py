@@ -0,0 +1,89 @@
+"""
+Frames/sec of the old read-every-frame loop vs frame_engine, per interval.
+
+    python benchmark_extract.py [video] [--intervals 1 10 30 100 300] [--workers N] [--scenes]
+
+Without a video a 60 s 720p test clip is generated first. "frames/s" is
+source frames covered per second of wall time, so it is comparable across
+intervals. The old loop is measured without its 10 ms sleep and Tk calls,
+i.e. the best it could do. --scenes adds scene mode (same sampling, only
+scene changes written) with the number of images each mode wrote.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from frame_engine import SCENE_THRESHOLD, default_workers, extract_frames
+
+
+def make_clip(path: str, seconds: int = 60, fps: int = 30, size=(1280, 720)):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    base = cv2.resize(np.random.default_rng(0).integers(0, 255, (90, 160, 3), dtype=np.uint8), size)
+    for i in range(seconds * fps):
+        frame = np.roll(base, i * 4, axis=1)
+        if (i // (10 * fps)) % 2:
+            frame = 255 - frame  # A "cut" every 10 s, alternating between two looks
+        cv2.putText(frame, str(i), (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 3, (0, 255, 0), 5)
+        writer.write(frame)
+    writer.release()
+
+
+def old_loop(video_path: str, output_folder: str, interval: int) -> int:
+    cap = cv2.VideoCapture(video_path)
+    current_frame = 0
+    while cap.isOpened():
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if current_frame % interval == 0:
+            cv2.imwrite(os.path.join(output_folder, f"frame_{current_frame}.jpg"), frame)
+        current_frame += 1
+    cap.release()
+    return current_frame
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("video", nargs="?")
+    parser.add_argument("--intervals", type=int, nargs="+", default=[1, 10, 30, 100, 300])
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--scenes", action="store_true", help="also run scene mode")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="vid2img_bench_")
+    try:
+        video = args.video
+        if not video:
+            video = os.path.join(tmp, "clip.mp4")
+            print("Generating 60 s 720p test clip...")
+            make_clip(video)
+
+        print(f"workers={args.workers}")
+        print(f"{'interval':>8} {'old frames/s':>13} {'engine frames/s':>16} {'speedup':>8}")
+        for interval in args.intervals:
+            out = os.path.join(tmp, f"old_{interval}")
+            os.makedirs(out)
+            start = time.perf_counter()
+            frames = old_loop(video, out, interval)
+            old_fps = frames / (time.perf_counter() - start)
+
+            result = extract_frames(video, os.path.join(tmp, f"new_{interval}"), interval, workers=args.workers)
+            line = (f"{interval:>8} {old_fps:>13.0f} {result.frames_per_second:>16.0f} "
+                    f"{result.frames_per_second / old_fps:>7.1f}x")
+            if args.scenes:
+                scenes = extract_frames(video, os.path.join(tmp, f"scenes_{interval}"), interval,
+                                        workers=args.workers, scene_threshold=SCENE_THRESHOLD)
+                line += (f"   scenes: {scenes.frames_per_second:.0f} frames/s, "
+                         f"{scenes.saved} images vs {result.saved} ({scenes.duplicates} duplicates dropped)")
+            print(line)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
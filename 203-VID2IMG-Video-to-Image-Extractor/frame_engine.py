@@ -0,0 +1,330 @@
+"""
+Frame extraction engine for VID2IMG.
+
+The video is split into contiguous frame ranges, one per worker process, and
+each worker opens its own capture, seeks to the start of its range and walks
+it without converting frames nobody asked for:
+
+- small intervals: grab() every frame and retrieve() only the selected ones,
+  which skips the BGR conversion and copy for everything in between;
+- large intervals (>= SEEK_MIN_INTERVAL): seek straight to the next selected
+  frame, so the decoder only runs from the nearest keyframe.
+
+Selected frames are encoded on a small per-process writer pool (imwrite
+releases the GIL), and progress goes through shared counters that the caller
+polls, so there is one UI update per PROGRESS_INTERVAL instead of per frame.
+
+Scene mode samples frames the same way but only writes a frame when its
+signature (a 32-bin luma histogram and a 64-bit dHash, both taken from a
+64x36 thumbnail) differs from the previous sample by more than a threshold,
+and skips it when a near-identical frame was already written (HashIndex).
+"""
+import os
+import time
+import multiprocessing
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# ================= CONFIG =================
+SEEK_MIN_INTERVAL = 120  # From here on seeking beats decoding every frame for typical GOP sizes
+WRITER_THREADS = 2  # imwrite threads per worker process
+MAX_PENDING_WRITES = 8  # Decoded frames waiting for the writer pool, per process
+PROGRESS_INTERVAL = 0.2  # Seconds between progress callbacks
+MIN_RANGE_FRAMES = 600  # Don't start a process for less than this
+SIGNATURE_SIZE = (64, 36)  # Thumbnail the scene signature is computed from
+HIST_BINS = 32
+SCENE_THRESHOLD = 0.3  # 0..1, see scene_score
+DEDUP_DISTANCE = 3  # Max differing dHash bits for two frames to count as duplicates
+
+
+class ExtractResult(NamedTuple):
+    saved: int
+    frames: int  # Source frames covered
+    elapsed: float
+    stopped: bool
+    duplicates: int = 0  # Scene mode: scene changes dropped as near-duplicates
+
+    @property
+    def frames_per_second(self) -> float:
+        return self.frames / self.elapsed if self.elapsed else 0.0
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def probe(video_path: str) -> Tuple[int, float]:
+    """(frame count, fps) as reported by the container"""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            raise ValueError(f"Cannot open video: {video_path}")
+        return int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), cap.get(cv2.CAP_PROP_FPS) or 0.0
+    finally:
+        cap.release()
+
+
+def split_ranges(total_frames: int, interval: int, parts: int) -> List[Tuple[int, Optional[int]]]:
+    """
+    Contiguous [start, end) ranges starting on multiples of interval. The last
+    range is open-ended because container frame counts are not always exact.
+    """
+    parts = max(1, min(parts, total_frames // max(MIN_RANGE_FRAMES, interval)))
+    step = -(-total_frames // parts)
+    step = -(-step // interval) * interval  # Round up to a whole number of intervals
+    starts = list(range(0, total_frames, step)) or [0]
+    return [(start, starts[i + 1] if i + 1 < len(starts) else None) for i, start in enumerate(starts)]
+
+
+# ================= SCENE DETECTION =================
+Signature = Tuple[np.ndarray, int]
+
+
+def frame_signature(frame: np.ndarray) -> Signature:
+    """(normalized luma histogram, 64-bit dHash) of a BGR frame"""
+    small = cv2.resize(frame, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA)
+    luma = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    hist = np.bincount((luma >> 3).ravel(), minlength=HIST_BINS).astype(np.float32) / luma.size
+    tiny = cv2.resize(luma, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = np.packbits(tiny[:, 1:] > tiny[:, :-1])
+    return hist, int.from_bytes(bits.tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def scene_score(a: Signature, b: Signature) -> float:
+    """
+    0 for identical frames, 1 for nothing in common. The histogram catches
+    cuts between shots with different lighting, the hash catches cuts where
+    the tones match but the layout does not.
+    """
+    return max(0.5 * float(np.abs(a[0] - b[0]).sum()), hamming(a[1], b[1]) / 64)
+
+
+class HashIndex:
+    """
+    64-bit hashes looked up by Hamming distance. Each hash is split into
+    max_distance + 1 bands; two hashes within max_distance bits must agree
+    exactly on at least one band, so only hashes sharing a band are compared.
+    """
+
+    def __init__(self, max_distance: int = DEDUP_DISTANCE):
+        self.max_distance = max(0, min(max_distance, 63))
+        count = self.max_distance + 1
+        width = 64 // count
+        self.bands = [(i * width, 64 if i == count - 1 else (i + 1) * width) for i in range(count)]
+        self.tables: List[Dict[int, List[int]]] = [{} for _ in self.bands]
+
+    def _keys(self, value: int):
+        for lo, hi in self.bands:
+            yield (value >> lo) & ((1 << (hi - lo)) - 1)
+
+    def find(self, value: int) -> Optional[int]:
+        """A stored hash within max_distance of value, or None"""
+        for table, key in zip(self.tables, self._keys(value)):
+            for other in table.get(key, ()):
+                if hamming(value, other) <= self.max_distance:
+                    return other
+        return None
+
+    def add(self, value: int):
+        for table, key in zip(self.tables, self._keys(value)):
+            table.setdefault(key, []).append(value)
+
+
+class SceneFilter:
+    """Keeps a sampled frame if it starts a new scene and isn't a near-duplicate of a kept one"""
+
+    def __init__(self, threshold: float = SCENE_THRESHOLD, dedup_distance: Optional[int] = DEDUP_DISTANCE):
+        self.threshold = threshold
+        self.index = HashIndex(dedup_distance) if dedup_distance is not None else None
+        self.previous: Optional[Signature] = None
+        self.kept: List[Tuple[int, int]] = []  # (frame index, dHash)
+        self.duplicates = 0
+
+    def prime(self, frame: np.ndarray):
+        """Signature of the sample just before this range, so a range boundary is not a cut"""
+        self.previous = frame_signature(frame)
+
+    def keep(self, index: int, frame: np.ndarray) -> bool:
+        signature = frame_signature(frame)
+        previous, self.previous = self.previous, signature
+        if previous is not None and scene_score(previous, signature) < self.threshold:
+            return False
+        if self.index is not None:
+            if self.index.find(signature[1]) is not None:
+                self.duplicates += 1
+                return False
+            self.index.add(signature[1])
+        self.kept.append((index, signature[1]))
+        return True
+
+
+# ================= WORKER =================
+_frames_done = None  # multiprocessing.Value shared with the parent
+_saved = None
+_stop = None
+
+
+def _init_worker(frames_done, saved, stop):
+    global _frames_done, _saved, _stop
+    _frames_done, _saved, _stop = frames_done, saved, stop
+
+
+def _add(counter, n: int):
+    if n:
+        with counter.get_lock():
+            counter.value += n
+
+
+def extract_range(video_path: str, start: int, end: Optional[int], interval: int,
+                  output_folder: str, prefix: str, fmt: str,
+                  scenes: Optional[Tuple[float, Optional[int]]] = None) -> Tuple[int, int, int, "SceneFilter"]:
+    """
+    Save every interval-th frame in [start, end), or with scenes=(threshold,
+    dedup distance) only the sampled frames that start a new scene.
+    Returns (start, frames covered, images saved, scene filter or None).
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Cannot open video: {video_path}")
+    scene_filter = SceneFilter(*scenes) if scenes else None
+    if scene_filter is not None and start >= interval:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start - interval)
+        ok, frame = cap.read()
+        if ok:
+            scene_filter.prime(frame)
+    seek = interval >= SEEK_MIN_INTERVAL
+    params = [cv2.IMWRITE_JPEG_QUALITY, 95] if fmt in ("jpg", "jpeg") else []
+    pending = deque()
+    saved = covered = unreported = reported_saved = 0
+    last_report = time.perf_counter()
+    if start or scene_filter is not None:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    index = start
+    with ThreadPoolExecutor(max_workers=WRITER_THREADS) as writers:
+        try:
+            while end is None or index < end:
+                if _stop is not None and _stop.is_set():
+                    break
+                if (index - start) % interval == 0:
+                    ok, frame = cap.read()
+                    if not ok:
+                        break
+                    if scene_filter is None or scene_filter.keep(index, frame):
+                        path = os.path.join(output_folder, f"{prefix}_{index}.{fmt}")
+                        pending.append(writers.submit(cv2.imwrite, path, frame, params))
+                        while len(pending) > MAX_PENDING_WRITES:
+                            saved += bool(pending.popleft().result())
+                    advance = interval if seek else 1
+                    if seek:
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, index + interval)
+                elif cap.grab():
+                    advance = 1
+                else:
+                    break
+                if end is not None:
+                    advance = min(advance, end - index)
+                index += advance
+                covered += advance
+                unreported += advance
+                now = time.perf_counter()
+                if now - last_report >= PROGRESS_INTERVAL and _frames_done is not None:
+                    _add(_frames_done, unreported)
+                    _add(_saved, saved - reported_saved)
+                    unreported, reported_saved = 0, saved
+                    last_report = now
+        finally:
+            while pending:
+                saved += bool(pending.popleft().result())
+            cap.release()
+    if _frames_done is not None:
+        _add(_frames_done, unreported)
+        _add(_saved, saved - reported_saved)
+    return start, covered, saved, scene_filter
+
+
+# ================= ENGINE =================
+def extract_frames(video_path: str, output_folder: str, interval: int, prefix: str = "frame",
+                   fmt: str = "jpg", workers: Optional[int] = None,
+                   stop: Optional["multiprocessing.synchronize.Event"] = None,
+                   progress: Optional[Callable[[int, int, int], None]] = None,
+                   on_range: Optional[Callable[[int, int, int], None]] = None,
+                   scene_threshold: Optional[float] = None,
+                   dedup_distance: Optional[int] = DEDUP_DISTANCE) -> ExtractResult:
+    """
+    Extract every interval-th frame into output_folder as <prefix>_<frame>.<fmt>.
+    With scene_threshold, every interval-th frame is only analysed and written
+    on a scene change; dedup_distance=None keeps near-duplicate scenes.
+
+    progress(frames_done, total_frames, images_saved) is called from this thread
+    at most every PROGRESS_INTERVAL; on_range(start, frames, saved) once per
+    finished range. stop must be a multiprocessing.Event so workers can see it.
+    """
+    interval = max(1, int(interval))
+    fmt = fmt.lower()
+    os.makedirs(output_folder, exist_ok=True)
+    total, _ = probe(video_path)
+    workers = workers or default_workers()
+    ranges = split_ranges(total, interval, workers)
+
+    frames_done = multiprocessing.Value("q", 0)
+    saved = multiprocessing.Value("q", 0)
+    stop = stop if stop is not None else multiprocessing.Event()
+    start_time = time.perf_counter()
+    covered = written = 0
+    scenes = (scene_threshold, dedup_distance) if scene_threshold is not None else None
+    filters: Dict[int, SceneFilter] = {}
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), initializer=_init_worker,
+                             initargs=(frames_done, saved, stop)) as executor:
+        futures = {executor.submit(extract_range, video_path, start, end, interval, output_folder, prefix, fmt, scenes)
+                   for start, end in ranges}
+        while futures:
+            done, futures = wait(futures, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                start, frames, count, scene_filter = future.result()
+                if scene_filter is not None:
+                    filters[start] = scene_filter
+                covered += frames
+                written += count
+                if on_range:
+                    on_range(start, frames, count)
+            if progress:
+                progress(frames_done.value, total, saved.value)
+
+    duplicates = 0
+    if filters:
+        removed, duplicates = _dedup_across_ranges(filters, output_folder, prefix, fmt, dedup_distance)
+        written -= removed
+        duplicates += removed
+    return ExtractResult(written, covered, time.perf_counter() - start_time, stop.is_set(), duplicates)
+
+
+def _dedup_across_ranges(filters: Dict[int, SceneFilter], output_folder: str, prefix: str, fmt: str,
+                         dedup_distance: Optional[int]) -> Tuple[int, int]:
+    """
+    Each worker only knows its own range's hashes; drop files that duplicate a
+    frame kept in an earlier range. Returns (files removed, duplicates seen in workers).
+    """
+    removed = 0
+    index = HashIndex(dedup_distance) if dedup_distance is not None and len(filters) > 1 else None
+    for start in sorted(filters):
+        for frame_index, value in filters[start].kept:
+            if index is None:
+                break
+            if index.find(value) is not None:
+                try:
+                    os.remove(os.path.join(output_folder, f"{prefix}_{frame_index}.{fmt}"))
+                    removed += 1
+                except OSError:
+                    pass
+            else:
+                index.add(value)
+    return removed, sum(f.duplicates for f in filters.values())
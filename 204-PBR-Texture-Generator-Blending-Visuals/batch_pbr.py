@@ -0,0 +1,44 @@
+"""
+Generate PBR maps for a single texture or a whole folder from the command line.
+
+    python batch_pbr.py textures/ --out pbr
+    python batch_pbr.py rock_16k.png --out pbr --maps normal roughness --no-mips --tile 2048
+
+A folder gets one output subfolder per texture.
+"""
+import argparse
+import os
+import time
+
+from pbr_engine import MAPS, TILE_SIZE, default_workers, generate_folder, generate_maps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiled PBR map generator")
+    parser.add_argument("source", help="image file or folder of images")
+    parser.add_argument("--out", default="pbr_maps")
+    parser.add_argument("--maps", nargs="+", choices=MAPS, default=list(MAPS))
+    parser.add_argument("--no-mips", action="store_true", help="skip the mip chain")
+    parser.add_argument("--tile", type=int, default=TILE_SIZE, help="tile size in pixels")
+    parser.add_argument("--workers", type=int, default=default_workers())
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if os.path.isdir(args.source):
+        def report(done, total, message):
+            print(f"[{done}/{total}] {message}")
+
+        results = generate_folder(args.source, args.out, args.maps, not args.no_mips, args.tile,
+                                  args.workers, progress=report)
+        count = len(results)
+        files = sum(len(r) for r in results.values() if not isinstance(r, str))
+    else:
+        count, files = 1, len(generate_maps(args.source, args.out, args.maps, not args.no_mips,
+                                            args.tile, args.workers))
+
+    elapsed = time.perf_counter() - start
+    print(f"{count} textures, {files} files in {elapsed:.1f}s ({count / elapsed:.2f} textures/s)")
+
+
+if __name__ == "__main__":
+    main()
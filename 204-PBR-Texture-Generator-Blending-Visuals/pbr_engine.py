@@ -0,0 +1,231 @@
+"""
+Tiled PBR map generation.
+
+The base image is decoded once, straight to grayscale (OpenCV's decoder
+conversion, which can differ from cvtColor by one level), into a
+memory-mapped .npy file. The maps are then computed tile by tile in a process pool, each
+worker reading its tile plus a HALO of neighbouring pixels so the Sobel,
+Gaussian and Canny kernels see the same input as on the full frame, and
+writing the tile (without the halo) into a memory-mapped output per map.
+Only a few tiles' worth of float32 is ever alive, so 16K textures fit in a
+few hundred MB of RAM regardless of how many maps are enabled.
+
+Each map is then written as PNG with an optional mip chain (each level an
+area-averaged half of the previous one; normal vectors are renormalized).
+
+Height is normalized with the min/max of the whole image, so it is
+identical to the untiled result. Canny's hysteresis can follow an edge
+further than the halo, so roughness may differ from a full-frame run in a
+few pixels along tile borders.
+"""
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# =================== CONFIG ===================
+MAPS = ("height", "normal", "ao", "roughness", "metallic")
+TILE_SIZE = 1024
+HALO = 16  # >= the largest kernel radius: AO blur 7, Canny 2 + roughness blur 3
+AO_KERNEL = (15, 15)
+ROUGHNESS_KERNEL = (7, 7)
+CANNY_THRESHOLDS = (50, 150)
+METALLIC_THRESHOLD = 180
+MIP_MIN_SIZE = 16  # Stop the mip chain once the smaller side would drop below this
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tga", ".tif", ".tiff", ".bmp")
+
+Rect = Tuple[int, int, int, int]  # x0, y0, x1, y1
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def tiles(width: int, height: int, size: int = TILE_SIZE) -> List[Rect]:
+    return [(x, y, min(width, x + size), min(height, y + size))
+            for y in range(0, height, size) for x in range(0, width, size)]
+
+
+# =================== MAPS ===================
+def height_lut(lo: int, hi: int) -> np.ndarray:
+    """Same stretch as cv2.normalize(NORM_MINMAX), as a 256-entry table"""
+    # Normalizing the levels lo..hi themselves gives cv2's exact rounding
+    levels = np.clip(np.arange(256), lo, hi).astype(np.uint8).reshape(1, 256)
+    return cv2.normalize(levels, None, 0, 255, cv2.NORM_MINMAX).ravel()
+
+
+def normal_tile(gray: np.ndarray) -> np.ndarray:
+    """BGR-ordered normal map; float32 and in place apart from the two Sobel outputs"""
+    sx = cv2.Sobel(gray, cv2.CV_32F, 1, 0)
+    sy = cv2.Sobel(gray, cv2.CV_32F, 0, 1)
+    length = cv2.magnitude(sx, sy)
+    cv2.multiply(length, length, dst=length)
+    length += 1
+    cv2.sqrt(length, dst=length)
+    cv2.divide(1.0, length, dst=length)  # 1 / |(-sx, -sy, 1)|, i.e. the z component
+    out = np.empty(gray.shape + (3,), np.uint8)
+    for channel, component in enumerate((sx, sy)):
+        cv2.multiply(component, length, dst=component)
+        out[..., channel] = component * -127.5 + 127.5  # (-c + 1) * 127.5, truncated like astype
+    out[..., 2] = length * 127.5 + 127.5
+    return out
+
+
+def compute_tile(gray: np.ndarray, maps: Iterable[str], lut: np.ndarray) -> Dict[str, np.ndarray]:
+    """All requested maps for one (haloed) grayscale tile"""
+    result = {}
+    for name in maps:
+        if name == "height":
+            result[name] = cv2.LUT(gray, lut)
+        elif name == "normal":
+            result[name] = normal_tile(gray)
+        elif name == "ao":
+            result[name] = cv2.GaussianBlur(255 - gray, AO_KERNEL, 0)
+        elif name == "roughness":
+            edges = cv2.Canny(gray, *CANNY_THRESHOLDS)
+            result[name] = cv2.GaussianBlur(255 - edges, ROUGHNESS_KERNEL, 0)
+        elif name == "metallic":
+            result[name] = cv2.threshold(gray, METALLIC_THRESHOLD, 255, cv2.THRESH_BINARY)[1]
+    return result
+
+
+# =================== WORKERS ===================
+def _process_tile(gray_path: str, out_paths: Dict[str, str], rect: Rect, lut: np.ndarray) -> Rect:
+    gray = np.load(gray_path, mmap_mode="r")
+    height, width = gray.shape
+    x0, y0, x1, y1 = rect
+    # Tile plus halo, clipped to the image (at the image edge cv2's own border handling applies, as before)
+    hx0, hy0 = max(0, x0 - HALO), max(0, y0 - HALO)
+    hx1, hy1 = min(width, x1 + HALO), min(height, y1 + HALO)
+    block = np.ascontiguousarray(gray[hy0:hy1, hx0:hx1])
+    for name, data in compute_tile(block, out_paths, lut).items():
+        out = np.load(out_paths[name], mmap_mode="r+")
+        out[y0:y1, x0:x1] = data[y0 - hy0:y1 - hy0, x0 - hx0:x1 - hx0]
+        out.flush()
+        del out
+    return rect
+
+
+def downsample(img: np.ndarray, is_normal: bool = False) -> np.ndarray:
+    """Half-size mip level; normal vectors are renormalized after averaging"""
+    half = cv2.resize(img, (max(1, img.shape[1] // 2), max(1, img.shape[0] // 2)), interpolation=cv2.INTER_AREA)
+    if is_normal:
+        vectors = half.astype(np.float32) / 127.5 - 1
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=2, keepdims=True), 1e-6)
+        half = ((vectors + 1) * 127.5).astype(np.uint8)
+    return half
+
+
+def _write_map(map_path: str, png_path: str, is_normal: bool, mips: bool) -> List[str]:
+    """Encode a finished map (and its mip chain) from its memmap"""
+    img = np.load(map_path, mmap_mode="r")
+    cv2.imwrite(png_path, img)
+    written = [png_path]
+    if mips:
+        stem, ext = os.path.splitext(png_path)
+        level = 1
+        current = img
+        while min(current.shape[:2]) // 2 >= MIP_MIN_SIZE:
+            current = downsample(current, is_normal)
+            path = f"{stem}_mip{level}{ext}"
+            cv2.imwrite(path, current)
+            written.append(path)
+            level += 1
+    del img
+    return written
+
+
+# =================== ENGINE ===================
+def generate_maps(image_path: str, output_dir: str, maps: Iterable[str] = MAPS, mips: bool = True,
+                  tile_size: int = TILE_SIZE, workers: Optional[int] = None,
+                  executor: Optional[ProcessPoolExecutor] = None,
+                  progress: Optional[Callable[[int, int, str], None]] = None) -> List[str]:
+    """
+    Write <base>_<map>.png (+ _mipN levels) for one image; returns the files written.
+    progress(done, total, message) is called after every tile and every finished map.
+    Pass an executor to share one pool across many images (see generate_folder).
+    """
+    maps = [m for m in MAPS if m in set(maps)]
+    if not maps:
+        return []
+    base = os.path.splitext(os.path.basename(image_path))[0]
+    gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        raise ValueError(f"Cannot read image: {image_path}")
+    os.makedirs(output_dir, exist_ok=True)
+    height, width = gray.shape
+    lo, hi = int(gray.min()), int(gray.max())
+
+    own_pool = executor is None
+    pool = executor or ProcessPoolExecutor(max_workers=workers or default_workers())
+    scratch = tempfile.mkdtemp(prefix=".pbr_", dir=output_dir)
+    try:
+        gray_path = os.path.join(scratch, "gray.npy")
+        np.save(gray_path, gray)
+        del gray  # Workers read the memmap
+        out_paths = {}
+        for name in maps:
+            shape = (height, width, 3) if name == "normal" else (height, width)
+            out_paths[name] = os.path.join(scratch, f"{name}.npy")
+            np.lib.format.open_memmap(out_paths[name], mode="w+", dtype=np.uint8, shape=shape).flush()
+
+        rects = tiles(width, height, tile_size)
+        total = len(rects) + len(maps)
+        done = 0
+        lut = height_lut(lo, hi)
+        for future in as_completed([pool.submit(_process_tile, gray_path, out_paths, rect, lut) for rect in rects]):
+            future.result()
+            done += 1
+            if progress:
+                progress(done, total, "")
+
+        written = []
+        jobs = {pool.submit(_write_map, out_paths[name], os.path.join(output_dir, f"{base}_{name}.png"),
+                            name == "normal", mips): name for name in maps}
+        for future in as_completed(jobs):
+            written.extend(future.result())
+            done += 1
+            if progress:
+                progress(done, total, f"{jobs[future].capitalize()} map generated")
+        return written
+    finally:
+        if own_pool:
+            pool.shutdown()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def list_images(folder: str) -> List[str]:
+    return sorted(os.path.join(folder, f) for f in os.listdir(folder)
+                  if f.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(os.path.join(folder, f)))
+
+
+def generate_folder(folder: str, output_dir: str, maps: Iterable[str] = MAPS, mips: bool = True,
+                    tile_size: int = TILE_SIZE, workers: Optional[int] = None,
+                    progress: Optional[Callable[[int, int, str], None]] = None,
+                    stop: Optional[Callable[[], bool]] = None) -> Dict[str, object]:
+    """
+    Every image in folder through one shared pool; each texture gets its own
+    subfolder of output_dir. Returns {image path: files written or error message}.
+    progress(done, total, message) counts whole images.
+    """
+    images = list_images(folder)
+    results: Dict[str, object] = {}
+    with ProcessPoolExecutor(max_workers=workers or default_workers()) as pool:
+        for i, path in enumerate(images):
+            if stop and stop():
+                break
+            name = os.path.splitext(os.path.basename(path))[0]
+            try:
+                results[path] = generate_maps(path, os.path.join(output_dir, name), maps, mips,
+                                              tile_size, executor=pool)
+                message = f"{os.path.basename(path)}: {len(results[path])} files"
+            except Exception as e:
+                results[path] = str(e)
+                message = f"{os.path.basename(path)}: error: {e}"
+            if progress:
+                progress(i + 1, len(images), message)
+    return results
@@ -0,0 +1,47 @@
+"""
+Scope rendering speed per capture size and sampling step.
+
+    python benchmark_scopes.py [--frames 60]
+
+Renders random-noise frames (the worst case: every U/V bin occupied) into a
+1240x680 canvas image and prints frames/sec, next to the number of canvas
+items the old draw_scopes created for the same frame.
+"""
+import argparse
+import time
+
+import numpy as np
+from PIL import Image
+
+from scope_render import ScopeRenderer
+
+SIZES = {"720p": (720, 1280), "1080p": (1080, 1920), "1440p": (1440, 2560)}
+CANVAS = (1240, 680)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=60)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    renderer = ScopeRenderer()
+    print(f"{'capture':>8} {'step':>5} {'old canvas items':>17} {'render fps':>11} {'+ PIL image fps':>16}")
+    for name, (h, w) in SIZES.items():
+        frame = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+        for step in (1, 2, 4):
+            old_items = -(-h // step) * -(-w // step) + 4 * 256 + 4
+            renderer.render(frame, *CANVAS, step=step, gain=4)
+            start = time.perf_counter()
+            for _ in range(args.frames):
+                renderer.render(frame, *CANVAS, step=step, gain=4)
+            render_fps = args.frames / (time.perf_counter() - start)
+            start = time.perf_counter()
+            for _ in range(args.frames):
+                Image.fromarray(renderer.render(frame, *CANVAS, step=step, gain=4))
+            image_fps = args.frames / (time.perf_counter() - start)
+            print(f"{name:>8} {step:>5} {old_items:>17,} {render_fps:>11.0f} {image_fps:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
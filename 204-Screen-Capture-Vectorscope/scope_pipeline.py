@@ -0,0 +1,338 @@
+"""
+Capture -> scopes -> screen and capture -> encode, as separate stages.
+
+Stages hand frames over through FrameRing: a fixed set of preallocated frame
+slots plus two queues of slot numbers (free / ready), so nothing is allocated
+per frame and a slow stage can never block the capture loop:
+
+- the scope stage only wants the newest frame; when it falls behind, older
+  waiting frames are recycled and counted as drops;
+- the encoder wants every frame; when its ring is full the new frame is
+  dropped and counted, instead of stalling capture as before.
+
+With shared=True the slots live in multiprocessing shared memory and the
+queues are multiprocessing queues, so the scope stage can run in its own
+process; its rendered images come back through a second shared ring.
+"""
+import os
+import time
+import queue
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Iterable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from scope_render import ScopeRenderer
+
+# ================= CONFIG =================
+SCOPE_SLOTS = 3  # Capture -> scopes; only the newest frame matters
+RESULT_SLOTS = 2  # Scopes -> UI
+RECORD_SLOTS = 16  # Capture -> encoder; absorbs encoder stalls of about half a second
+MAX_INDICATORS = 16
+POLL_INTERVAL = 0.1
+
+
+# ================= RING =================
+class FrameRing:
+    """Bounded ring of preallocated HxWx3 uint8 frame slots, up to max_shape in size"""
+
+    def __init__(self, slots: int, max_shape: Tuple[int, int], shared: bool = False):
+        self.slots = slots
+        self.slot_size = max_shape[0] * max_shape[1] * 3
+        self.shared = shared
+        self._owner = os.getpid()  # Only the creating process unlinks (a forked child has the same object)
+        if shared:
+            self._shm = shared_memory.SharedMemory(create=True, size=slots * self.slot_size)
+            self.buffer = np.ndarray((slots, self.slot_size), np.uint8, buffer=self._shm.buf)
+            self.free, self.ready = multiprocessing.Queue(), multiprocessing.Queue()
+        else:
+            self._shm = None
+            self.buffer = np.empty((slots, self.slot_size), np.uint8)
+            self.free, self.ready = queue.Queue(), queue.Queue()
+        self.drops = multiprocessing.Value("q", 0)
+        for index in range(slots):
+            self.free.put(index)
+
+    # Only shared rings cross process boundaries: the child re-attaches by name
+    def __getstate__(self):
+        if not self.shared:
+            raise TypeError("Only a shared FrameRing can be sent to another process")
+        state = self.__dict__.copy()
+        state.update(_shm=self._shm.name, buffer=None, _owner=None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Child processes share the creator's resource tracker, so attaching needs no extra bookkeeping
+        self._shm = shared_memory.SharedMemory(name=state["_shm"])
+        self.buffer = np.ndarray((self.slots, self.slot_size), np.uint8, buffer=self._shm.buf)
+
+    def _count_drop(self):
+        with self.drops.get_lock():
+            self.drops.value += 1
+
+    def view(self, index: int, height: int, width: int) -> np.ndarray:
+        """Contiguous (height, width, 3) view of a slot"""
+        return self.buffer[index, :height * width * 3].reshape(height, width, 3)
+
+    def put(self, frame: np.ndarray, overwrite: bool = False) -> bool:
+        """
+        Copy frame into a free slot. When none is free, overwrite=True recycles
+        the oldest waiting frame, otherwise the new frame is dropped.
+        """
+        try:
+            index = self.free.get_nowait()
+        except queue.Empty:
+            self._count_drop()
+            if not overwrite:
+                return False
+            try:
+                index = self.ready.get_nowait()[0]
+            except queue.Empty:
+                return False  # The consumer holds every slot
+        height, width = frame.shape[:2]
+        np.copyto(self.view(index, height, width), frame)
+        self.ready.put((index, height, width))
+        return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[int, np.ndarray]]:
+        """Oldest waiting (slot, frame view), or None; the slot must be release()d"""
+        try:
+            index, height, width = self.ready.get(timeout=timeout) if timeout else self.ready.get_nowait()
+        except queue.Empty:
+            return None
+        return index, self.view(index, height, width)
+
+    def get_latest(self, timeout: Optional[float] = None) -> Optional[Tuple[int, np.ndarray]]:
+        """Newest waiting frame; older ones are released and counted as drops"""
+        item = self.get(timeout)
+        while item is not None:
+            newer = self.get()
+            if newer is None:
+                break
+            self.release(item[0])
+            self._count_drop()
+            item = newer
+        return item
+
+    def release(self, index: int):
+        self.free.put(index)
+
+    def close(self):
+        self.buffer = None
+        if self._shm is not None:
+            self._shm.close()
+            if self._owner == os.getpid():
+                self._shm.unlink()
+            self._shm = None
+
+
+# ================= STATS =================
+class StageStats:
+    """Frame counter shared across processes; rate() is sampled by the UI"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.frames = multiprocessing.Value("q", 0)
+        self._last = (0, time.perf_counter())
+        self.fps = 0.0
+
+    def __getstate__(self):
+        return {"name": self.name, "frames": self.frames, "_last": (0, 0.0), "fps": 0.0}
+
+    def tick(self):
+        with self.frames.get_lock():
+            self.frames.value += 1
+
+    def rate(self) -> float:
+        frames, now = self.frames.value, time.perf_counter()
+        last_frames, last_time = self._last
+        if now - last_time > 0:
+            self.fps = (frames - last_frames) / (now - last_time)
+        self._last = (frames, now)
+        return self.fps
+
+
+class ScopeSettings:
+    """Canvas size, sampling step, gain and color indicators, readable from the scope process"""
+
+    def __init__(self):
+        self.values = multiprocessing.Array("d", 5 + 3 * MAX_INDICATORS)
+
+    def set(self, width: int, height: int, step: int, gain: float,
+            indicators: Iterable[Tuple[float, float, float]] = ()):
+        indicators = list(indicators)[-MAX_INDICATORS:]
+        with self.values.get_lock():
+            self.values[:5] = [width, height, step, gain, len(indicators)]
+            for i, rgb in enumerate(indicators):
+                self.values[5 + 3 * i:8 + 3 * i] = list(rgb)
+
+    def get(self):
+        with self.values.get_lock():
+            values = self.values[:]
+        count = int(values[4])
+        indicators = [tuple(values[5 + 3 * i:8 + 3 * i]) for i in range(count)]
+        return int(values[0]), int(values[1]), int(values[2]), values[3], indicators
+
+
+# ================= STAGES =================
+def scope_loop(frames: FrameRing, results: FrameRing, settings: ScopeSettings, stats: StageStats, stop):
+    """Render the newest captured frame into results until stop is set (thread or process)"""
+    renderer = ScopeRenderer()
+    try:
+        while not stop.is_set():
+            item = frames.get_latest(timeout=POLL_INTERVAL)
+            if item is None:
+                continue
+            index, frame = item
+            try:
+                width, height, step, gain, indicators = settings.get()
+                if width >= 50 and height >= 50:
+                    results.put(renderer.render(frame, width, height, step, gain, indicators, bgr=True),
+                                overwrite=True)
+            finally:
+                frames.release(index)
+            stats.tick()
+    finally:
+        if frames.shared:  # Child-side handles
+            frames.close()
+            results.close()
+
+
+class Recorder:
+    """Encode stage: its own ring and thread, so a slow VideoWriter only drops recorded frames"""
+
+    def __init__(self, path: str, fps: float, max_shape: Tuple[int, int], slots: int = RECORD_SLOTS):
+        self.path = path
+        self.fps = fps
+        self.frames = FrameRing(slots, max_shape)
+        self.stats = StageStats("Encode")
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, frame: np.ndarray) -> bool:
+        return self.frames.put(frame)
+
+    def _run(self):
+        writer = None
+        size = None
+        try:
+            # Keep draining after stop() so everything captured gets written
+            while not (self._stop.is_set() and self.frames.ready.empty()):
+                item = self.frames.get(timeout=POLL_INTERVAL)
+                if item is None:
+                    continue
+                index, frame = item
+                try:
+                    if writer is None:
+                        size = (frame.shape[1], frame.shape[0])
+                        writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*"mp4v"), self.fps, size)
+                    if (frame.shape[1], frame.shape[0]) != size:
+                        frame = cv2.resize(frame, size)  # ROI changed mid-recording
+                    if writer.isOpened():
+                        writer.write(frame)
+                finally:
+                    self.frames.release(index)
+                self.stats.tick()
+        finally:
+            if writer is not None:
+                writer.release()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.frames.close()
+
+
+class ScopePipeline:
+    """Owns the scope stage (thread or process), its rings and the optional recorder"""
+
+    def __init__(self, max_shape: Tuple[int, int], max_canvas: Tuple[int, int]):
+        self.max_shape = max_shape
+        self.max_canvas = max_canvas
+        self.settings = ScopeSettings()
+        self.capture_stats = StageStats("Capture")
+        self.scope_stats = StageStats("Scopes")
+        self.frames: Optional[FrameRing] = None
+        self.results: Optional[FrameRing] = None
+        self.recorder: Optional[Recorder] = None
+        self._stage = None
+        self._stop = None
+        self._lock = threading.Lock()
+
+    # ---- SCOPE STAGE ----
+    def start(self, in_process: bool = False):
+        with self._lock:
+            if self._stage is not None:
+                return
+            self.frames = FrameRing(SCOPE_SLOTS, self.max_shape, shared=in_process)
+            self.results = FrameRing(RESULT_SLOTS, self.max_canvas, shared=in_process)
+            if in_process:
+                self._stop = multiprocessing.Event()
+                self._stage = multiprocessing.Process(
+                    target=scope_loop, daemon=True,
+                    args=(self.frames, self.results, self.settings, self.scope_stats, self._stop))
+            else:
+                self._stop = threading.Event()
+                self._stage = threading.Thread(
+                    target=scope_loop, daemon=True,
+                    args=(self.frames, self.results, self.settings, self.scope_stats, self._stop))
+            self._stage.start()
+
+    def stop(self):
+        with self._lock:
+            if self._stage is None:
+                return
+            self._stop.set()
+            self._stage.join(timeout=2)
+            if isinstance(self._stage, multiprocessing.Process) and self._stage.is_alive():
+                self._stage.terminate()
+            self.frames.close()
+            self.results.close()
+            self._stage = self.frames = self.results = None
+
+    def configure(self, width: int, height: int, step: int, gain: float, indicators=()):
+        width, height = min(width, self.max_canvas[1]), min(height, self.max_canvas[0])
+        self.settings.set(width, height, step, gain, indicators)
+
+    def submit(self, frame: np.ndarray):
+        """Called by the capture stage for every frame"""
+        self.capture_stats.tick()
+        with self._lock:
+            if self.frames is not None:
+                self.frames.put(frame, overwrite=True)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.submit(frame)
+
+    def latest_scope(self) -> Optional[Tuple[int, np.ndarray]]:
+        """Newest rendered scope image; release_scope() it after use"""
+        return self.results.get_latest() if self.results is not None else None
+
+    def release_scope(self, index: int):
+        if self.results is not None:
+            self.results.release(index)
+
+    # ---- RECORDING ----
+    def start_recording(self, path: str, fps: float):
+        if self.recorder is None:
+            self.recorder = Recorder(path, fps, self.max_shape)
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.stop()
+
+    def status(self) -> str:
+        """Per-stage fps and drops for the status line"""
+        parts = [f"Capture {self.capture_stats.rate():.1f} fps"]
+        if self.frames is not None:
+            parts.append(f"Scopes {self.scope_stats.rate():.1f} fps, {self.frames.drops.value} dropped")
+        recorder = self.recorder
+        if recorder is not None:
+            parts.append(f"Encode {recorder.stats.rate():.1f} fps, {recorder.frames.drops.value} dropped")
+        return " | ".join(parts)
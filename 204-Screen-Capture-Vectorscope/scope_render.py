@@ -0,0 +1,160 @@
+"""
+Raster scopes for Scopes.py.
+
+Every frame is turned into one RGB image the size of the canvas, so Tk only
+has to blit a single photo instead of creating a line item per sampled pixel.
+
+- Vectorscope: the frame's Cb/Cr bytes (cv2 RGB->YCrCb, which is
+  rgb_to_yuv's U/V rescaled to fit a byte without clipping) are counted into
+  a 256x256 histogram with one calcHist, the occupied bins are mapped to
+  scope pixels for the current gain, and the density is log-scaled and
+  colorized through a lookup table.
+- Histograms: cv2.calcHist per channel, drawn as filled bars with one
+  broadcast comparison per channel.
+- Graticule and labels are drawn once per canvas size and copied in.
+"""
+from typing import Iterable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# ================= LAYOUT =================
+SCOPE_CENTER_X = 200
+SCOPE_RADIUS = 160
+SCOPE_HALF = 200  # Half the side of the square the vectorscope is drawn in
+HIST_X = 420
+HIST_Y = 60
+HIST_H = 150
+LUMA_BOTTOM = HIST_Y + HIST_H + 180
+LABEL_COLOR = (170, 170, 170)
+GRATICULE_COLOR = (68, 68, 68)
+INDICATOR_COLOR = (255, 255, 0)
+LUMA_COLOR = (230, 230, 230)
+
+
+# ================= COLOR =================
+def rgb_to_yuv(rgb):
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    y = 0.299*r + 0.587*g + 0.114*b
+    u = -0.147*r - 0.289*g + 0.436*b
+    v = 0.615*r - 0.515*g - 0.100*b
+    return y, u, v
+
+
+def _density_colormap() -> np.ndarray:
+    """256 RGB entries: black -> lime -> white, like the old lime dots but showing density"""
+    t = np.linspace(0, 1, 256, dtype=np.float32)
+    green = np.clip(t * 2, 0, 1)
+    white = np.clip(t * 2 - 1, 0, 1)
+    lut = np.stack([white, green, white], axis=1) * 255
+    lut[0] = 0
+    return lut.astype(np.uint8)
+
+
+DENSITY_LUT = _density_colormap()
+
+
+# ================= RENDERER =================
+class ScopeRenderer:
+    """Renders vectorscope, RGB and luma histograms into a reusable canvas-sized array"""
+
+    def __init__(self):
+        self.size: Tuple[int, int] = (0, 0)  # (width, height)
+        self.background: Optional[np.ndarray] = None
+        self.image: Optional[np.ndarray] = None
+        # Cb/Cr byte -> rgb_to_yuv's U/V (BT.601: U = 0.492 (B - Y), Cb = 0.564 (B - Y), same for V/Cr)
+        offsets = (np.arange(256, dtype=np.float32) - 128) / 255
+        self.u_of_cb = offsets * (0.492 / 0.564)
+        self.v_of_cr = offsets * (0.877 / 0.713)
+
+    def _layout(self, width: int, height: int):
+        """Background with graticule and labels, rebuilt only when the canvas is resized"""
+        self.size = (width, height)
+        bg = np.zeros((height, width, 3), np.uint8)
+        cy = height // 2
+        cv2.circle(bg, (SCOPE_CENTER_X, cy), SCOPE_RADIUS, GRATICULE_COLOR, 1, cv2.LINE_AA)
+        cv2.line(bg, (SCOPE_CENTER_X - SCOPE_RADIUS, cy), (SCOPE_CENTER_X + SCOPE_RADIUS, cy), GRATICULE_COLOR, 1)
+        cv2.line(bg, (SCOPE_CENTER_X, cy - SCOPE_RADIUS), (SCOPE_CENTER_X, cy + SCOPE_RADIUS), GRATICULE_COLOR, 1)
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        cv2.putText(bg, "VECTORSCOPE", (SCOPE_CENTER_X - 50, 24), font, 0.45, LABEL_COLOR, 1, cv2.LINE_AA)
+        cv2.putText(bg, "HISTOGRAM", (HIST_X, 24), font, 0.45, LABEL_COLOR, 1, cv2.LINE_AA)
+        cv2.putText(bg, "LUMA", (HIST_X, HIST_Y + HIST_H + 34), font, 0.45, LABEL_COLOR, 1, cv2.LINE_AA)
+        self.background = bg
+        self.image = bg.copy()
+
+    def render(self, frame: np.ndarray, width: int, height: int, step: int = 1, gain: float = 1.0,
+               indicators: Iterable[Tuple[float, float, float]] = (), bgr: bool = False) -> np.ndarray:
+        """frame is HxWx3 uint8 (BGR if bgr); returns the (height, width, 3) RGB scope image, reused between calls"""
+        if (width, height) != self.size:
+            self._layout(width, height)
+        image = self.image
+        np.copyto(image, self.background)
+
+        step = max(1, int(step))
+        small = np.ascontiguousarray(frame[::step, ::step] if step > 1 else frame)
+        ycrcb = cv2.cvtColor(small, cv2.COLOR_BGR2YCrCb if bgr else cv2.COLOR_RGB2YCrCb)
+
+        self._draw_vectorscope(image, ycrcb, gain, indicators)
+
+        hist_w = width - HIST_X - 20
+        if hist_w > 0:
+            rgb = [cv2.calcHist([small], [c], None, [256], [0, 256]).ravel() for c in ((2, 1, 0) if bgr else (0, 1, 2))]
+            luma = cv2.calcHist([ycrcb], [0], None, [256], [0, 256]).ravel()
+            self._draw_rgb_histogram(image, rgb, hist_w)
+            self._draw_bars(image, luma, hist_w, LUMA_BOTTOM, LUMA_COLOR)
+        return image
+
+    # ---- VECTORSCOPE ----
+    def _draw_vectorscope(self, image: np.ndarray, ycrcb: np.ndarray, gain: float,
+                          indicators: Iterable[Tuple[float, float, float]]):
+        height = image.shape[0]
+        cx, cy = SCOPE_CENTER_X, height // 2
+        top = max(0, cy - SCOPE_HALF)
+        region = image[top:cy + SCOPE_HALF, max(0, cx - SCOPE_HALF):cx + SCOPE_HALF]
+        rh, rw = region.shape[:2]
+        if rh == 0 or rw == 0:
+            return
+
+        # 256x256 Cb/Cr histogram in one pass over the frame
+        counts = cv2.calcHist([ycrcb], [1, 2], None, [256, 256], [0, 256, 0, 256]).ravel()  # Index Cr * 256 + Cb
+        occupied = np.flatnonzero(counts)
+
+        # Occupied bins -> pixels inside the region (same mapping as the old per-pixel lines)
+        scale = SCOPE_RADIUS * gain
+        xs = np.rint(cx - max(0, cx - SCOPE_HALF) + self.u_of_cb[occupied & 255] * scale).astype(np.intp)
+        ys = np.rint(cy - top - self.v_of_cr[occupied >> 8] * scale).astype(np.intp)
+        inside = (xs >= 0) & (xs < rw) & (ys >= 0) & (ys < rh)
+        density = np.bincount(ys[inside] * rw + xs[inside], weights=counts[occupied[inside]], minlength=rh * rw)
+
+        peak = density.max()
+        if peak > 0:
+            level = (np.log1p(density) * (255.0 / np.log1p(peak))).astype(np.uint8).reshape(rh, rw)
+            np.copyto(region, DENSITY_LUT[level], where=(level > 0)[..., None])
+
+        for r, g, b in indicators:
+            _, u, v = rgb_to_yuv(np.array([r, g, b]))
+            ix = int(cx + u * SCOPE_RADIUS * gain)
+            iy = int(cy - v * SCOPE_RADIUS * gain)
+            cv2.circle(image, (ix, iy), 6, INDICATOR_COLOR, 2, cv2.LINE_AA)
+
+    # ---- HISTOGRAMS ----
+    @staticmethod
+    def _bar_mask(hist: np.ndarray, hist_w: int) -> np.ndarray:
+        """(HIST_H, hist_w) bool, True under the bars of the peak-normalized histogram"""
+        peak = hist.max()
+        heights = (hist / peak * HIST_H) if peak > 0 else np.zeros_like(hist)
+        columns = heights[np.arange(hist_w) * 256 // hist_w]
+        rows = np.arange(HIST_H, 0, -1, dtype=np.float32)[:, None]  # Distance from the baseline
+        return rows <= columns[None, :]
+
+    def _draw_rgb_histogram(self, image: np.ndarray, hists, hist_w: int):
+        """Channels add up where they overlap (red + green = yellow)"""
+        region = image[HIST_Y:HIST_Y + HIST_H, HIST_X:HIST_X + hist_w]
+        for channel, hist in enumerate(hists):
+            mask = self._bar_mask(hist, hist_w)[:region.shape[0], :region.shape[1]]
+            region[..., channel][mask] = 255
+
+    def _draw_bars(self, image: np.ndarray, hist: np.ndarray, hist_w: int, bottom: int, color):
+        region = image[bottom - HIST_H:bottom, HIST_X:HIST_X + hist_w]
+        mask = self._bar_mask(hist, hist_w)[:region.shape[0], :region.shape[1]]
+        region[mask] = color
@@ -2,11 +2,11 @@ import tkinter as tk
 from tkinter import filedialog, messagebox
 import ttkbootstrap as tb
 from PIL import Image, ImageTk
-import subprocess
 import os
 import threading
 import time
-import re
+
+from render_engine import SegmentRenderer, RenderStopped, RenderError, find_ffmpeg, cache_size, clear_cache
 
 # ================= APP =================
 app = tb.Window(
@@ -22,11 +22,11 @@ mp3_path = tk.StringVar()
 output_path = tk.StringVar()
 hours_var = tk.IntVar(value=10)
 
-process = None
+renderer = None
 rendering = False
 total_seconds = 0
 
-FFMPEG_PATH = r"C:\ffmpeg\bin\ffmpeg.exe"  # CHANGE THIS
+FFMPEG_PATH = r"C:\ffmpeg\bin\ffmpeg.exe"  # CHANGE THIS (ffmpeg on PATH is used when missing)
 
 # ================= FUNCTIONS =================
 def select_images():
@@ -90,75 +90,63 @@ def build_video():
     threading.Thread(target=run_ffmpeg, daemon=True).start()
 
 def stop_video():
-    global process, rendering
-    if process:
-        process.terminate()
-        process = None
+    global rendering
+    if renderer and rendering:
+        renderer.stop()
         rendering = False
         status_label.config(text="Rendering stopped.")
         resume_btn.config(state="normal")
 
+def ui(func, *args):
+    app.after(0, lambda: func(*args))
+
+def refresh_cache_label():
+    cache_label.config(text=f"Segment cache: {cache_size() / 1e6:.1f} MB")
+
+def clear_segment_cache():
+    if rendering:
+        return
+    clear_cache()
+    refresh_cache_label()
+
 def run_ffmpeg():
-    global process, rendering, total_seconds
+    global renderer, rendering, total_seconds
+    ffmpeg = find_ffmpeg(FFMPEG_PATH)
+    if not ffmpeg:
+        ui(messagebox.showerror, "Error", "ffmpeg not found. Set FFMPEG_PATH or add ffmpeg to PATH.")
+        return
     rendering = True
-    resume_btn.config(state="disabled")
-    progress_bar['value'] = 0
+    ui(resume_btn.config, {"state": "disabled"})
+    ui(progress_bar.config, {"value": 0})
 
+    # Each image is encoded once into a cached segment; the long video is a stream-copy concat
     total_seconds = hours_var.get() * 3600
-    seconds_per_image = total_seconds / len(image_files)
-
-    list_file = "images.txt"
-    with open(list_file, "w", encoding="utf-8") as f:
-        for img in image_files:
-            f.write(f"file '{img}'\n")
-            f.write(f"duration {seconds_per_image}\n")
-        f.write(f"file '{image_files[-1]}'\n")
-
-    cmd = [
-        FFMPEG_PATH, "-y",
-        "-stream_loop", "-1",
-        "-i", mp3_path.get(),
-        "-f", "concat", "-safe", "0",
-        "-i", list_file,
-        "-t", str(total_seconds),
-        "-vf", "scale=1920:1080",
-        "-c:v", "libx264",
-        "-pix_fmt", "yuv420p",
-        "-preset", "slow",
-        "-crf", "18",
-        "-c:a", "aac",
-        "-b:a", "192k",
-        output_path.get()
-    ]
-
-    process = subprocess.Popen(
-        cmd,
-        stderr=subprocess.PIPE,
-        universal_newlines=True
-    )
+    renderer = SegmentRenderer(ffmpeg)
+    start = time.time()
 
-    time_pattern = re.compile(r"time=(\d+):(\d+):(\d+)")
+    def on_progress(fraction, message):
+        percent = fraction * 100
+        ui(progress_bar.config, {"value": percent})
+        ui(status_label.config, {"text": f"{message}... {int(percent)}%"})
 
-    for line in process.stderr:
-        match = time_pattern.search(line)
-        if match:
-            h, m, s = map(int, match.groups())
-            current = h * 3600 + m * 60 + s
-            percent = (current / total_seconds) * 100
-            progress_bar['value'] = percent
-            status_label.config(
-                text=f"Rendering... {int(percent)}%"
-            )
+    try:
+        counts = renderer.render(list(image_files), mp3_path.get(), output_path.get(), total_seconds, on_progress)
+    except RenderStopped:
+        return
+    except (RenderError, OSError) as e:
+        rendering = False
+        ui(status_label.config, {"text": "Rendering failed."})
+        ui(resume_btn.config, {"state": "normal"})
+        ui(messagebox.showerror, "Error", str(e))
+        return
+    finally:
+        ui(refresh_cache_label)
 
-    process.wait()
     rendering = False
-    os.remove(list_file)
-
-    if process.returncode == 0:
-        status_label.config(text="Rendering complete!")
-        messagebox.showinfo("Done", "Relax video created successfully.")
-    else:
-        status_label.config(text="Rendering stopped.")
+    ui(status_label.config, {"text": f"Rendering complete in {time.time() - start:.0f}s "
+                                      f"({counts['encoded']} segment(s) encoded, {counts['reused']} reused)."})
+    ui(resume_btn.config, {"state": "normal"})
+    ui(messagebox.showinfo, "Done", "Relax video created successfully.")
 
 # ================= UI =================
 main = tb.Frame(app, padding=15)
@@ -206,6 +194,9 @@ tb.Button(right, text="▶ Start", bootstyle="success", command=build_video).pac
 tb.Button(right, text="⛔ Stop", bootstyle="danger", command=stop_video).pack(fill="x", pady=5)
 resume_btn = tb.Button(right, text="🔁 Resume (Restart)", bootstyle="warning", command=build_video)
 resume_btn.pack(fill="x")
+tb.Button(right, text="🧹 Clear Segment Cache", bootstyle="secondary", command=clear_segment_cache).pack(fill="x", pady=(10, 0))
+cache_label = tb.Label(right, text="")
+cache_label.pack()
 
 # BOTTOM
 progress_bar = tb.Progressbar(main, length=600)
@@ -214,4 +205,5 @@ progress_bar.pack(pady=10)
 status_label = tb.Label(main, text="Idle")
 status_label.pack()
 
+refresh_cache_label()
 app.mainloop()
@@ -0,0 +1,254 @@
+"""
+Segment-based renderer for long still-image videos.
+
+Instead of encoding the full duration, every image is encoded once into a
+short segment (SEGMENT_SECONDS at most) and the music once into a single
+AAC loop. The final video is a stream-copy concat of those segments, each
+repeated as often as its share of the duration needs, muxed with the looped
+audio, so a 10 hour video costs a few short encodes plus one remux.
+
+Segments and audio loops are cached on disk by (file hash, duration,
+settings): changing only the music, the duration or the image order
+re-muxes in seconds, and a stopped render resumes with the segments it
+already finished.
+"""
+import hashlib
+import math
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+# ================= CONFIG =================
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".relax_video_builder", "cache")
+SEGMENT_SECONDS = 30
+SEGMENT_JOBS = 2  # Parallel segment encodes; x264 threads on its own as well
+
+VIDEO_SETTINGS = {
+    "width": 1920,
+    "height": 1080,
+    "fps": 25,
+    "keyframe_seconds": 5,
+    "preset": "slow",
+    "crf": 18,
+}
+AUDIO_SETTINGS = {"codec": "aac", "bitrate": "192k"}
+
+TIME_PATTERN = re.compile(r"time=(\d+):(\d+):(\d+(?:\.\d+)?)")
+
+
+class RenderStopped(Exception):
+    pass
+
+
+class RenderError(Exception):
+    pass
+
+
+def find_ffmpeg(preferred: Optional[str] = None) -> Optional[str]:
+    """The configured binary if it exists, else ffmpeg from PATH"""
+    if preferred and os.path.isfile(preferred):
+        return preferred
+    return shutil.which("ffmpeg")
+
+
+# ================= CACHE =================
+_hashes: Dict[tuple, str] = {}
+
+
+def file_hash(path: str) -> str:
+    """Content hash, remembered per (path, size, mtime) so unchanged files are read once"""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if key not in _hashes:
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        _hashes[key] = h.hexdigest()
+    return _hashes[key]
+
+
+def cache_key(content_hash: str, duration: float, settings: dict) -> str:
+    text = f"{content_hash}|{duration:g}|{sorted(settings.items())}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def cache_size(cache_dir: str = CACHE_DIR) -> int:
+    if not os.path.isdir(cache_dir):
+        return 0
+    return sum(e.stat().st_size for e in os.scandir(cache_dir) if e.is_file())
+
+
+def clear_cache(cache_dir: str = CACHE_DIR):
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+# ================= TIMELINE =================
+def plan_timeline(image_count: int, total_seconds: float, segment_seconds: float = SEGMENT_SECONDS):
+    """
+    (segment duration, [(full repeats, remainder seconds)]) for images shown
+    total_seconds / image_count each, as before
+    """
+    per_image = total_seconds / image_count
+    duration = min(segment_seconds, math.ceil(per_image))
+    repeats = int(per_image // duration)
+    remainder = round(per_image - repeats * duration, 3)
+    if remainder < 0.1:  # Less than a few frames: not worth a concat entry
+        remainder = 0
+    return duration, [(repeats, remainder)] * image_count
+
+
+def concat_list(segments: Sequence[str], plan) -> str:
+    """Concat demuxer script: each segment repeated, the remainder cut with outpoint"""
+    lines = []
+    for path, (repeats, remainder) in zip(segments, plan):
+        entry = "file '{}'".format(path.replace("'", "'\\''"))
+        lines.extend([entry] * repeats)
+        if remainder > 0:
+            lines.extend([entry, f"outpoint {remainder}"])
+    return "\n".join(lines) + "\n"
+
+
+# ================= RENDERER =================
+class SegmentRenderer:
+    """
+    render() blocks (run it on a worker thread); stop() from any thread
+    terminates the running ffmpeg processes.
+    progress(fraction, message) is called as segments finish and while muxing.
+    """
+
+    def __init__(self, ffmpeg: str, cache_dir: str = CACHE_DIR,
+                 video: Optional[dict] = None, audio: Optional[dict] = None):
+        self.ffmpeg = ffmpeg
+        self.cache_dir = cache_dir
+        self.video = dict(VIDEO_SETTINGS, **(video or {}))
+        self.audio = dict(AUDIO_SETTINGS, **(audio or {}))
+        self._procs = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    # ---- PROCESSES ----
+    def _run(self, args: List[str], on_time: Optional[Callable[[float], None]] = None):
+        if self._stopped.is_set():
+            raise RenderStopped()
+        proc = subprocess.Popen([self.ffmpeg, "-y", "-hide_banner", *args], stdin=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE, universal_newlines=True, errors="replace")
+        with self._lock:
+            self._procs.add(proc)
+        tail = []
+        try:
+            for line in proc.stderr:
+                tail = (tail + [line.rstrip()])[-10:]
+                match = TIME_PATTERN.search(line) if on_time else None
+                if match:
+                    h, m, s = match.groups()
+                    on_time(int(h) * 3600 + int(m) * 60 + float(s))
+            proc.wait()
+        finally:
+            with self._lock:
+                self._procs.discard(proc)
+        if self._stopped.is_set():
+            raise RenderStopped()
+        if proc.returncode != 0:
+            raise RenderError("\n".join(tail) or f"ffmpeg exited with code {proc.returncode}")
+
+    def stop(self):
+        self._stopped.set()
+        with self._lock:
+            for proc in self._procs:
+                proc.terminate()
+
+    def _cached(self, key: str, ext: str, build: Callable[[str], None]) -> str:
+        """Path of a cache entry, building it through a temp file when missing"""
+        path = os.path.join(self.cache_dir, key + ext)
+        if not os.path.exists(path):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(suffix=ext, dir=self.cache_dir)
+            os.close(fd)
+            try:
+                build(tmp)
+                os.replace(tmp, path)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+        return path
+
+    # ---- STAGES ----
+    def segment(self, image: str, duration: float) -> str:
+        """Cached still-image segment: duration seconds, keyframes at fixed intervals, no B-frames"""
+        v = self.video
+
+        def build(tmp):
+            self._run([
+                "-loop", "1", "-framerate", str(v["fps"]), "-i", image,
+                "-t", str(duration),
+                "-vf", f"scale={v['width']}:{v['height']},setsar=1,format=yuv420p",
+                "-c:v", "libx264", "-preset", v["preset"], "-crf", str(v["crf"]),
+                "-tune", "stillimage", "-bf", "0", "-g", str(v["fps"] * v["keyframe_seconds"]),
+                "-r", str(v["fps"]), "-an", "-f", "mp4", tmp,
+            ])
+
+        return self._cached(cache_key(file_hash(image), duration, v), ".mp4", build)
+
+    def audio_loop(self, music: str) -> str:
+        """One pass of the music, encoded once; the final mux loops it by stream copy"""
+        a = self.audio
+
+        def build(tmp):
+            self._run(["-i", music, "-vn", "-c:a", a["codec"], "-b:a", a["bitrate"], "-f", "mp4", tmp])
+
+        return self._cached(cache_key(file_hash(music), 0, a), ".m4a", build)
+
+    def render(self, images: Sequence[str], music: str, output: str, total_seconds: float,
+               progress: Optional[Callable[[float, str], None]] = None) -> dict:
+        """
+        Build output and return counts of encoded / reused segments.
+        Raises RenderStopped after stop() and RenderError when ffmpeg fails.
+        """
+        self._stopped.clear()
+        report = progress or (lambda fraction, message: None)
+        duration, plan = plan_timeline(len(images), total_seconds)
+
+        # Encode what the cache does not have yet; identical images share one segment
+        unique = list(dict.fromkeys(images))
+        missing = [img for img in unique
+                   if not os.path.exists(os.path.join(
+                       self.cache_dir, cache_key(file_hash(img), duration, self.video) + ".mp4"))]
+        steps = len(missing) + 1
+        done = [0]
+
+        def encode(img):
+            path = self.segment(img, duration)
+            with self._lock:
+                done[0] += 1
+            report(0.8 * done[0] / steps, f"Encoded segment {done[0]}/{len(missing)}")
+            return path
+
+        report(0.0, f"Encoding {len(missing)} new segment(s), reusing {len(unique) - len(missing)}")
+        new = set(missing)
+        segments = {img: self.segment(img, duration) for img in unique if img not in new}  # Cache hits
+        with ThreadPoolExecutor(max_workers=SEGMENT_JOBS) as pool:
+            segments.update(zip(missing, pool.map(encode, missing)))
+        audio = self.audio_loop(music)
+        report(0.8 * (steps - 0.5) / steps, "Muxing")
+
+        # Stream-copy concat + looped audio; only the container is written
+        fd, list_file = tempfile.mkstemp(suffix=".txt", dir=self.cache_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(concat_list([segments[img] for img in images], plan))
+        try:
+            self._run([
+                "-f", "concat", "-safe", "0", "-i", list_file,
+                "-stream_loop", "-1", "-i", audio,
+                "-map", "0:v", "-map", "1:a", "-t", str(total_seconds),
+                "-c", "copy", "-movflags", "+faststart", output,
+            ], on_time=lambda t: report(0.8 + 0.2 * min(1.0, t / total_seconds), "Muxing"))
+        finally:
+            os.remove(list_file)
+        report(1.0, "Done")
+        return {"encoded": len(missing), "reused": len(unique) - len(missing)}
@@ -1,5 +1,6 @@
 import os
 import json
+import queue
 import shutil
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
@@ -9,20 +10,29 @@ from threading import Thread
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+from file_index import FileIndex, EventCollector, Delta, reconcile, resolve, in_scope, INDEX_FILE
+from file_table import FileTable, VirtualTable
+
 # =========================
 # Helpers
 # =========================
 CONFIG_FILE = "folders_data.json"
+DELTA_POLL_MS = 250  # Watchdog events are coalesced and applied at most this often
+REBUILD_THRESHOLD = 2000  # Bigger deltas rebuild the sorted indexes instead of patching them row by row
 
 def load_folders():
+    """Folder list and the recursive flag; older configs are a plain list of folders"""
     if os.path.exists(CONFIG_FILE):
         with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+            data = json.load(f)
+        if isinstance(data, list):
+            return data, False
+        return data.get("folders", []), data.get("recursive", False)
+    return [], False
 
 def save_folders():
     with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-        json.dump(folders_data, f, ensure_ascii=False, indent=4)
+        json.dump({"folders": folders_data, "recursive": recursive_scan}, f, ensure_ascii=False, indent=4)
 
 def set_status(msg):
     status_var.set(msg)
@@ -59,13 +69,21 @@ root.geometry("1300x620")
 # =========================
 # Globals
 # =========================
-folders_data = load_folders()
+folders_data, recursive_scan = load_folders()
 last_operation = []
-combined_files = []
-filtered_files = []
+combined_files = FileTable()  # Rows by path, plus sorted indexes per sort order / category
 observer = None
+watches = {}
+watcher_paused = False
 current_filter = tk.StringVar(value="All")
 current_sort = tk.StringVar(value="Name")
+recursive_var = tk.BooleanVar(value=recursive_scan)
+
+# Index work (scans, event deltas) runs on one worker thread, in order; results come back as Deltas
+file_index = FileIndex(INDEX_FILE)
+event_collector = EventCollector()
+index_jobs = queue.Queue()
+index_results = queue.Queue()
 
 # =========================
 # Folder & File Functions
@@ -95,8 +113,8 @@ def add_folder(path):
     folders_data.append(path)
     save_folders()
     start_watcher(path)
-    refresh_combined_preview()
-    set_status(f"Added folder: {path}")
+    index_jobs.put(("scan", path))
+    set_status(f"Scanning folder: {path}")
 
 def remove_folder(path):
     path = os.path.abspath(path.strip())
@@ -105,86 +123,129 @@ def remove_folder(path):
         if os.path.abspath(folder) == path:
             folders_data.remove(folder)
             save_folders()
-            refresh_combined_preview()
+            stop_watcher(folder)
+            index_jobs.put(("forget", folder))
             set_status(f"Removed folder: {path}")
             return
 
     messagebox.showwarning("Not Found", "Folder not found in the list.")
 
-def scan_folder(folder_path):
-    folder_path = os.path.abspath(folder_path)
-    files = []
-    if not os.path.exists(folder_path):
-        return files
-
-    for f in os.listdir(folder_path):
-        path = os.path.join(folder_path, f)
-        if os.path.isfile(path):
-            try:
-                size = os.path.getsize(path)
-            except (FileNotFoundError, PermissionError):
-                continue  # file moved or locked, safely skip
-
-            category = sanitize_folder_name(categorize_file(size))
-            files.append((folder_path, f, size, category))
+def make_row(path, size):
+    return (os.path.dirname(path), os.path.basename(path), size, sanitize_folder_name(categorize_file(size)))
 
-    return files
-
-def refresh_combined_preview():
-    global combined_files
-    combined_files = []
+def index_worker():
+    """Runs index jobs one at a time: ("scan", root), ("events", {root: paths}), ("forget", root)"""
+    while True:
+        job, arg = index_jobs.get()
+        try:
+            if job == "scan":
+                delta = reconcile(file_index, arg, recursive_scan)
+                file_index.apply(delta)
+                index_results.put((delta, f"Scanned: {arg}"))
+            elif job == "events":
+                for root_path, paths in arg.items():
+                    if root_path in folders_data:
+                        delta = resolve(file_index, root_path, paths, recursive_scan)
+                        file_index.apply(delta)
+                        index_results.put((delta, None))
+            elif job == "forget":
+                delta = Delta(arg, {}, list(file_index.entries(arg)))
+                file_index.forget(arg)
+                index_results.put((delta, None))
+        except Exception as e:
+            index_results.put((None, f"Index error: {e}"))
+
+def poll_deltas():
+    """Tk loop: hand coalesced watchdog events to the worker and apply finished deltas"""
+    if event_collector.pending():
+        index_jobs.put(("events", event_collector.drain()))
+    changed = False
+    while True:
+        try:
+            delta, message = index_results.get_nowait()
+        except queue.Empty:
+            break
+        if delta is not None:
+            changed = apply_delta(delta) or changed
+        if message:
+            set_status(message)
+    if changed:
+        apply_filter_sort(keep_position=True)
+    root.after(DELTA_POLL_MS, poll_deltas)
+
+def apply_delta(delta):
+    """Apply one Delta to the file table (and its sorted indexes); True if anything changed"""
+    if len(delta.removals) + len(delta.upserts) > REBUILD_THRESHOLD:
+        # A first scan or a mass move: one sort per index beats many single inserts
+        rows = combined_files.rows
+        for path in delta.removals:
+            rows.pop(path, None)
+        for path, (size, _mtime) in delta.upserts.items():
+            rows[path] = make_row(path, size)
+        combined_files.replace_all(rows)
+        return True
+    for path in delta.removals:
+        combined_files.remove(path)
+    for path, (size, _mtime) in delta.upserts.items():
+        combined_files.upsert(path, make_row(path, size))
+    return bool(delta.removals or delta.upserts)
+
+def load_index():
+    """Show the files indexed at the last run at once, then rescan every folder in the background"""
+    rows = {}
     for folder in folders_data:
-        combined_files.extend(scan_folder(folder))
+        for path, (size, _mtime) in file_index.load(folder).items():
+            rows[path] = make_row(path, size)
+    combined_files.replace_all(rows)
     apply_filter_sort()
+    for folder in folders_data:
+        index_jobs.put(("scan", folder))
+
+def rescan_all():
+    """Recursion changed: reconcile every folder against the new scope"""
+    global recursive_scan
+    recursive_scan = recursive_var.get()
+    save_folders()
+    for folder in folders_data:
+        index_jobs.put(("scan", folder))
+    set_status("Rescanning folders...")
+
+def owning_roots(path):
+    return [folder for folder in folders_data if in_scope(folder, path, recursive_scan)]
 
 # =========================
 # Filter & Sort Functions
 # =========================
-def apply_filter_sort():
-    global filtered_files
-    # Filter
+def apply_filter_sort(keep_position=False):
+    # Filter & sort are ranges of precomputed indexes: only the visible rows are materialized
+    view = combined_files.view(current_sort.get(), current_filter.get())
+    file_tree.show(view, keep_position)
+    update_counts(len(view))
+
+def update_counts(total):
     if current_filter.get() == "All":
-        filtered_files = combined_files.copy()
+        counts = combined_files.counts
     else:
-        filtered_files = [f for f in combined_files if f[3] == current_filter.get()]
-    # Sort
-    sort_key = current_sort.get()
-    if sort_key == "Name":
-        filtered_files.sort(key=lambda x: x[1].lower())
-    elif sort_key == "Size":
-        filtered_files.sort(key=lambda x: x[2])
-    elif sort_key == "Folder":
-        filtered_files.sort(key=lambda x: x[0].lower())
-    elif sort_key == "Category":
-        filtered_files.sort(key=lambda x: x[3].lower())
-    update_file_tree()
-
-def update_file_tree():
-    file_tree.delete(*file_tree.get_children())
-    counts = {"Small_1MB":0, "Medium_1-10MB":0, "Large_10MB_plus":0}
-    for folder, f, size, category in filtered_files:
-        file_tree.insert("", "end", values=(folder, f, format_size(size), category))
-        if category in counts:
-            counts[category] +=1
-    total_files_var.set(f"Total Files: {len(filtered_files)} | Small: {counts['Small_1MB']} | Medium: {counts['Medium_1-10MB']} | Large: {counts['Large_10MB_plus']}")
+        counts = {key: (value if key == current_filter.get() else 0) for key, value in combined_files.counts.items()}
+    total_files_var.set(f"Total Files: {total} | Small: {counts['Small_1MB']} | Medium: {counts['Medium_1-10MB']} | Large: {counts['Large_10MB_plus']}")
 
 # =========================
 # File Operations
 # =========================
-def organize_files_thread():
+def organize_files_thread(rows):
     global watcher_paused
     watcher_paused = True
     progress_var.set(0)
 
-    if not combined_files:
+    if not rows:
         watcher_paused = False
         return
 
     global last_operation
     last_operation = []
-    total = len(combined_files)
+    total = len(rows)
 
-    for idx, (folder, f, size, category) in enumerate(combined_files, start=1):
+    for idx, (folder, f, size, category) in enumerate(rows, start=1):
         src = os.path.join(folder, f)
         dst_folder = os.path.join(folder, category)
         os.makedirs(dst_folder, exist_ok=True)
@@ -199,12 +260,16 @@ def organize_files_thread():
         progress_var.set(int(idx / total * 100))
         root.update_idletasks()
 
+    # Only the moved files changed: hand them to the index like watchdog events
+    for dst, src in last_operation:
+        for folder in owning_roots(src):
+            event_collector.add(folder, src, dst)
     watcher_paused = False
-    refresh_combined_preview()
     set_status("Files organized successfully!")
 
 def organize_files():
-    Thread(target=organize_files_thread, daemon=True).start()
+    # Snapshot on the Tk thread: deltas keep changing the table while files are moved
+    Thread(target=organize_files_thread, args=(list(combined_files.rows.values()),), daemon=True).start()
 
 def undo_last_operation():
     if not last_operation:
@@ -213,8 +278,9 @@ def undo_last_operation():
     for dst, src in reversed(last_operation):
         if os.path.exists(dst):
             shutil.move(dst, src)
+            for folder in owning_roots(src):
+                event_collector.add(folder, src, dst)
     last_operation.clear()
-    refresh_combined_preview()
     set_status("Undo completed!")
 
 # =========================
@@ -230,18 +296,30 @@ def drop(event):
 # Watchdog Handler
 # =========================
 class FolderEventHandler(FileSystemEventHandler):
+    """Records the touched paths; poll_deltas applies them in coalesced batches"""
+    def __init__(self, folder_path):
+        super().__init__()
+        self.folder_path = folder_path
+
     def on_any_event(self, event):
         if watcher_paused:
             return
-        root.after(200, refresh_combined_preview)
+        if event.is_directory and event.event_type == "modified":
+            return  # Fired for every change inside the folder; the file events say what changed
+        event_collector.add(self.folder_path, event.src_path, getattr(event, "dest_path", None))
 
 def start_watcher(folder_path):
     global observer
     if observer is None:
         observer = Observer()
         observer.start()
-    handler = FolderEventHandler()
-    observer.schedule(handler, folder_path, recursive=True)
+    handler = FolderEventHandler(folder_path)
+    watches[folder_path] = observer.schedule(handler, folder_path, recursive=True)
+
+def stop_watcher(folder_path):
+    watch = watches.pop(folder_path, None)
+    if observer and watch:
+        observer.unschedule(watch)
 
 # =========================
 # GUI Setup
@@ -295,24 +373,16 @@ sort_combo.current(0)
 sort_combo.grid(row=0, column=3, padx=5)
 sort_combo.bind("<<ComboboxSelected>>", lambda e: apply_filter_sort())
 
+ttk.Checkbutton(filter_sort_frame, text="Include subfolders", variable=recursive_var,
+                command=rescan_all).grid(row=0, column=4, padx=15)
+
 # File preview Treeview
 tree_frame = ttk.Frame(main_frame)
 tree_frame.pack(expand=True, fill="both", pady=10)
 columns = ("folder", "name", "size", "category")
-file_tree = ttk.Treeview(tree_frame, columns=columns, show="headings")
-file_tree.heading("folder", text="Folder")
-file_tree.heading("name", text="File Name")
-file_tree.heading("size", text="Size")
-file_tree.heading("category", text="Category")
-file_tree.column("folder", width=300)
-file_tree.column("name", width=400)
-file_tree.column("size", width=100)
-file_tree.column("category", width=150)
-file_tree.pack(expand=True, fill="both", side="left")
-
-scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=file_tree.yview)
-scrollbar.pack(side="right", fill="y")
-file_tree.configure(yscrollcommand=scrollbar.set)
+# Virtualized: the Treeview only holds the rows on screen
+file_tree = VirtualTable(tree_frame, columns, ("Folder", "File Name", "Size", "Category"), (300, 400, 100, 150),
+                         format_row=lambda row: (row[0], row[1], format_size(row[2]), row[3]))
 
 # File counts
 total_files_var = tk.StringVar(value="Total Files: 0 | Small: 0 | Medium: 0 | Large: 0")
@@ -334,7 +404,9 @@ ttk.Label(root, textvariable=status_var, anchor="w").pack(side="bottom", fill="x
 # Initial load and start watchers
 for folder in folders_data:
     start_watcher(folder)
-refresh_combined_preview()
+Thread(target=index_worker, daemon=True).start()
+load_index()
+root.after(DELTA_POLL_MS, poll_deltas)
 
 # Run App
 try:
@@ -0,0 +1,191 @@
+"""
+Incremental scanning for the File Size Organizer.
+
+Every watched folder (a "root") has its files in a persistent index of
+(path, size, mtime) stored in SQLite, so the list is back on screen at
+startup before the folders are scanned again.
+
+- scan_entries walks a folder with os.scandir, using the DirEntry's cached
+  type and stat results instead of separate isfile/getsize calls, and
+  optionally recurses (skipping the category folders that organizing
+  creates, so organized files are not picked up again);
+- reconcile compares a fresh scan of one root with its index entries and
+  returns only what changed;
+- watchdog events are collected per root by EventCollector (a burst of
+  events for one file counts once) and turned into a Delta by resolve,
+  which only stats the paths the events named.
+
+Deltas are applied to the index (apply) and by the GUI to its file list, so
+nothing is ever rescanned or rebuilt as a whole after the first scan.
+"""
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+# =========================
+# Config
+# =========================
+INDEX_FILE = "file_index.db"
+CATEGORY_DIRS = {"Small_1MB", "Medium_1-10MB", "Large_10MB_plus"}  # Created by "Organize Files"
+
+Entry = Tuple[int, float]  # size, mtime
+
+
+class Delta(NamedTuple):
+    root: str
+    upserts: Dict[str, Entry]  # New or changed files
+    removals: List[str]
+
+
+# =========================
+# Scanning
+# =========================
+def scan_entries(root: str, recursive: bool = False) -> Iterator[Tuple[str, int, float]]:
+    """(path, size, mtime) of every file under root (top level only unless recursive)"""
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue  # Folder vanished or no permission
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_file():
+                        st = entry.stat()
+                        yield entry.path, st.st_size, st.st_mtime
+                    elif recursive and entry.name not in CATEGORY_DIRS and entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                except OSError:
+                    continue  # File moved or locked, safely skip
+
+
+def in_scope(root: str, path: str, recursive: bool) -> bool:
+    """Whether a file at path belongs to root's listing"""
+    rel = os.path.relpath(os.path.dirname(path), root)
+    if rel == ".":
+        return True
+    if not recursive or rel == ".." or rel.startswith(".." + os.sep) or os.path.isabs(rel):
+        return False
+    return not CATEGORY_DIRS.intersection(rel.split(os.sep))
+
+
+# =========================
+# Persistent index
+# =========================
+class FileIndex:
+    """(path, size, mtime) per root, in SQLite and mirrored in memory in `known`"""
+
+    def __init__(self, db_path: str = INDEX_FILE):
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute("CREATE TABLE IF NOT EXISTS files ("
+                            "root TEXT, path TEXT, size INTEGER, mtime REAL, PRIMARY KEY (root, path))")
+        self.known: Dict[str, Dict[str, Entry]] = {}
+
+    def load(self, root: str) -> Dict[str, Entry]:
+        """Entries stored for root at the last run"""
+        with self.lock:
+            rows = self.db.execute("SELECT path, size, mtime FROM files WHERE root = ?", (root,)).fetchall()
+        self.known[root] = {path: (size, mtime) for path, size, mtime in rows}
+        return self.known[root]
+
+    def entries(self, root: str) -> Dict[str, Entry]:
+        if root not in self.known:
+            return self.load(root)
+        return self.known[root]
+
+    def apply(self, delta: Delta):
+        if not delta.upserts and not delta.removals:
+            return
+        with self.lock, self.db:
+            self.db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                                ((delta.root, p, s, m) for p, (s, m) in delta.upserts.items()))
+            self.db.executemany("DELETE FROM files WHERE root = ? AND path = ?",
+                                ((delta.root, p) for p in delta.removals))
+        known = self.known.setdefault(delta.root, {})
+        known.update(delta.upserts)
+        for path in delta.removals:
+            known.pop(path, None)
+
+    def forget(self, root: str):
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM files WHERE root = ?", (root,))
+        self.known.pop(root, None)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+# =========================
+# Deltas
+# =========================
+def reconcile(index: FileIndex, root: str, recursive: bool = False) -> Delta:
+    """Full scan of root, reported as the difference from its index entries"""
+    known = index.entries(root)
+    seen = set()
+    upserts = {}
+    for path, size, mtime in scan_entries(root, recursive):
+        seen.add(path)
+        if known.get(path) != (size, mtime):
+            upserts[path] = (size, mtime)
+    return Delta(root, upserts, [path for path in known if path not in seen])
+
+
+def resolve(index: FileIndex, root: str, paths: Iterable[str], recursive: bool = False) -> Delta:
+    """Delta for the paths named by file system events: only those are looked at"""
+    known = index.entries(root)
+    upserts: Dict[str, Entry] = {}
+    removals: Set[str] = set()
+    gone_dirs = []
+    for path in paths:
+        if path == root:
+            continue  # The folder itself: its files have events of their own
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        if st is not None and os.path.isfile(path):
+            if in_scope(root, path, recursive) and known.get(path) != (st.st_size, st.st_mtime):
+                upserts[path] = (st.st_size, st.st_mtime)
+            continue
+        if path in known:
+            removals.add(path)
+        elif st is None:
+            gone_dirs.append(path.rstrip(os.sep) + os.sep)
+        elif recursive and in_scope(root, os.path.join(path, ""), recursive):
+            # New or moved-in folder: only its own subtree is scanned
+            for file_path, size, mtime in scan_entries(path, recursive):
+                if known.get(file_path) != (size, mtime):
+                    upserts[file_path] = (size, mtime)
+    if gone_dirs:
+        # A deleted or moved-away folder takes its files with it (one pass for all of them)
+        prefixes = tuple(gone_dirs)
+        removals.update(p for p in known if p.startswith(prefixes))
+    removals.difference_update(upserts)
+    return Delta(root, upserts, sorted(removals))
+
+
+class EventCollector:
+    """Paths touched by watchdog events, per root, until the next drain()"""
+
+    def __init__(self):
+        self._dirty: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, root: str, *paths: Optional[str]):
+        with self._lock:
+            self._dirty.setdefault(root, set()).update(os.path.abspath(p) for p in paths if p)
+
+    def pending(self) -> bool:
+        return bool(self._dirty)
+
+    def drain(self) -> Dict[str, Set[str]]:
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        return dirty
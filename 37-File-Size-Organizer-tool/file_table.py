@@ -0,0 +1,203 @@
+"""
+Sorted, filtered file list and the virtualized Treeview that shows it.
+
+FileTable keeps one sorted list of keys per sort order (Name, Size, Folder,
+Category) and, for category filters, one per sort order grouped by category,
+so each category is a contiguous range found by bisect. A list is built the
+first time its order is shown and from then on kept up to date row by row
+(upsert / remove); switching filter or sort back to it costs a few bisects
+plus the visible rows.
+
+VirtualTable is a ttk.Treeview that only ever holds as many items as fit on
+screen; scrolling rewrites their values from the current view instead of
+inserting every row.
+"""
+import tkinter as tk
+from bisect import bisect_left
+from tkinter import ttk
+from typing import Callable, Dict, List, Optional, Tuple
+
+# =========================
+# Config
+# =========================
+CATEGORIES = ("Small_1MB", "Medium_1-10MB", "Large_10MB_plus")
+SORTS = ("Name", "Size", "Folder", "Category")
+
+Row = Tuple[str, str, int, str]  # folder, name, size, category
+
+
+def sort_key(sort: str, path: str, row: Row) -> tuple:
+    """Key of row in a sort order; the path at the end keeps keys unique"""
+    folder, name, size, category = row
+    if sort == "Size":
+        return (size, path)
+    elif sort == "Folder":
+        return (folder.lower(), path)
+    elif sort == "Category":
+        return (category.lower(), path)
+    return (name.lower(), path)
+
+
+# =========================
+# Model
+# =========================
+class FileTable:
+    """All rows by path plus the sorted indexes used so far"""
+
+    def __init__(self):
+        self.rows: Dict[str, Row] = {}
+        self.counts = dict.fromkeys(CATEGORIES, 0)
+        self._orders: Dict[Tuple[str, bool], list] = {}  # (sort, grouped by category) -> sorted keys
+
+    def _key(self, sort: str, grouped: bool, path: str, row: Row) -> tuple:
+        key = sort_key(sort, path, row)
+        return (row[3],) + key if grouped else key
+
+    def _order(self, sort: str, grouped: bool) -> list:
+        order = self._orders.get((sort, grouped))
+        if order is None:
+            order = sorted(self._key(sort, grouped, path, row) for path, row in self.rows.items())
+            self._orders[(sort, grouped)] = order
+        return order
+
+    def upsert(self, path: str, row: Row):
+        self.remove(path)
+        self.rows[path] = row
+        if row[3] in self.counts:
+            self.counts[row[3]] += 1
+        for (sort, grouped), order in self._orders.items():
+            key = self._key(sort, grouped, path, row)
+            order.insert(bisect_left(order, key), key)
+
+    def remove(self, path: str):
+        row = self.rows.pop(path, None)
+        if row is None:
+            return
+        if row[3] in self.counts:
+            self.counts[row[3]] -= 1
+        for (sort, grouped), order in self._orders.items():
+            key = self._key(sort, grouped, path, row)
+            i = bisect_left(order, key)
+            if i < len(order) and order[i] == key:
+                del order[i]
+
+    def replace_all(self, rows: Dict[str, Row]):
+        """Bulk load: the indexes are dropped and rebuilt on next use"""
+        self.rows = rows
+        self.counts = dict.fromkeys(CATEGORIES, 0)
+        for row in rows.values():
+            if row[3] in self.counts:
+                self.counts[row[3]] += 1
+        self._orders.clear()
+
+    def view(self, sort: str, category: str = "All") -> "TableView":
+        if category == "All":
+            order = self._order(sort, False)
+            return TableView(self.rows, order, 0, len(order))
+        order = self._order(sort, True)
+        # Keys start with the category, so its rows sit between these two bounds
+        return TableView(self.rows, order, bisect_left(order, (category,)), bisect_left(order, (category + "\0",)))
+
+
+class TableView:
+    """A contiguous range of a sorted index; len() and row slices without copying the index"""
+
+    def __init__(self, rows: Dict[str, Row], order: list, lo: int, hi: int):
+        self.rows, self.order, self.lo, self.hi = rows, order, lo, hi
+
+    def __len__(self):
+        return self.hi - self.lo
+
+    def slice(self, start: int, stop: int) -> List[Tuple[str, Row]]:
+        start, stop = self.lo + max(0, start), min(self.hi, self.lo + stop)
+        return [(key[-1], self.rows[key[-1]]) for key in self.order[start:stop]]
+
+
+# =========================
+# Widget
+# =========================
+class VirtualTable:
+    """Treeview with one item per visible line; rows come from a view on demand"""
+
+    def __init__(self, parent, columns, headings, widths, format_row: Callable[[Row], tuple]):
+        self.tree = ttk.Treeview(parent, columns=columns, show="headings", selectmode="browse")
+        for column, heading, width in zip(columns, headings, widths):
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width)
+        self.tree.pack(expand=True, fill="both", side="left")
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.format_row = format_row
+        self.view: Optional[TableView] = None
+        self.offset = 0
+        self.visible = 0
+
+        self.tree.bind("<Configure>", lambda e: self._resize())
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-self.visible))
+        self.tree.bind("<Next>", lambda e: self.scroll(self.visible))
+        self.tree.bind("<Home>", lambda e: self.scroll_to(0))
+        self.tree.bind("<End>", lambda e: self.scroll_to(len(self.view or ())))
+
+    def _row_height(self) -> int:
+        height = ttk.Style().lookup("Treeview", "rowheight")
+        try:
+            return max(1, int(height))
+        except (TypeError, ValueError, tk.TclError):
+            return 20
+
+    def _resize(self):
+        rows = max(1, self.tree.winfo_height() // self._row_height() - 1)  # Minus the heading
+        if rows != self.visible:
+            self.visible = rows
+            self.render()
+
+    def show(self, view: TableView, keep_position: bool = False):
+        """Display another view (new filter / sort); only the visible rows are touched"""
+        self.view = view
+        if not keep_position:
+            self.offset = 0
+        self.render()
+
+    def scroll(self, lines: int):
+        self.scroll_to(self.offset + lines)
+        return "break"
+
+    def scroll_to(self, offset: int):
+        total = len(self.view) if self.view is not None else 0
+        self.offset = max(0, min(offset, total - self.visible))
+        self.render()
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        total = len(self.view) if self.view is not None else 0
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * total))
+        elif unit == "pages":
+            self.scroll(int(amount) * self.visible)
+        else:
+            self.scroll(int(amount))
+
+    def render(self):
+        rows = self.view.slice(self.offset, self.offset + self.visible) if self.view is not None else []
+        if not rows and self.offset:
+            # The view shrank under the current position
+            self.offset = max(0, len(self.view) - self.visible)
+            rows = self.view.slice(self.offset, self.offset + self.visible)
+        items = self.tree.get_children()
+        for i, (_path, row) in enumerate(rows):
+            values = self.format_row(row)
+            if i < len(items):
+                self.tree.item(items[i], values=values)
+            else:
+                self.tree.insert("", "end", values=values)
+        if len(items) > len(rows):
+            self.tree.delete(*items[len(rows):])
+        total = len(self.view) if self.view is not None else 0
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + len(rows)) / total))
+        else:
+            self.scrollbar.set(0, 1)
@@ -1,14 +1,15 @@
 import os
 from pathlib import Path
 import threading
-from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from PIL import Image
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 import json
 
+from resize_engine import FORMATS, RENDITIONS, Manifest, ResumeState, default_workers, iter_render, iter_resize
+
 # ---------------- CONFIG ---------------- #
 CONFIG_FILE = "resizer_config.json"
 
@@ -31,7 +32,6 @@ def save_last_folder(folder):
 
 # ---------------- GLOBALS ---------------- #
 image_list = []
-pending_images = []
 stop_flag = False
 current_percent = 100  # Live adjustable percentage
 
@@ -58,34 +58,26 @@ def on_percent_change(val):
     except ValueError:
         current_percent = 100  # fallback default
 
-def process_image(img_path, output_folder, overwrite):
-    """Process a single image using live current_percent"""
-    save_path = os.path.join(output_folder, img_path.name)
-    if os.path.exists(save_path) and not overwrite:
-        return "skipped"
-    try:
-        img = Image.open(img_path)
-        w = max(1, img.width * current_percent // 100)
-        h = max(1, img.height * current_percent // 100)
-        resized = img.resize((w, h), Image.Resampling.LANCZOS)
-        resized.save(save_path)
-        return "processed"
-    except Exception as e:
-        return f"error: {img_path.name}"
-
-def resize_images_advanced(overwrite=False):
-    """Multi-threaded resizing with cancel/resume and live percentage adjustment"""
-    global pending_images, stop_flag
+def output_folder_for(source_folder, renditions=False):
+    return os.path.join(source_folder, "Renditions" if renditions else "Resized")
+
+def resize_images_advanced(overwrite=False, renditions=False):
+    """
+    Multi-process resizing with cancel/resume (state kept on disk) and live percentage adjustment.
+    With renditions, every image is decoded once into all RENDITIONS x FORMATS plus a manifest.
+    """
     if not image_list:
         messagebox.showwarning("Warning", "No images loaded.")
         return
 
     source_folder = folder_var.get()
-    output_folder = os.path.join(source_folder, "Resized")
+    output_folder = output_folder_for(source_folder, renditions)
     os.makedirs(output_folder, exist_ok=True)
 
-    if not pending_images:
-        pending_images = list(image_list)
+    # Files finished by an earlier, cancelled run are not processed again
+    state = ResumeState(output_folder)
+    done = state.done()
+    pending_images = [p for p in image_list if p.name not in done]
 
     processed_count = 0
     skipped_count = 0
@@ -95,33 +87,34 @@ def resize_images_advanced(overwrite=False):
     progress_var.set(0)
     app.update_idletasks()
 
-    max_workers = min(8, os.cpu_count() or 4)
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {}
-        for img_path in pending_images:
-            if stop_flag:
-                break
-            future = executor.submit(process_image, img_path, output_folder, overwrite)
-            futures[future] = img_path
-
-        for i, (future, img_path) in enumerate(futures.items(), 1):
-            if stop_flag:
-                break
-            result = future.result()
-            if result == "processed":
-                processed_count += 1
-            elif result == "skipped":
-                skipped_count += 1
-            else:
-                error_list.append(result)
-            progress_var.set(i / total_images * 100)
-            status_var.set(f"Processing: {i}/{total_images} ({current_percent}%)")
-            app.update_idletasks()
-
-        # Remove processed images from pending list
-        pending_images = pending_images[i:] if not stop_flag else pending_images[i-1:]
+    i = 0
+    if renditions:
+        manifest = Manifest(output_folder)
+        results = iter_render(pending_images, output_folder, RENDITIONS, FORMATS, overwrite,
+                              workers=default_workers(), stop=lambda: stop_flag, state=state)
+    else:
+        results = iter_resize(pending_images, output_folder, lambda: current_percent, overwrite,
+                              workers=default_workers(), stop=lambda: stop_flag, state=state)
+    for i, (img_path, result) in enumerate(results, 1):
+        if renditions:
+            result, entry = result
+            manifest.add(img_path.name, entry)
+        if result == "processed":
+            processed_count += 1
+        elif result == "skipped":
+            skipped_count += 1
+        else:
+            error_list.append(result)
+        progress_var.set(i / total_images * 100)
+        mode = f"{len(RENDITIONS)} renditions" if renditions else f"{current_percent}%"
+        status_var.set(f"Processing: {i}/{total_images} ({mode})")
+        app.update_idletasks()
+
+    if renditions:
+        manifest.save(RENDITIONS, FORMATS)
 
     if not stop_flag:
+        state.clear()
         status_var.set("Done")
         message = f"Processed {processed_count} images.\nSkipped {skipped_count} images."
         if error_list:
@@ -131,16 +124,16 @@ def resize_images_advanced(overwrite=False):
                 print(err)
         message += f"\nSaved in:\n{output_folder}"
         messagebox.showinfo("Batch Resize Complete", message)
-        pending_images = []
         progress_var.set(0)
     else:
         status_var.set("Paused/Cancelled")
-        messagebox.showinfo("Paused", f"Batch paused. {len(pending_images)} images remaining.")
+        messagebox.showinfo("Paused", f"Batch paused. {total_images - i} images remaining.")
 
 def start_advanced_resize():
     global stop_flag
     stop_flag = False
-    threading.Thread(target=resize_images_advanced, args=(bool(overwrite_var.get()),), daemon=True).start()
+    threading.Thread(target=resize_images_advanced,
+                     args=(bool(overwrite_var.get()), bool(rendition_var.get())), daemon=True).start()
 
 def cancel_resize():
     global stop_flag
@@ -148,50 +141,61 @@ def cancel_resize():
 
 def resume_resize():
     global stop_flag
-    if pending_images:
+    renditions = bool(rendition_var.get())
+    if image_list and ResumeState(output_folder_for(folder_var.get(), renditions)).exists():
         stop_flag = False
-        threading.Thread(target=resize_images_advanced, args=(bool(overwrite_var.get()),), daemon=True).start()
+        threading.Thread(target=resize_images_advanced,
+                         args=(bool(overwrite_var.get()), renditions), daemon=True).start()
     else:
         messagebox.showinfo("Info", "No pending images to resume.")
 
 # ---------------- GUI ---------------- #
-app = tb.Window(themename="darkly", title="Professional Live Batch Resizer", size=(600, 450))
-
-folder_var = tk.StringVar(value=load_last_folder())
-count_var = tk.StringVar(value="0 images loaded")
-percent_var = tk.IntVar(value=current_percent)
-overwrite_var = tk.IntVar(value=0)
-progress_var = tk.DoubleVar(value=0)
-status_var = tk.StringVar(value="Idle")
-
-# Folder selection
-tb.Label(app, text="Source Folder:").pack(pady=5)
-folder_frame = tb.Frame(app)
-folder_frame.pack(fill=tk.X, padx=10)
-tb.Entry(folder_frame, textvariable=folder_var, state="readonly").pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
-tb.Button(folder_frame, text="Browse", bootstyle="primary", command=select_folder).pack(side=tk.LEFT)
-tb.Button(folder_frame, text="Load Images", bootstyle="secondary", command=lambda: load_images(folder_var.get())).pack(side=tk.LEFT, padx=5)
-
-# Image count
-tb.Label(app, textvariable=count_var, font=("Segoe UI", 10, "bold")).pack(pady=5)
-
-# Resize percentage (live)
-tb.Label(app, text="Resize Percentage (30% - 300%)").pack(pady=5)
-tb.Scale(app, from_=30, to=300, orient=tk.HORIZONTAL, variable=percent_var, command=on_percent_change).pack(fill=tk.X, padx=20)
-
-# Overwrite checkbox
-tb.Checkbutton(app, text="Overwrite existing resized images", variable=overwrite_var, bootstyle="info").pack(pady=5)
-
-# Progress bar and status
-tb.Label(app, text="Progress:").pack(pady=5)
-tb.Progressbar(app, variable=progress_var, maximum=100).pack(fill=tk.X, padx=20, pady=5)
-tb.Label(app, textvariable=status_var).pack(pady=5)
-
-# Buttons
-button_frame = tb.Frame(app)
-button_frame.pack(pady=10, fill=tk.X, padx=20)
-tb.Button(button_frame, text="🚀 Start", bootstyle="success", command=start_advanced_resize).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
-tb.Button(button_frame, text="⏸ Cancel", bootstyle="warning", command=cancel_resize).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
-tb.Button(button_frame, text="▶ Resume", bootstyle="info", command=resume_resize).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
-
-app.mainloop()
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Worker processes re-import this file
+
+    app = tb.Window(themename="darkly", title="Professional Live Batch Resizer", size=(600, 490))
+
+    folder_var = tk.StringVar(value=load_last_folder())
+    count_var = tk.StringVar(value="0 images loaded")
+    percent_var = tk.IntVar(value=current_percent)
+    overwrite_var = tk.IntVar(value=0)
+    rendition_var = tk.IntVar(value=0)
+    progress_var = tk.DoubleVar(value=0)
+    status_var = tk.StringVar(value="Idle")
+
+    # Folder selection
+    tb.Label(app, text="Source Folder:").pack(pady=5)
+    folder_frame = tb.Frame(app)
+    folder_frame.pack(fill=tk.X, padx=10)
+    tb.Entry(folder_frame, textvariable=folder_var, state="readonly").pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+    tb.Button(folder_frame, text="Browse", bootstyle="primary", command=select_folder).pack(side=tk.LEFT)
+    tb.Button(folder_frame, text="Load Images", bootstyle="secondary", command=lambda: load_images(folder_var.get())).pack(side=tk.LEFT, padx=5)
+
+    # Image count
+    tb.Label(app, textvariable=count_var, font=("Segoe UI", 10, "bold")).pack(pady=5)
+
+    # Resize percentage (live)
+    tb.Label(app, text="Resize Percentage (30% - 300%)").pack(pady=5)
+    tb.Scale(app, from_=30, to=300, orient=tk.HORIZONTAL, variable=percent_var, command=on_percent_change).pack(fill=tk.X, padx=20)
+
+    # Overwrite checkbox
+    tb.Checkbutton(app, text="Overwrite existing resized images", variable=overwrite_var, bootstyle="info").pack(pady=5)
+
+    # Rendition mode: one decode per image, every size and format
+    sizes = ", ".join(f"{name} {edge}px" if edge else name for name, edge in RENDITIONS.items())
+    tb.Checkbutton(app, text=f"Rendition mode ({sizes} as {'/'.join(FORMATS).upper()} + manifest.json)",
+                   variable=rendition_var, bootstyle="info").pack(pady=5)
+
+    # Progress bar and status
+    tb.Label(app, text="Progress:").pack(pady=5)
+    tb.Progressbar(app, variable=progress_var, maximum=100).pack(fill=tk.X, padx=20, pady=5)
+    tb.Label(app, textvariable=status_var).pack(pady=5)
+
+    # Buttons
+    button_frame = tb.Frame(app)
+    button_frame.pack(pady=10, fill=tk.X, padx=20)
+    tb.Button(button_frame, text="🚀 Start", bootstyle="success", command=start_advanced_resize).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
+    tb.Button(button_frame, text="⏸ Cancel", bootstyle="warning", command=cancel_resize).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
+    tb.Button(button_frame, text="▶ Resume", bootstyle="info", command=resume_resize).pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
+
+    app.mainloop()
@@ -0,0 +1,103 @@
+"""
+Images/sec of the batch resizer on 24-MP JPEGs.
+
+Compares the old thread-pool path (full decode + LANCZOS, 8 threads) with the
+process-pool engine (draft decode + reducing_gap) at 1, 4 and N workers.
+--renditions instead times one rendition against several from one decode.
+
+    python benchmark_resize.py [--count 10000] [--percent 10] [--legacy-count 200]
+    python benchmark_resize.py --renditions [--count 50]
+
+One synthetic 6000x4000 JPEG is hard-linked --count times into a temp folder,
+so the photos cost no extra disk space; every copy is still decoded in full.
+The old path is timed on --legacy-count images only.
+"""
+import os
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from resize_engine import RENDITIONS, default_workers, iter_render, iter_resize
+
+
+def make_photos(folder, count, size=(6000, 4000)):
+    rng = np.random.default_rng(0)
+    w, h = size
+    # Smooth gradients plus fine noise compress roughly like a real photo
+    x = np.linspace(0, 255, w, dtype=np.float32)
+    y = np.linspace(0, 255, h, dtype=np.float32)[:, None]
+    rgb = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1)
+    rgb += rng.normal(0, 12, rgb.shape).astype(np.float32)
+    base = os.path.join(folder, "base.jpg")
+    Image.fromarray(np.clip(rgb, 0, 255).astype(np.uint8)).save(base, quality=90)
+    paths = []
+    for i in range(count):
+        path = os.path.join(folder, f"photo_{i:05d}.jpg")
+        try:
+            os.link(base, path)
+        except OSError:
+            shutil.copyfile(base, path)
+        paths.append(Path(path))
+    return paths
+
+
+def legacy_resize(img_path, output_folder, percent):
+    img = Image.open(img_path)
+    w = max(1, img.width * percent // 100)
+    h = max(1, img.height * percent // 100)
+    img.resize((w, h), Image.Resampling.LANCZOS).save(os.path.join(output_folder, img_path.name))
+
+
+def timed(label, count, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:>22}: {count / elapsed:8.2f} images/s  ({count} images in {elapsed:.1f} s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch resize throughput on 24-MP photos")
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--percent", type=int, default=10)
+    parser.add_argument("--legacy-count", type=int, default=200)
+    parser.add_argument("--renditions", action="store_true", help="Benchmark rendition mode")
+    args = parser.parse_args()
+
+    src = tempfile.mkdtemp(prefix="resize_src_")
+    out = tempfile.mkdtemp(prefix="resize_out_")
+    try:
+        paths = make_photos(src, args.count)
+        if args.renditions:
+            downscaled = {name: edge for name, edge in RENDITIONS.items() if edge}
+            for label, renditions in (("web only", {"web": RENDITIONS["web"]}),
+                                      (f"{len(downscaled)} downscaled", downscaled),
+                                      (f"all {len(RENDITIONS)}", RENDITIONS)):
+                timed(f"{label}, jpg", len(paths),
+                      lambda: list(iter_render(paths, out, renditions, ("jpg",), overwrite=True)))
+            return
+        print(f"{args.count} x 24 MP JPEG, {args.percent}% output, {os.cpu_count()} CPUs")
+
+        legacy = paths[:args.legacy_count]
+
+        def run_legacy():
+            with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 4)) as executor:
+                list(executor.map(lambda p: legacy_resize(p, out, args.percent), legacy))
+
+        timed("threads, full decode", len(legacy), run_legacy)
+
+        for workers in sorted({1, 4, default_workers()}):
+            timed(f"{workers} process(es)", len(paths),
+                  lambda: list(iter_resize(paths, out, args.percent, overwrite=True, workers=workers)))
+    finally:
+        shutil.rmtree(src, ignore_errors=True)
+        shutil.rmtree(out, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
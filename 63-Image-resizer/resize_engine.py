@@ -0,0 +1,249 @@
+"""
+Process-pool resize engine for the batch resizer.
+
+Pillow's LANCZOS resize and JPEG encode hold the GIL for most of their work,
+so images are resized in worker processes instead of threads. Large
+downscales avoid decoding at full resolution: JPEGs are decoded straight at
+1/2, 1/4 or 1/8 scale with draft(), and other formats are box-reduced by an
+integer factor before the final LANCZOS pass (reducing_gap).
+
+Rendition mode decodes each image once and derives every target size from
+a pyramid of progressively halved intermediates, then encodes each size to
+several formats on a small thread pool; a manifest.json describes the output.
+
+Results stream back in input order through a bounded window of in-flight
+jobs, and every finished file is appended to a state file in the output
+folder so a cancelled batch resumes from disk, even after a restart.
+"""
+import os
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Set, Tuple, Union
+
+from PIL import Image
+
+# ---------------- CONFIG ---------------- #
+STATE_FILE = ".resize_done"  # One finished file name per line, inside the output folder
+REDUCING_GAP = 3.0  # Box-reduce until the image is at most 3x the target, then LANCZOS
+IN_FLIGHT_PER_WORKER = 4
+MANIFEST_FILE = "manifest.json"
+# Longest edge in pixels per rendition; None keeps the original size
+RENDITIONS = {"thumbnail": 256, "preview": 800, "web": 1600, "full": None}
+FORMATS = ("jpg", "webp")
+SAVE_OPTIONS = {"jpg": {"quality": 85, "optimize": True}, "webp": {"quality": 80, "method": 4}, "png": {}}
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+# ---------------- WORKER ---------------- #
+def draft_for_size(img: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    """Let a JPEG decode at the smallest DCT scale (1/2, 1/4, 1/8) still >= size"""
+    if img.format == "JPEG":
+        img.draft(img.mode, size)
+    return img
+
+
+def target_size(width: int, height: int, percent: int) -> Tuple[int, int]:
+    return max(1, width * percent // 100), max(1, height * percent // 100)
+
+
+def resize_one(img_path, output_folder: str, percent: int, overwrite: bool) -> str:
+    """Resize a single image; returns "processed", "skipped" or "error: <name>" """
+    img_path = Path(img_path)
+    save_path = os.path.join(output_folder, img_path.name)
+    if os.path.exists(save_path) and not overwrite:
+        return "skipped"
+    try:
+        with Image.open(img_path) as img:
+            size = target_size(img.width, img.height, percent)
+            resized = draft_for_size(img, size).resize(size, Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+        resized.save(save_path)
+        return "processed"
+    except Exception:
+        return f"error: {img_path.name}"
+
+
+# ---------------- RENDITIONS ---------------- #
+_encoders = None  # Per-process thread pool; JPEG/WebP encoders release the GIL
+
+
+def fit_size(width: int, height: int, longest: Optional[int]) -> Tuple[int, int]:
+    """Size with the given longest edge, never upscaled"""
+    if longest is None or max(width, height) <= longest:
+        return width, height
+    scale = longest / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def build_renditions(img: Image.Image, sizes: Dict[str, Tuple[int, int]]) -> Dict[str, Image.Image]:
+    """Every size from one decoded image, largest first, each derived from the one before"""
+    out = {}
+    current = img
+    for name, size in sorted(sizes.items(), key=lambda kv: -kv[1][0] * kv[1][1]):
+        # Halve while the result still covers the target, then one LANCZOS pass to the exact size
+        while current.width // 2 >= size[0] and current.height // 2 >= size[1]:
+            current = current.reduce(2)
+        current = current if current.size == size else current.resize(size, Image.Resampling.LANCZOS)
+        out[name] = current
+    return out
+
+
+def encode(img: Image.Image, path: str, fmt: str) -> dict:
+    if fmt == "jpg" and img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    img.save(path, **SAVE_OPTIONS.get(fmt, {}))
+    return {"path": path, "width": img.width, "height": img.height, "bytes": os.path.getsize(path)}
+
+
+def render_one(img_path, output_folder: str, renditions: Dict[str, Optional[int]] = None,
+               formats: Iterable[str] = FORMATS, overwrite: bool = False) -> Tuple[str, dict]:
+    """
+    Decode once and write <output>/<rendition>/<stem>.<fmt> for every pair.
+    Returns ("processed" | "skipped" | "error: <name>", manifest entry).
+    """
+    global _encoders
+    img_path = Path(img_path)
+    renditions = renditions or RENDITIONS
+    formats = list(formats)
+    targets = [(name, fmt, os.path.join(output_folder, name, f"{img_path.stem}.{fmt}"))
+               for name in renditions for fmt in formats]
+    if not overwrite and all(os.path.exists(path) for _, _, path in targets):
+        return "skipped", {}
+    try:
+        with Image.open(img_path) as img:
+            source_size = img.size
+            sizes = {name: fit_size(img.width, img.height, longest) for name, longest in renditions.items()}
+            draft_for_size(img, max(sizes.values(), key=lambda wh: wh[0] * wh[1]))
+            img.load()  # A rendition at source size is img itself and must outlive the file
+            if img.mode not in ("RGB", "RGBA", "L"):
+                img = img.convert("RGBA")  # Palette/CMYK images can't be reduce()d
+            images = build_renditions(img, sizes)
+        if _encoders is None:
+            _encoders = ThreadPoolExecutor(max_workers=max(2, len(formats)))
+        for name in renditions:
+            os.makedirs(os.path.join(output_folder, name), exist_ok=True)
+        jobs = {(name, fmt): _encoders.submit(encode, images[name], path, fmt) for name, fmt, path in targets}
+        entry = {"width": source_size[0], "height": source_size[1], "renditions": {}}
+        for (name, fmt), job in jobs.items():
+            info = job.result()
+            info["path"] = os.path.relpath(info["path"], output_folder).replace(os.sep, "/")
+            entry["renditions"].setdefault(name, {})[fmt] = info
+        return "processed", entry
+    except Exception:
+        return f"error: {img_path.name}", {}
+
+
+class Manifest:
+    """manifest.json in the output folder: source file -> renditions and formats"""
+
+    def __init__(self, output_folder: str):
+        self.path = os.path.join(output_folder, MANIFEST_FILE)
+        self.entries: Dict[str, dict] = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f).get("images", {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def add(self, name: str, entry: dict):
+        if entry:
+            self.entries[name] = entry
+
+    def save(self, renditions: Dict[str, Optional[int]], formats: Iterable[str]):
+        data = {"renditions": renditions, "formats": list(formats), "images": self.entries}
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+# ---------------- RESUME STATE ---------------- #
+class ResumeState:
+    """Names of finished files, appended as results arrive"""
+
+    def __init__(self, output_folder: str):
+        self.path = os.path.join(output_folder, STATE_FILE)
+        self.file = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def done(self) -> Set[str]:
+        if not self.exists():
+            return set()
+        with open(self.path, "r", encoding="utf-8") as f:
+            return {line.rstrip("\n") for line in f if line.strip()}
+
+    def mark(self, name: str):
+        if self.file is None:
+            self.file = open(self.path, "a", encoding="utf-8")
+        self.file.write(name + "\n")
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def clear(self):
+        self.close()
+        if self.exists():
+            os.remove(self.path)
+
+
+# ---------------- ENGINE ---------------- #
+def _stream(task: Callable, paths: Iterable, make_args: Callable[[], tuple], workers: Optional[int],
+            stop: Optional[Callable[[], bool]], state: Optional["ResumeState"]) -> Iterator[Tuple[Path, object]]:
+    """Run task(path, *make_args()) in a process pool, yielding results in input order"""
+    workers = workers or default_workers()
+    paths = iter(paths)
+    window = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            while True:
+                while len(window) < workers * IN_FLIGHT_PER_WORKER and not (stop and stop()):
+                    path = next(paths, None)
+                    if path is None:
+                        break
+                    window.append((path, executor.submit(task, str(path), *make_args())))
+                if not window:
+                    break
+                path, future = window.popleft()
+                result = future.result()
+                status = result[0] if isinstance(result, tuple) else result
+                if state is not None and not status.startswith("error"):
+                    state.mark(Path(path).name)
+                yield Path(path), result
+                if stop and stop():
+                    break
+        finally:
+            for _, future in window:
+                future.cancel()
+            if state is not None:
+                state.close()
+
+
+def iter_resize(paths: Iterable, output_folder: str, percent: Union[int, Callable[[], int]],
+                overwrite: bool = False, workers: Optional[int] = None,
+                stop: Optional[Callable[[], bool]] = None,
+                state: Optional[ResumeState] = None) -> Iterator[Tuple[Path, str]]:
+    """
+    Yield (path, result) in input order. percent may be a callable, read as each
+    job is submitted so a live slider still affects the rest of the batch.
+    """
+    get_percent = percent if callable(percent) else (lambda: percent)
+    return _stream(resize_one, paths, lambda: (output_folder, get_percent(), overwrite), workers, stop, state)
+
+
+def iter_render(paths: Iterable, output_folder: str, renditions: Dict[str, Optional[int]] = None,
+                formats: Iterable[str] = FORMATS, overwrite: bool = False, workers: Optional[int] = None,
+                stop: Optional[Callable[[], bool]] = None,
+                state: Optional[ResumeState] = None) -> Iterator[Tuple[Path, Tuple[str, dict]]]:
+    """Yield (path, (result, manifest entry)) in input order"""
+    args = (output_folder, renditions or RENDITIONS, tuple(formats), overwrite)
+    return _stream(render_one, paths, lambda: args, workers, stop, state)
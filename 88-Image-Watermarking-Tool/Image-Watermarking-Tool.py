@@ -1,8 +1,12 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import ttkbootstrap as tb
-from PIL import Image, ImageDraw, ImageFont, ImageTk
+from PIL import ImageTk
 import os
+import threading
+import multiprocessing
+
+from watermark_engine import ThumbnailCache, apply_batch, composite_text
 
 # Optional: Drag-and-drop support
 try:
@@ -10,7 +14,14 @@ try:
     DND_AVAILABLE = True
 except ImportError:
     DND_AVAILABLE = False
-    print("tkinterdnd2 not installed. Drag-and-drop disabled (install via pip install tkinterdnd2)")
+    if __name__ == "__main__":
+        print("tkinterdnd2 not installed. Drag-and-drop disabled (install via pip install tkinterdnd2)")
+
+# ================= CONFIG =================
+GALLERY_COLUMNS = 5
+CELL_WIDTH = 175   # Fixed gallery cell size, so visible rows can be computed from the scroll offset
+CELL_HEIGHT = 215
+POSITIONS = ["Top-Left","Top-Right","Bottom-Left","Bottom-Right","Center"]
 
 # ================= HELPERS =================
 def show_error(title, msg):
@@ -33,48 +44,41 @@ def add_placeholder(entry, text):
     entry.bind("<FocusIn>", clear)
     entry.bind("<FocusOut>", restore)
 
-# ================= ROOT WINDOW =================
-if DND_AVAILABLE:
-    app = TkinterDnD.Tk()
-    app.title("Per-Thumbnail Watermark Tool")
-    app.geometry("1200x600")
-else:
-    app = tb.Window("Per-Thumbnail Watermark Tool", themename="flatly", size=(1200, 600))
+def read_settings():
+    """(text or None, font size, alpha) from the settings panel"""
+    text = watermark_text.get().strip()
+    if not text or text.lower() == "enter watermark text":
+        text = None
+    try:
+        size = int(font_size.get())
+    except:
+        size = 36
+    try:
+        alpha = int(opacity.get())
+        if not (0 <= alpha <= 255):
+            alpha = 128
+    except:
+        alpha = 128
+    return text, size, alpha
 
 # ================= DATA =================
-image_data = []  # List of dicts: {"path":..., "position":..., "thumbnail":..., "preview":..., "selected":...}
-
-# ================= SPLIT PANEL =================
-left_panel = tb.Labelframe(app, text="Image Preview (Drag & Drop / Browse)", padding=10)
-left_panel.pack(side="left", fill="both", expand=True, padx=10, pady=10)
-
-right_panel = tb.Labelframe(app, text="Global Watermark Settings", padding=10)
-right_panel.pack(side="right", fill="y", padx=10, pady=10)
-
-# ================= SCROLLABLE GALLERY =================
-canvas = tk.Canvas(left_panel)
-scrollbar = tk.Scrollbar(left_panel, orient="vertical", command=canvas.yview)
-scrollable_frame = tk.Frame(canvas)
-scrollable_frame.bind(
-    "<Configure>",
-    lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-)
-canvas.create_window((0,0), window=scrollable_frame, anchor="nw")
-canvas.configure(yscrollcommand=scrollbar.set)
-canvas.pack(side="left", fill="both", expand=True)
-scrollbar.pack(side="right", fill="y")
+image_data = []  # List of dicts: {"path":..., "position":..., "preview":..., "preview_key":..., "selected":...}
+thumbnails = ThumbnailCache()  # (path, mtime) -> thumbnail, survives gallery redraws
+visible_cells = {}  # image index -> (canvas item, frame) for the rows currently on screen
 
 # ================= IMAGE MANAGEMENT =================
 def add_images(paths):
+    known = {d["path"] for d in image_data}
     for path in paths:
-        if os.path.isfile(path) and path not in [d["path"] for d in image_data]:
+        if os.path.isfile(path) and path not in known:
             ext = os.path.splitext(path)[1].lower()
             if ext in [".png", ".jpg", ".jpeg", ".bmp", ".gif"]:
+                known.add(path)
                 image_data.append({
                     "path": path,
                     "position": "Bottom-Right",
-                    "thumbnail": None,
                     "preview": None,
+                    "preview_key": None,
                     "selected": False
                 })
     update_gallery()
@@ -99,218 +103,229 @@ def remove_selected():
     image_data = [d for d in image_data if not d["selected"]]
     update_gallery()
 
-# ================= GLOBAL WATERMARK SETTINGS =================
-tb.Label(right_panel, text="Watermark Text").pack(anchor="w", pady=(0,2))
-watermark_text = tb.Entry(right_panel, width=40)
-watermark_text.pack(anchor="w", pady=(0,5))
-add_placeholder(watermark_text, "Enter watermark text")
-
-tb.Label(right_panel, text="Font Size").pack(anchor="w", pady=(5,2))
-font_size = tb.Entry(right_panel, width=20)
-font_size.pack(anchor="w", pady=(0,5))
-add_placeholder(font_size, "36")
-
-tb.Label(right_panel, text="Opacity (0-255)").pack(anchor="w", pady=(5,2))
-opacity = tb.Entry(right_panel, width=20)
-opacity.pack(anchor="w", pady=(0,5))
-add_placeholder(opacity, "128")
-
-tb.Label(right_panel, text="Output Folder").pack(anchor="w", pady=(5,2))
-output_path_var = tk.StringVar()
-tb.Entry(right_panel, textvariable=output_path_var, width=40).pack(anchor="w", pady=(0,5))
-select_btn = tb.Button(right_panel, text="Select Folder", bootstyle="success", command=lambda: output_path_var.set(filedialog.askdirectory()))
-select_btn.pack(anchor="w", pady=(0,5))
-
 # ================= THUMBNAIL PREVIEW =================
 def generate_preview(image_dict):
+    """Watermarked thumbnail; rebuilt only when the file, settings or position changed"""
     try:
-        img = Image.open(image_dict["path"]).convert("RGBA")
-        img.thumbnail((150,150))
-        preview = img.copy()
-        text = watermark_text.get().strip()
-        if text and text.lower() != "enter watermark text":
-            try:
-                size = int(font_size.get())
-            except:
-                size = 36
-            try:
-                alpha = int(opacity.get())
-                if not (0 <= alpha <= 255):
-                    alpha = 128
-            except:
-                alpha = 128
-            watermark_layer = Image.new("RGBA", preview.size, (255,255,255,0))
-            draw = ImageDraw.Draw(watermark_layer)
-            try:
-                font = ImageFont.truetype("arial.ttf", size)
-            except:
-                font = ImageFont.load_default()
-            bbox = draw.textbbox((0,0), text, font=font)
-            text_width = bbox[2]-bbox[0]
-            text_height = bbox[3]-bbox[1]
-            pos = image_dict.get("position","Bottom-Right")
-            x = y = 0
-            if pos=="Top-Left": x,y=10,10
-            elif pos=="Top-Right": x,y=preview.width-text_width-10,10
-            elif pos=="Bottom-Left": x,y=10,preview.height-text_height-10
-            elif pos=="Bottom-Right": x,y=preview.width-text_width-10,preview.height-text_height-10
-            elif pos=="Center": x,y=(preview.width-text_width)//2,(preview.height-text_height)//2
-            draw.text((x,y), text, fill=(255,255,255,alpha), font=font)
-            preview = Image.alpha_composite(preview, watermark_layer)
+        text, size, alpha = read_settings()
+        path = image_dict["path"]
+        key = (path, os.path.getmtime(path), text, size, alpha, image_dict.get("position", "Bottom-Right"))
+        if image_dict["preview"] is not None and image_dict["preview_key"] == key:
+            return
+        preview = thumbnails.get(path).copy()
+        if text:
+            composite_text(preview, text, size, alpha, image_dict.get("position", "Bottom-Right"))
         image_dict["preview"] = ImageTk.PhotoImage(preview)
+        image_dict["preview_key"] = key
     except Exception as e:
         print(f"Preview error: {e}")
 
-# ================= GALLERY UPDATE (grid version) =================
+# ================= GALLERY UPDATE (virtualized grid) =================
 def update_gallery():
-    for widget in scrollable_frame.winfo_children():
-        widget.destroy()
-    columns = 5
-    for idx, d in enumerate(image_data):
-        generate_preview(d)
-        lbl_frame = tk.Frame(scrollable_frame, bd=2, relief="groove")
-        lbl_frame.grid(row=idx//columns, column=idx%columns, padx=5, pady=5)
-        lbl = tk.Label(lbl_frame, image=d["preview"])
-        lbl.image = d["preview"]
-        lbl.pack()
-        # Position combobox per thumbnail
-        pos_cb = tb.Combobox(lbl_frame, values=["Top-Left","Top-Right","Bottom-Left","Bottom-Right","Center"],
-                             state="readonly", width=12)
-        pos_cb.set(d.get("position","Bottom-Right"))
-        pos_cb.pack(pady=5)
-        def cb_callback(event, img_dict=d, label=lbl):
-            img_dict["position"] = pos_cb.get()
-            generate_preview(img_dict)
-            label.configure(image=img_dict["preview"])
-            label.image = img_dict["preview"]
-        pos_cb.bind("<<ComboboxSelected>>", cb_callback)
-        # Selection toggle
-        def toggle_select(e, img_dict=d, frame=lbl_frame):
-            img_dict["selected"] = not img_dict["selected"]
-            frame.config(bd=4, relief="sunken" if img_dict["selected"] else "groove")
-        lbl_frame.bind("<Button-1>", toggle_select)
-        lbl.bind("<Button-1>", toggle_select)
-
-def process_image(d, text, size, alpha, out_dir):
-    try:
-        img = Image.open(d["path"]).convert("RGBA")
-        watermark_layer = Image.new("RGBA", img.size, (255,255,255,0))
-        draw = ImageDraw.Draw(watermark_layer)
-
-        try:
-            font = ImageFont.truetype("arial.ttf", size)
-        except:
-            font = ImageFont.load_default()
-
-        bbox = draw.textbbox((0,0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-
-        pos = d.get("position","Bottom-Right")
-        if pos=="Top-Left": x,y=10,10
-        elif pos=="Top-Right": x,y=img.width-text_width-10,10
-        elif pos=="Bottom-Left": x,y=10,img.height-text_height-10
-        elif pos=="Bottom-Right": x,y=img.width-text_width-10,img.height-text_height-10
-        else: x,y=(img.width-text_width)//2,(img.height-text_height)//2
-
-        draw.text((x,y), text, fill=(255,255,255,alpha), font=font)
-
-        watermarked = Image.alpha_composite(img, watermark_layer)
-        base_name = os.path.basename(d["path"])
-        watermarked.convert("RGB").save(os.path.join(out_dir, base_name))
-
-        progress_var.set(progress_var.get() + 1)
-        app.update_idletasks()
-
-    except Exception as e:
-        print(f"Failed: {d['path']} -> {e}")
+    """The image list changed: drop the rendered cells and draw the visible rows again"""
+    for item, frame in visible_cells.values():
+        canvas.delete(item)
+        frame.destroy()
+    visible_cells.clear()
+    rows = (len(image_data) + GALLERY_COLUMNS - 1) // GALLERY_COLUMNS
+    canvas.configure(scrollregion=(0, 0, GALLERY_COLUMNS * CELL_WIDTH, rows * CELL_HEIGHT))
+    render_visible()
+
+def render_visible(*_):
+    """Create cells for rows in view (plus one either side) and destroy the rest"""
+    top = canvas.canvasy(0)
+    bottom = canvas.canvasy(max(canvas.winfo_height(), CELL_HEIGHT))
+    first_row = max(0, int(top // CELL_HEIGHT) - 1)
+    last_row = int(bottom // CELL_HEIGHT) + 1
+    wanted = range(first_row * GALLERY_COLUMNS, min(len(image_data), (last_row + 1) * GALLERY_COLUMNS))
+    for idx in [i for i in visible_cells if i not in wanted]:
+        item, frame = visible_cells.pop(idx)
+        canvas.delete(item)
+        frame.destroy()
+    for idx in wanted:
+        if idx not in visible_cells:
+            visible_cells[idx] = make_cell(idx, image_data[idx])
+
+def make_cell(idx, d):
+    generate_preview(d)
+    lbl_frame = tk.Frame(canvas, bd=4 if d["selected"] else 2, relief="sunken" if d["selected"] else "groove")
+    item = canvas.create_window((idx % GALLERY_COLUMNS) * CELL_WIDTH + 5, (idx // GALLERY_COLUMNS) * CELL_HEIGHT + 5,
+                                window=lbl_frame, anchor="nw")
+    lbl = tk.Label(lbl_frame, image=d["preview"])
+    lbl.image = d["preview"]
+    lbl.pack()
+    # Position combobox per thumbnail
+    pos_cb = tb.Combobox(lbl_frame, values=POSITIONS, state="readonly", width=12)
+    pos_cb.set(d.get("position","Bottom-Right"))
+    pos_cb.pack(pady=5)
+    def cb_callback(event, img_dict=d, label=lbl, cb=pos_cb):
+        img_dict["position"] = cb.get()
+        generate_preview(img_dict)
+        label.configure(image=img_dict["preview"])
+        label.image = img_dict["preview"]
+    pos_cb.bind("<<ComboboxSelected>>", cb_callback)
+    # Selection toggle
+    def toggle_select(e, img_dict=d, frame=lbl_frame):
+        img_dict["selected"] = not img_dict["selected"]
+        frame.config(bd=4, relief="sunken" if img_dict["selected"] else "groove")
+    lbl_frame.bind("<Button-1>", toggle_select)
+    lbl.bind("<Button-1>", toggle_select)
+    return item, lbl_frame
+
+def scroll_gallery(*args):
+    canvas.yview(*args)
+    render_visible()
+
+def on_mousewheel(event):
+    canvas.yview_scroll(-1 if event.delta > 0 else 1, "units")
+    render_visible()
+
+def set_buttons_state(state):
+    for btn in (select_btn, browse_btn, remove_btn, apply_btn):
+        btn.config(state=state)
 
 def reset_progress_ui():
-    apply_btn.config(state="normal")
+    set_buttons_state("normal")
     progress_bar.pack_forget()
     progress_var.set(0)
 
 # ================= APPLY WATERMARK =================
 def apply_watermark():
-    progress_bar.pack(fill="x", pady=(0, 5))
-    progress_bar["maximum"] = len(image_data)
-    progress_var.set(0)
-    select_btn.config(state="disabled")
-    browse_btn.config(state="disabled")
-    remove_btn.config(state="disabled")
-    apply_btn.config(state="disabled")
-    app.update_idletasks()
-
     out_dir = output_path_var.get().strip()
     if not out_dir or not os.path.isdir(out_dir):
         show_error("Error", "Please select a valid output folder.")
-        reset_progress_ui()
         return
-    text = watermark_text.get().strip()
-    if not text or text.lower()=="enter watermark text":
+    text, size, alpha = read_settings()
+    if not text:
         show_error("Error", "Please enter watermark text.")
         return
-    try:
-        size = int(font_size.get())
-    except:
-        size = 36
-    try:
-        alpha = int(opacity.get())
-        if not (0<=alpha<=255): alpha=128
-    except:
-        alpha=128
-    count=0
-    for d in image_data:
-        process_image(d, text, size, alpha, out_dir)
-        count += 1
-    show_info("Done", f"Watermarked {count} image(s) successfully.")
-    select_btn.config(state="normal")
-    browse_btn.config(state="normal")
-    remove_btn.config(state="normal")
-    apply_btn.config(state="normal")
-    progress_bar.pack_forget()
+
+    progress_bar.pack(fill="x", pady=(0, 5), before=throughput_label)
+    progress_bar["maximum"] = max(1, len(image_data))
     progress_var.set(0)
+    throughput_var.set("")
+    set_buttons_state("disabled")
+
+    jobs = [(d["path"], d.get("position", "Bottom-Right")) for d in image_data]
+    threading.Thread(target=run_batch, args=(jobs, text, size, alpha, out_dir), daemon=True).start()
+
+def run_batch(jobs, text, size, alpha, out_dir):
+    """Worker thread: drive the process pool and report progress and images/sec"""
+    count = failed = 0
+    rate = 0.0
+    for path, error, rate in apply_batch(jobs, text, size, alpha, out_dir):
+        if error:
+            failed += 1
+            print(f"Failed: {path} -> {error}")
+        else:
+            count += 1
+        done = count + failed
+        app.after(0, progress_var.set, done)
+        app.after(0, throughput_var.set, f"{done}/{len(jobs)} — {rate:.1f} images/s")
+    app.after(0, finish_batch, count, failed, rate)
+
+def finish_batch(count, failed, rate):
+    message = f"Watermarked {count} image(s) successfully ({rate:.1f} images/s)."
+    if failed:
+        message += f"\n{failed} failed (see console)."
+    show_info("Done", message)
+    reset_progress_ui()
+
+# ================= UI =================
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Batch workers re-import this file
+
+    # ================= ROOT WINDOW =================
+    if DND_AVAILABLE:
+        app = TkinterDnD.Tk()
+        app.title("Per-Thumbnail Watermark Tool")
+        app.geometry("1200x600")
+    else:
+        app = tb.Window("Per-Thumbnail Watermark Tool", themename="flatly", size=(1200, 600))
+
+    # ================= SPLIT PANEL =================
+    left_panel = tb.Labelframe(app, text="Image Preview (Drag & Drop / Browse)", padding=10)
+    left_panel.pack(side="left", fill="both", expand=True, padx=10, pady=10)
+
+    right_panel = tb.Labelframe(app, text="Global Watermark Settings", padding=10)
+    right_panel.pack(side="right", fill="y", padx=10, pady=10)
+
+    # ================= SCROLLABLE GALLERY =================
+    canvas = tk.Canvas(left_panel)
+    scrollbar = tk.Scrollbar(left_panel, orient="vertical", command=scroll_gallery)
+    canvas.configure(yscrollcommand=scrollbar.set)
+    canvas.bind("<Configure>", render_visible)
+    canvas.bind("<MouseWheel>", on_mousewheel)
+    canvas.pack(side="left", fill="both", expand=True)
+    scrollbar.pack(side="right", fill="y")
+
+    # ================= GLOBAL WATERMARK SETTINGS =================
+    tb.Label(right_panel, text="Watermark Text").pack(anchor="w", pady=(0,2))
+    watermark_text = tb.Entry(right_panel, width=40)
+    watermark_text.pack(anchor="w", pady=(0,5))
+    add_placeholder(watermark_text, "Enter watermark text")
+
+    tb.Label(right_panel, text="Font Size").pack(anchor="w", pady=(5,2))
+    font_size = tb.Entry(right_panel, width=20)
+    font_size.pack(anchor="w", pady=(0,5))
+    add_placeholder(font_size, "36")
+
+    tb.Label(right_panel, text="Opacity (0-255)").pack(anchor="w", pady=(5,2))
+    opacity = tb.Entry(right_panel, width=20)
+    opacity.pack(anchor="w", pady=(0,5))
+    add_placeholder(opacity, "128")
+
+    tb.Label(right_panel, text="Output Folder").pack(anchor="w", pady=(5,2))
+    output_path_var = tk.StringVar()
+    tb.Entry(right_panel, textvariable=output_path_var, width=40).pack(anchor="w", pady=(0,5))
+    select_btn = tb.Button(right_panel, text="Select Folder", bootstyle="success", command=lambda: output_path_var.set(filedialog.askdirectory()))
+    select_btn.pack(anchor="w", pady=(0,5))
+
+    # ================= BUTTONS =================
+    browse_btn= tb.Button(
+        right_panel,
+        text="Browse Images",
+        bootstyle="info",
+        command=browse_images
+    )
+    browse_btn.pack(pady=5, fill="x")
+
+    remove_btn = tb.Button(
+        right_panel,
+        text="Remove Selected",
+        bootstyle="danger",
+        command=remove_selected
+    )
+    remove_btn.pack(pady=5, fill="x")
+
+    apply_btn = tb.Button(
+        right_panel,
+        text="Apply Watermark to All",
+        bootstyle="success",
+        command=apply_watermark
+    )
+    apply_btn.pack(pady=(10, 5), fill="x")
+
+    # Progress bar (hidden initially)
+    progress_var = tk.IntVar(value=0)
+    progress_bar = tb.Progressbar(
+        right_panel,
+        variable=progress_var,
+        maximum=100,
+        mode="determinate"
+    )
+    progress_bar.pack(fill="x", pady=(0, 5))
+    progress_bar.pack_forget()  # hide until needed
 
-# ================= BUTTONS =================
-browse_btn= tb.Button(
-    right_panel,
-    text="Browse Images",
-    bootstyle="info",
-    command=browse_images
-)
-browse_btn.pack(pady=5, fill="x")
-
-remove_btn = tb.Button(
-    right_panel,
-    text="Remove Selected",
-    bootstyle="danger",
-    command=remove_selected
-)
-remove_btn.pack(pady=5, fill="x")
-
-apply_btn = tb.Button(
-    right_panel,
-    text="Apply Watermark to All",
-    bootstyle="success",
-    command=apply_watermark
-)
-apply_btn.pack(pady=(10, 5), fill="x")
-
-# Progress bar (hidden initially)
-progress_var = tk.IntVar(value=0)
-progress_bar = tb.Progressbar(
-    right_panel,
-    variable=progress_var,
-    maximum=100,
-    mode="determinate"
-)
-progress_bar.pack(fill="x", pady=(0, 5))
-progress_bar.pack_forget()  # hide until needed
+    # Throughput of the running batch
+    throughput_var = tk.StringVar(value="")
+    throughput_label = tb.Label(right_panel, textvariable=throughput_var)
+    throughput_label.pack(anchor="w")
 
-# ================= DRAG & DROP =================
-if DND_AVAILABLE:
-    left_panel.drop_target_register(DND_FILES)
-    left_panel.dnd_bind("<<Drop>>", drop_files)
+    # ================= DRAG & DROP =================
+    if DND_AVAILABLE:
+        left_panel.drop_target_register(DND_FILES)
+        left_panel.dnd_bind("<<Drop>>", drop_files)
 
-update_gallery()
-app.mainloop()
+    update_gallery()
+    app.mainloop()
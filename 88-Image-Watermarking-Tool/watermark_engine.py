@@ -0,0 +1,128 @@
+"""
+Image side of the watermark tool: cached thumbnails, cached text layers and
+region-only compositing, plus a process-pool batch runner.
+
+- Thumbnails are keyed by (path, mtime), so re-drawing the gallery never
+  re-opens a file that has not changed. JPEGs are decoded with draft().
+- The text layer for a (text, font, size, alpha) is rasterized once, only as
+  large as the text, and composited over just the box it covers instead of a
+  full-size transparent layer.
+- apply_batch watermarks files in worker processes and yields results as
+  they finish; each worker keeps its own font/layer caches.
+"""
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+# ================= CONFIG =================
+FONT_NAME = "arial.ttf"
+MARGIN = 10
+THUMB_SIZE = (150, 150)
+THUMB_CACHE_SIZE = 2000  # Thumbnails kept in memory
+
+
+# ================= TEXT LAYER =================
+@lru_cache(maxsize=32)
+def load_font(size: int, font_name: str = FONT_NAME):
+    try:
+        return ImageFont.truetype(font_name, size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=64)
+def text_layer(text: str, size: int, alpha: int, font_name: str = FONT_NAME) -> Tuple[Image.Image, int, int]:
+    """
+    (layer, text_width, text_height) for the watermark. The layer spans (0, 0) to the
+    bottom-right of the text bbox, i.e. exactly what draw.text((0, 0)) would touch.
+    """
+    font = load_font(size, font_name)
+    bbox = ImageDraw.Draw(Image.new("RGBA", (1, 1))).textbbox((0, 0), text, font=font)
+    layer = Image.new("RGBA", (max(1, bbox[2]), max(1, bbox[3])), (255, 255, 255, 0))
+    ImageDraw.Draw(layer).text((0, 0), text, fill=(255, 255, 255, alpha), font=font)
+    return layer, bbox[2] - bbox[0], bbox[3] - bbox[1]
+
+
+def text_origin(position: str, size: Tuple[int, int], text_width: int, text_height: int) -> Tuple[int, int]:
+    width, height = size
+    if position == "Top-Left":
+        return MARGIN, MARGIN
+    if position == "Top-Right":
+        return width - text_width - MARGIN, MARGIN
+    if position == "Bottom-Left":
+        return MARGIN, height - text_height - MARGIN
+    if position == "Bottom-Right":
+        return width - text_width - MARGIN, height - text_height - MARGIN
+    return (width - text_width) // 2, (height - text_height) // 2
+
+
+def composite_text(img: Image.Image, text: str, size: int, alpha: int, position: str) -> Image.Image:
+    """Watermark img in place over the text's box only; img must be RGB or RGBA"""
+    layer, text_width, text_height = text_layer(text, size, alpha)
+    x, y = text_origin(position, img.size, text_width, text_height)
+    # Clip the layer to the image
+    left, top = max(0, x), max(0, y)
+    right, bottom = min(img.width, x + layer.width), min(img.height, y + layer.height)
+    if right <= left or bottom <= top:
+        return img
+    region = img.crop((left, top, right, bottom)).convert("RGBA")
+    region.alpha_composite(layer.crop((left - x, top - y, right - x, bottom - y)))
+    img.paste(region if img.mode == "RGBA" else region.convert(img.mode), (left, top))
+    return img
+
+
+# ================= THUMBNAILS =================
+class ThumbnailCache:
+    """RGBA thumbnails keyed by (path, mtime), least recently used dropped first"""
+
+    def __init__(self, size: Tuple[int, int] = THUMB_SIZE, max_items: int = THUMB_CACHE_SIZE):
+        self.size = size
+        self.max_items = max_items
+        self.items: "OrderedDict[Tuple[str, float], Image.Image]" = OrderedDict()
+
+    def get(self, path: str) -> Image.Image:
+        key = (path, os.path.getmtime(path))
+        thumb = self.items.get(key)
+        if thumb is None:
+            with Image.open(path) as img:
+                img.draft("RGB", self.size)
+                thumb = img.convert("RGBA")
+            thumb.thumbnail(self.size)
+            self.items[key] = thumb
+            while len(self.items) > self.max_items:
+                self.items.popitem(last=False)
+        else:
+            self.items.move_to_end(key)
+        return thumb
+
+
+# ================= BATCH =================
+def watermark_file(path: str, position: str, text: str, size: int, alpha: int, out_dir: str) -> Tuple[str, Optional[str]]:
+    """Watermark one file into out_dir; returns (path, error or None)"""
+    try:
+        with Image.open(path) as img:
+            has_alpha = img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+            base = img.convert("RGBA" if has_alpha else "RGB")
+        composite_text(base, text, size, alpha, position)
+        base.convert("RGB").save(os.path.join(out_dir, os.path.basename(path)))
+        return path, None
+    except Exception as e:
+        return path, str(e)
+
+
+def apply_batch(jobs: Iterable[Tuple[str, str]], text: str, size: int, alpha: int, out_dir: str,
+                workers: Optional[int] = None) -> Iterator[Tuple[str, Optional[str], float]]:
+    """Watermark (path, position) jobs in a process pool; yields (path, error, images/sec so far)"""
+    jobs = list(jobs)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        futures = [executor.submit(watermark_file, path, position, text, size, alpha, out_dir)
+                   for path, position in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            path, error = future.result()
+            yield path, error, done / max(1e-9, time.perf_counter() - start)
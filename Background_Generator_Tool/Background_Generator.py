@@ -2,65 +2,10 @@ import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from tkinter import filedialog, messagebox
 from tkinter import ttk  # For Combobox
-from PIL import Image, ImageDraw, ImageFilter, ImageTk
-import numpy as np
-import random
-import time 
+from PIL import ImageTk
+import time
 
-# =========================
-# UTILITY FUNCTIONS
-# =========================
-def add_noise(img, intensity=10):
-    """Add random noise to an image."""
-    arr = np.array(img)
-    noise = np.random.randint(-intensity, intensity + 1, arr.shape, "int16")
-    noisy = np.clip(arr + noise, 0, 255).astype("uint8")
-    return Image.fromarray(noisy)
-
-def generate_gradient(size):
-    """Generate a simple vertical gradient with optional noise."""
-    w, h = size
-    top_color = (
-        random.randint(50, 255),
-        random.randint(50, 255),
-        random.randint(50, 255)
-    )
-    bottom_color = (
-        random.randint(50, 255),
-        random.randint(50, 255),
-        random.randint(50, 255)
-    )
-    img = Image.new("RGB", size)
-    draw = ImageDraw.Draw(img)
-    for y in range(h):
-        r = int(top_color[0] + (bottom_color[0] - top_color[0]) * y / h)
-        g = int(top_color[1] + (bottom_color[1] - top_color[1]) * y / h)
-        b = int(top_color[2] + (bottom_color[2] - top_color[2]) * y / h)
-        draw.line((0, y, w, y), fill=(r, g, b))
-    return add_noise(img, intensity=5)
-
-def generate_texture(size):
-    """Generate a random texture overlay."""
-    img = Image.new("RGBA", size)
-    draw = ImageDraw.Draw(img)
-    for _ in range(size[0] * size[1] // 50):
-        x = random.randint(0, size[0] - 1)
-        y = random.randint(0, size[1] - 1)
-        color = (
-            random.randint(100, 255),
-            random.randint(100, 255),
-            random.randint(100, 255),
-            random.randint(20, 50)
-        )
-        draw.point((x, y), fill=color)
-    return img
-
-def generate_background(size):
-    """Combine gradient and texture to produce the final background."""
-    base = generate_gradient(size)
-    texture = generate_texture(size)
-    base.paste(texture, (0, 0), texture)
-    return base
+from background_engine import generate_background
 
 # =========================
 # MAIN APP CLASS
@@ -77,12 +22,15 @@ class BackgroundGenerator:
             "Full HD (1920x1080)": (1920, 1080),
             "2K (2560x1440)": (2560, 1440),
             "4K (3840x2160)": (3840, 2160),
-            "Ultra HD (6000x3375)": (6000, 3375)
+            "Ultra HD (6000x3375)": (6000, 3375),
+            "8K (7680x4320)": (7680, 4320)
         }
 
+        bg, recipe = generate_background((1920, 1080))
         self.state = {
             "size": (1920, 1080),
-            "bg": generate_background((1920, 1080))
+            "bg": bg,
+            "recipe": recipe
         }
 
         # LEFT PANEL
@@ -100,6 +48,13 @@ class BackgroundGenerator:
         self.res_var = tb.StringVar(value="Full HD (1920x1080)")
         tb.OptionMenu(left, self.res_var, *self.resolutions.keys(), bootstyle="secondary").pack(fill=X, pady=(0, 10))
 
+        # Seed: the same seed always gives the same background; leave empty for a random one
+        tb.Label(left, text="Seed (empty = random):", font=("Segoe UI", 10, "bold")).pack(anchor="w", pady=(5, 2))
+        self.seed_var = tb.StringVar(value="")
+        tb.Entry(left, textvariable=self.seed_var).pack(fill=X, pady=(0, 2))
+        self.seed_label = tb.Label(left, text=f"Current seed: {recipe['seed']}", font=("Segoe UI", 9))
+        self.seed_label.pack(anchor="w", pady=(0, 10))
+
         # Buttons
         tb.Button(left, text="🔄 Generate Background", bootstyle=INFO, command=self.generate_bg).pack(fill=X, pady=5)
         tb.Button(left, text="💾 Export", bootstyle=SUCCESS, command=self.save_bg).pack(fill=X, pady=5)
@@ -127,12 +82,17 @@ class BackgroundGenerator:
         orientation = self.orient_combo.get()
         if orientation == "Portrait":
             w, h = h, w
+        seed_text = self.seed_var.get().strip()
+        if seed_text and not seed_text.isdigit():
+            messagebox.showerror("Invalid Seed", "Seed must be a whole number.")
+            return
         self.state["size"] = (w, h)
-        self.state["bg"] = generate_background((w, h))
+        self.state["bg"], self.state["recipe"] = generate_background((w, h), int(seed_text) if seed_text else None)
+        self.seed_label.config(text=f"Current seed: {self.state['recipe']['seed']}")
         self.update_preview()
 
     def update_preview(self):
-        img = self.state["bg"].copy()
+        img = self.state["bg"]
         canvas_w = self.canvas.winfo_width()
         canvas_h = self.canvas.winfo_height()
         if canvas_w > 0 and canvas_h > 0:
@@ -140,7 +100,7 @@ class BackgroundGenerator:
             ratio = min(canvas_w / img_w, canvas_h / img_h)
             new_w = max(1, int(img_w * ratio))
             new_h = max(1, int(img_h * ratio))
-            preview = img.resize((new_w, new_h))
+            preview = img.resize((new_w, new_h), reducing_gap=2.0)
             self.tk_img = ImageTk.PhotoImage(preview)
             self.canvas.delete("all")
             self.canvas.create_image(canvas_w // 2, canvas_h // 2, image=self.tk_img)
@@ -152,7 +112,7 @@ class BackgroundGenerator:
         
         # Generate automatic filename
         timestamp = int(time.time())  # simple timestamp
-        filename = f"background_{w}x{h}_{orientation}_{timestamp}.png"
+        filename = f"background_{w}x{h}_{orientation}_{self.state['recipe']['seed']}_{timestamp}.png"
 
         # Ask user where to save, default filename pre-filled
         f = filedialog.asksaveasfilename(
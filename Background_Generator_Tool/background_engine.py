@@ -0,0 +1,186 @@
+"""
+Vectorized background renderer.
+
+A background is described by a small JSON-friendly recipe (seed, gradient
+stops, angle and noise settings) and rendered with NumPy instead of one
+Pillow call per row or per point:
+
+- gradient: the stops are interpolated once into a lookup table, and every
+  pixel takes its color from the table by its position along the angle;
+- smooth noise: a coarse random grid from the seeded generator, upscaled by
+  Pillow, shifts brightness over large areas (by choosing between
+  pre-brightened copies of the table, so it costs no extra pass);
+- grain: a NOISE_TILE x NOISE_TILE tile of per-pixel noise, repeated;
+- specks: the old texture overlay, drawn as one scatter of random points.
+
+The image is filled BAND_ROWS rows at a time through reused int16 buffers
+(one per render thread), so memory stays at the size of the output plus a
+few megabytes.
+The same recipe and size always give the same pixels.
+"""
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# =========================
+# CONFIG
+# =========================
+GRADIENT_LEVELS = 1024
+BAND_ROWS = 128
+NOISE_TILE = 512  # Multiple of BAND_ROWS
+NOISE_CELL = 160  # Pixels per smooth-noise grid cell at 1080p; scales with the image
+SPECK_DENSITY = 1 / 50  # Specks per pixel, as the old texture overlay
+RENDER_THREADS = 4
+
+Stop = Tuple[float, Tuple[int, int, int]]
+
+
+# =========================
+# RECIPES
+# =========================
+def random_recipe(seed: Optional[int] = None) -> dict:
+    """Everything needed to re-render a background, drawn from one seed"""
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % 2**32)
+    rng = np.random.default_rng(seed)
+    count = int(rng.integers(2, 5))
+    positions = np.sort(np.concatenate([[0.0, 1.0], rng.random(count - 2)]))
+    colors = rng.integers(50, 256, (count, 3))
+    return {
+        "seed": seed,
+        "stops": [(round(float(p), 4), tuple(int(c) for c in color)) for p, color in zip(positions, colors)],
+        "angle": 90.0 if rng.random() < 0.5 else round(float(rng.uniform(0, 360)), 1),  # 90 = top to bottom
+        "smooth": int(rng.integers(0, 17)),  # +- brightness of the smooth noise
+        "grain": 5,  # +- per-pixel noise, as the old add_noise(intensity=5)
+        "specks": True,
+    }
+
+
+def gradient_lut(stops: List[Stop], levels: int = GRADIENT_LEVELS) -> np.ndarray:
+    """(levels, 3) int16 colors for positions 0..1 along the gradient"""
+    positions = np.array([p for p, _ in stops], np.float64)
+    colors = np.array([c for _, c in stops], np.float64)
+    t = np.linspace(0, 1, levels)
+    return np.stack([np.interp(t, positions, colors[:, i]) for i in range(3)], axis=1).round().astype(np.int16)
+
+
+def gradient_axes(width: int, height: int, angle: float, levels: int = GRADIENT_LEVELS):
+    """Per-column and per-row LUT offsets; a pixel's level is x_part[x] + y_part[y]"""
+    rad = math.radians(angle)
+    dx, dy = math.cos(rad), math.sin(rad)
+    span = abs(dx) * (width - 1) + abs(dy) * (height - 1) or 1
+    scale = (levels - 1) / span
+    x_part = np.arange(width, dtype=np.float32) * (dx * scale)
+    y_part = np.arange(height, dtype=np.float32) * (dy * scale)
+    # Shift so the smallest level is 0
+    x_part -= x_part.min()
+    y_part -= y_part.min()
+    return x_part, y_part
+
+
+def smooth_noise(rng: np.random.Generator, width: int, height: int) -> Image.Image:
+    """Coarse random grid ("L"), one cell per NOISE_CELL pixels at 1080p, plus a border cell"""
+    cell = NOISE_CELL * max(width, height) / 1920
+    grid = rng.integers(0, 256, (int(height / cell) + 2, int(width / cell) + 2), dtype=np.uint8)
+    return Image.fromarray(grid)
+
+
+# =========================
+# RENDER
+# =========================
+class _BandRenderer:
+    """Fills bands of rows of one image; each worker thread gets its own buffers"""
+
+    def __init__(self, out: np.ndarray, recipe: dict, rng: np.random.Generator):
+        self.out = out
+        height, width = out.shape[:2]
+        self.width = width
+        self.x_part, self.y_part = gradient_axes(width, height, recipe["angle"])
+        # Smooth noise shifts brightness by -smooth..+smooth. Rather than adding it per channel,
+        # every shift gets its own copy of the gradient LUT and the shift selects the copy.
+        smooth = recipe["smooth"]
+        shifts = np.arange(-smooth, smooth + 1, dtype=np.int16)
+        lut = gradient_lut(recipe["stops"])
+        self.lut = np.clip(lut[None, :, :] + shifts[:, None, None], 0, 255).reshape(-1, 3)
+        self.noise = smooth_noise(rng, width, height) if smooth else None
+        if self.noise is not None:
+            self.cell_h = (self.noise.height - 2) / height
+            # Noise byte -> offset of its LUT copy
+            self.shift_offset = ((np.arange(256) * (2 * smooth + 1)) // 256 * GRADIENT_LEVELS).astype(np.intp)
+        grain = recipe["grain"]
+        self.tile = rng.integers(-grain, grain + 1, (NOISE_TILE, NOISE_TILE, 3), dtype=np.int16) if grain else None
+        self.local = threading.local()
+
+    def __call__(self, y0: int):
+        y1 = min(self.out.shape[0], y0 + BAND_ROWS)
+        rows, width = y1 - y0, self.width
+        if not hasattr(self.local, "band"):
+            self.local.band = np.empty((BAND_ROWS, width, 3), np.int16)
+            self.local.index = np.empty((BAND_ROWS, width), np.intp)
+        b, idx = self.local.band[:rows], self.local.index[:rows]
+
+        # Gradient level = x_part + y_part
+        np.add(self.y_part[y0:y1, None], self.x_part[None, :], out=idx, casting="unsafe")
+        np.clip(idx, 0, GRADIENT_LEVELS - 1, out=idx)
+
+        # Smooth noise: upscale only this band's strip of the grid, pick the LUT copy per pixel
+        if self.noise is not None:
+            strip = self.noise.resize((width, rows), Image.BICUBIC,
+                                      box=(0, y0 * self.cell_h, self.noise.width - 2, y1 * self.cell_h))
+            idx += np.take(self.shift_offset, np.asarray(strip))
+
+        np.take(self.lut, idx, axis=0, out=b)
+
+        # Grain: the same tile repeated across the band
+        if self.tile is not None:
+            tile_rows = self.tile[y0 % NOISE_TILE:y0 % NOISE_TILE + rows]
+            for x0 in range(0, width, NOISE_TILE):
+                block = b[:, x0:x0 + NOISE_TILE]
+                block += tile_rows[:, :block.shape[1]]
+
+        np.clip(b, 0, 255, out=self.out[y0:y1], casting="unsafe")
+
+
+def render(size: Tuple[int, int], recipe: dict, threads: Optional[int] = None) -> np.ndarray:
+    """
+    (height, width, 3) uint8 background for the recipe. Bands are rendered on
+    a few threads; NumPy and Pillow release the GIL for the heavy parts.
+    """
+    width, height = size
+    rng = np.random.default_rng(recipe["seed"])
+    out = np.empty((height, width, 3), np.uint8)
+    fill = _BandRenderer(out, recipe, rng)
+    threads = threads or min(RENDER_THREADS, os.cpu_count() or 1)
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(fill, range(0, height, BAND_ROWS)))
+    else:
+        for y0 in range(0, height, BAND_ROWS):
+            fill(y0)
+
+    if recipe["specks"]:
+        add_specks(out, rng)
+    return out
+
+
+def add_specks(img: np.ndarray, rng: np.random.Generator, density: float = SPECK_DENSITY):
+    """Light, mostly transparent points over the image (in place), all at once"""
+    height, width = img.shape[:2]
+    count = int(width * height * density)
+    pixels = img.reshape(-1, 3)
+    where = rng.integers(0, width * height, count)
+    colors = rng.integers(100, 256, (count, 3), dtype=np.uint8).astype(np.uint16)
+    alpha = rng.integers(20, 51, (count, 1), dtype=np.uint8).astype(np.uint16)
+    base = pixels[where].astype(np.uint16)
+    pixels[where] = ((base * (255 - alpha) + colors * alpha) // 255).astype(np.uint8)
+
+
+def generate_background(size: Tuple[int, int], seed: Optional[int] = None) -> Tuple[Image.Image, dict]:
+    """New background from a seed (random if None); returns (image, recipe)"""
+    recipe = random_recipe(seed)
+    return Image.fromarray(render(size, recipe)), recipe
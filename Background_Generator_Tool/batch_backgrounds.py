@@ -0,0 +1,66 @@
+"""
+Render many wallpapers at once across a process pool.
+
+    python batch_backgrounds.py 300 --size 3840x2160 --out wallpapers --seed 1000
+    python batch_backgrounds.py 50 --size 2160x3840 --format png --workers 4
+
+Image i uses seed <seed> + i, so any file can be re-rendered from its seed
+(recipes.jsonl in the output folder lists every recipe).
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Tuple
+
+from PIL import Image
+
+from background_engine import random_recipe, render
+
+SAVE_OPTIONS = {"jpg": {"quality": 90}, "png": {"compress_level": 1}, "webp": {"quality": 90}}
+
+
+def render_one(seed: int, size: Tuple[int, int], out_dir: str, fmt: str) -> Tuple[str, dict]:
+    recipe = random_recipe(seed)
+    # One thread per process: the pool already uses every core
+    img = Image.fromarray(render(size, recipe, threads=1))
+    path = os.path.join(out_dir, f"background_{size[0]}x{size[1]}_{seed}.{fmt}")
+    img.save(path, **SAVE_OPTIONS.get(fmt, {}))
+    return path, recipe
+
+
+def parse_size(text: str) -> Tuple[int, int]:
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch background generator")
+    parser.add_argument("count", type=int)
+    parser.add_argument("--size", type=parse_size, default=(1920, 1080), help="WIDTHxHEIGHT")
+    parser.add_argument("--out", default="backgrounds")
+    parser.add_argument("--seed", type=int, default=None, help="first seed (default: random)")
+    parser.add_argument("--format", choices=sorted(SAVE_OPTIONS), default="jpg")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    first = args.seed if args.seed is not None else random_recipe()["seed"]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor, \
+            open(os.path.join(args.out, "recipes.jsonl"), "a", encoding="utf-8") as log:
+        futures = [executor.submit(render_one, first + i, args.size, args.out, args.format)
+                   for i in range(args.count)]
+        for done, future in enumerate(as_completed(futures), 1):
+            path, recipe = future.result()
+            log.write(json.dumps({"file": os.path.basename(path), **recipe}) + "\n")
+            elapsed = time.perf_counter() - start
+            print(f"[{done}/{args.count}] {path}  ({done / elapsed:.1f} images/s)")
+
+    elapsed = time.perf_counter() - start
+    print(f"Rendered {args.count} backgrounds in {elapsed:.1f}s ({args.count / elapsed:.2f} images/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ Upload employee datasets, predict attrition, export results
 """
 
 import os, sys, threading
+import numpy as np
 import pandas as pd
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
@@ -12,6 +13,8 @@ from tkinter import filedialog, messagebox, ttk
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 
+from batch_inference import BatchWorker
+
 try:
     from tkinterdnd2 import TkinterDnD, DND_FILES
     DND_ENABLED = True
@@ -25,28 +28,22 @@ def resource_path(file_name):
     return os.path.join(base_path, file_name)
 
 # ---------------------- WORKER ----------------------
-class AttritionWorker:
-    def __init__(self, dataframe, callbacks):
-        self.df = dataframe
-        self.callbacks = callbacks
-        self._running = True
-
-    def stop(self):
-        self._running = False
-
-    def run(self):
-        results = []
-        for idx, row in self.df.iterrows():
-            if not self._running:
-                break
-            # Placeholder prediction logic
-            attrition_prob = min(1.0, max(0.0, 0.1 + 0.2 * row.get("Age", 30)/50))
-            prediction = "Yes" if attrition_prob > 0.5 else "No"
-            results.append((row.get("EmployeeID", idx), row.get("Name", "N/A"), prediction))
-            if "update" in self.callbacks:
-                self.callbacks["update"](idx, results[-1])
-        if "finished" in self.callbacks:
-            self.callbacks["finished"](results)
+class AttritionWorker(BatchWorker):
+    """Streams the employee CSV in chunks and predicts each chunk in one vectorized step"""
+
+    def __init__(self, file_path, callbacks):
+        super().__init__([file_path], self.predict_chunk, callbacks)
+
+    @staticmethod
+    def predict_chunk(chunk):
+        # Placeholder prediction logic
+        age = chunk["Age"] if "Age" in chunk else pd.Series(30, index=chunk.index)
+        attrition_prob = np.clip(0.1 + 0.2 * age.to_numpy(dtype=float) / 50, 0.0, 1.0)
+        return pd.DataFrame({
+            "EmployeeID": chunk["EmployeeID"] if "EmployeeID" in chunk else chunk.index.to_series(),
+            "Name": chunk["Name"] if "Name" in chunk else "N/A",
+            "Attrition": np.where(attrition_prob > 0.5, "Yes", "No"),
+        }, index=chunk.index)
 
 # ---------------------- MAIN APP ----------------------
 class AttritionPredictorApp:
@@ -152,16 +149,21 @@ class AttritionPredictorApp:
         self.target_progress = 0
         self.tree.delete(*self.tree.get_children())
 
-        df = pd.read_csv(self.file_path)
-        self.worker_obj = AttritionWorker(df, callbacks={
-            "update": self.add_row,
-            "finished": self.finish
+        self.worker_obj = AttritionWorker(self.file_path, callbacks={
+            "batch": lambda path, results: self.root.after(0, self.add_rows, results),
+            "progress": self.set_target,
+            "error": lambda path, e: self.root.after(0, messagebox.showerror, "Error", e),
+            "finished": lambda: self.root.after(0, self.finish)
         })
         threading.Thread(target=self.worker_obj.run, daemon=True).start()
 
-    def add_row(self, idx, data):
-        self.tree.insert("", END, values=("☑️", data[0], data[1], data[2]))
-        self.target_progress = int((idx+1)/len(self.worker_obj.df)*100)
+    def add_rows(self, results):
+        """One UI update per predicted chunk"""
+        for emp_id, name, prediction in zip(results["EmployeeID"], results["Name"], results["Attrition"]):
+            self.tree.insert("", END, values=("☑️", emp_id, name, prediction))
+
+    def set_target(self, v):
+        self.target_progress = v
 
     def animate_progress(self):
         if self.progress_value < self.target_progress:
@@ -0,0 +1,77 @@
+"""
+Chunked batch inference for the CSV predictors.
+
+BatchWorker streams every file with pd.read_csv(chunksize=...), runs one
+vectorized predict per chunk and hands whole result chunks to the UI, so
+neither the model nor Tk ever sees a single row at a time. Progress comes
+from the byte offset of the open file, which works without counting rows
+first.
+
+callbacks (all optional, called from the worker thread):
+    "batch"(path, DataFrame)   predicted chunk
+    "progress"(percent)
+    "error"(path, message)
+    "finished"()
+"""
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+# ---------------------- CONFIG ----------------------
+CHUNK_SIZE = 100_000
+
+
+class BatchWorker:
+    def __init__(self, files: Iterable[str], predict: Callable[[pd.DataFrame], pd.DataFrame],
+                 callbacks: Dict[str, Callable], chunk_size: int = CHUNK_SIZE,
+                 usecols: Optional[Callable[[str], bool]] = None):
+        self.files: List[str] = list(files)
+        self.predict = predict
+        self.callbacks = callbacks
+        self.chunk_size = chunk_size
+        self.usecols = usecols
+        self.rows = 0
+        self.elapsed = 0.0
+        self._running = True
+
+    def stop(self):
+        self._running = False
+
+    def _emit(self, name, *args):
+        if name in self.callbacks:
+            self.callbacks[name](*args)
+
+    def run(self):
+        start = time.perf_counter()
+        total_files = len(self.files)
+        for i, path in enumerate(self.files):
+            if not self._running:
+                break
+            try:
+                size = max(1, os.path.getsize(path))
+                with open(path, "rb") as f:
+                    for chunk in pd.read_csv(f, chunksize=self.chunk_size, usecols=self.usecols):
+                        if not self._running:
+                            break
+                        result = self.predict(chunk)
+                        self.rows += len(result)
+                        self._emit("batch", path, result)
+                        done = (i + min(1.0, f.tell() / size)) / total_files
+                        self._emit("progress", int(done * 100))
+            except Exception as e:
+                self._emit("error", path, str(e))
+            self._emit("progress", int((i + 1) / total_files * 100))
+        self.elapsed = time.perf_counter() - start
+        self._emit("finished")
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def numeric_features(chunk: pd.DataFrame, features: List[str], default: float = 0.0) -> pd.DataFrame:
+    """Feature columns as floats; missing columns get default, unparseable cells NaN"""
+    X = chunk.reindex(columns=features, fill_value=default)
+    return X.apply(pd.to_numeric, errors="coerce")
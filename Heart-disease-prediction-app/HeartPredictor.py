@@ -15,12 +15,17 @@ from sklearn.model_selection import train_test_split
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 
+from batch_inference import BatchWorker, numeric_features
+
 # ---------------------- UTIL ----------------------
 def resource_path(file_name):
     base_path = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
     return os.path.join(base_path, file_name)
 
 # ---------------------- ML MODEL ----------------------
+RISK_LEVELS = np.array(["Low", "Medium", "High"], dtype=object)
+RISK_THRESHOLDS = [0.33, 0.66]
+
 class HeartDiseaseModel:
     def __init__(self):
         self.model = LogisticRegression(max_iter=1000)
@@ -40,61 +45,38 @@ class HeartDiseaseModel:
         X_scaled = self.scaler.fit_transform(X)
         self.model.fit(X_scaled, y)
 
+    def predict_risk_batch(self, patients):
+        """
+        patients: DataFrame with (some of) the feature columns, missing ones count as 0
+        Returns: array of "Low", "Medium", "High"; rows with unreadable values are "Low"
+        """
+        X = numeric_features(patients, self.features)
+        valid = X.notna().all(axis=1).to_numpy()
+        risk = np.full(len(X), "Low", dtype=object)
+        if valid.any():
+            x_scaled = self.scaler.transform(X.to_numpy()[valid])
+            prob = self.model.predict_proba(x_scaled)[:, 1]  # probability of heart disease
+            risk[valid] = RISK_LEVELS[np.digitize(prob, RISK_THRESHOLDS)]
+        return risk
+
     def predict_risk(self, patient_data):
         """
         patient_data: dict of feature_name -> value
         Returns: "Low", "Medium", "High"
         """
-        try:
-            x = np.array([float(patient_data.get(f,0)) for f in self.features]).reshape(1,-1)
-            x_scaled = self.scaler.transform(x)
-            prob = self.model.predict_proba(x_scaled)[0][1]  # probability of heart disease
-            if prob < 0.33:
-                return "Low"
-            elif prob < 0.66:
-                return "Medium"
-            else:
-                return "High"
-        except Exception:
-            return "Low"
+        return self.predict_risk_batch(pd.DataFrame([patient_data]))[0]
 
 # ---------------------- WORKER ----------------------
-class PredictionWorker:
+class PredictionWorker(BatchWorker):
+    """Streams patient CSVs in chunks with one predict_proba call per chunk"""
+
     def __init__(self, files, model, callbacks):
-        self.files = files
         self.model = model
-        self._running = True
-        self.callbacks = callbacks
+        super().__init__(files, self.predict_chunk, callbacks)
 
-    def stop(self):
-        self._running = False
-
-    def run(self):
-        total_files = len(self.files)
-        results = []
-
-        for i, path in enumerate(self.files):
-            if not self._running:
-                break
-            try:
-                df = pd.read_csv(path)
-                for _, row in df.iterrows():
-                    if not self._running:
-                        break
-                    patient_data = row.to_dict()
-                    name = patient_data.get("name","Unknown")
-                    risk = self.model.predict_risk(patient_data)
-                    results.append((path, name, risk))
-                    if "found" in self.callbacks:
-                        self.callbacks["found"](path, name, risk)
-            except Exception as e:
-                print(f"Failed to process {path}: {e}")
-
-            if total_files > 0 and "progress" in self.callbacks:
-                self.callbacks["progress"](int((i + 1) / total_files * 100))
-
-        if "finished" in self.callbacks:
-            self.callbacks["finished"]()
+    def predict_chunk(self, chunk):
+        names = chunk["name"].fillna("Unknown") if "name" in chunk else pd.Series("Unknown", index=chunk.index)
+        return pd.DataFrame({"name": names, "risk": self.model.predict_risk_batch(chunk)})
 
 # ---------------------- MAIN APP ----------------------
 class HeartPredictorApp:
@@ -197,13 +179,20 @@ class HeartPredictorApp:
             files,
             model=self.model,
             callbacks={
-                "found": self.add_result,
+                "batch": lambda path, results: self.root.after(0, self.add_results, path, results),
                 "progress": self.set_target,
-                "finished": self.finish
+                "error": lambda path, e: print(f"Failed to process {path}: {e}"),
+                "finished": lambda: self.root.after(0, self.finish)
             }
         )
         self.worker_obj.run()
 
+    def add_results(self, file, results):
+        """One UI update per predicted chunk; the file row shows its latest patient"""
+        if len(results):
+            last = results.iloc[-1]
+            self.add_result(file, last["name"], last["risk"])
+
     def add_result(self, file, patient, risk):
         for i in self.tree.get_children():
             if self.tree.item(i)['values'][1] == file:
@@ -0,0 +1,70 @@
+"""
+Rows/sec of patient CSV scoring: the old per-row path (iterrows + one
+scaler.transform/predict_proba per patient) against chunked BatchWorker.
+
+    python benchmark_batch_inference.py [--rows 10000000] [--legacy-rows 20000]
+
+The synthetic CSV is written to the temp directory once and reused. The
+per-row path is only timed on the first --legacy-rows rows; its rate is what
+it would sustain on the full file.
+"""
+import os
+import time
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from batch_inference import CHUNK_SIZE
+from HeartPredictor import HeartDiseaseModel, PredictionWorker
+
+
+def make_csv(path, rows, features, block=1_000_000):
+    rng = np.random.default_rng(0)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for start in range(0, rows, block):
+            n = min(block, rows - start)
+            df = pd.DataFrame(rng.integers(0, 100, size=(n, len(features))), columns=features)
+            df.insert(0, "name", [f"Patient_{i}" for i in range(start + 1, start + n + 1)])
+            df.to_csv(f, index=False, header=start == 0)
+
+
+def legacy_rate(path, model, rows):
+    df = pd.read_csv(path, nrows=rows)
+    start = time.perf_counter()
+    for _, row in df.iterrows():
+        patient_data = row.to_dict()
+        x = np.array([float(patient_data.get(f, 0)) for f in model.features]).reshape(1, -1)
+        model.model.predict_proba(model.scaler.transform(x))
+    return len(df) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch inference throughput on a large patient CSV")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--legacy-rows", type=int, default=20_000)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    model = HeartDiseaseModel()
+    path = os.path.join(tempfile.gettempdir(), f"heart_bench_{args.rows}.csv")
+    if not os.path.exists(path):
+        print(f"Writing {args.rows:,} rows to {path} ...")
+        make_csv(path, args.rows, model.features)
+    print(f"File: {os.path.getsize(path) / 1e6:,.0f} MB")
+
+    rate = legacy_rate(path, model, min(args.legacy_rows, args.rows))
+    print(f"  per-row iterrows: {rate:12,.0f} rows/s  (~{args.rows / rate / 60:,.1f} min for the file)")
+
+    batches = []
+    worker = PredictionWorker([path], model, {"batch": lambda p, r: batches.append(len(r)),
+                                              "error": lambda p, e: print(f"Failed: {e}")})
+    worker.chunk_size = args.chunk_size
+    worker.run()
+    print(f"  chunked batch:    {worker.rows_per_second:12,.0f} rows/s  "
+          f"({worker.rows:,} rows in {worker.elapsed:.1f} s, {len(batches)} UI callbacks)")
+
+
+if __name__ == "__main__":
+    main()
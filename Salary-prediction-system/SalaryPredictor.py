@@ -12,6 +12,8 @@ from tkinter import filedialog, messagebox, ttk
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 
+from batch_inference import BatchWorker
+
 try:
     from tkinterdnd2 import TkinterDnD, DND_FILES
     DND_ENABLED = True
@@ -25,44 +27,21 @@ def resource_path(file_name):
     return os.path.join(base_path, file_name)
 
 # ---------------------- SALARY PREDICTION WORKER ----------------------
-class SalaryPredictWorker:
+class SalaryPredictWorker(BatchWorker):
+    """Streams employee CSVs in chunks with one model.predict call per chunk"""
+    FEATURE_COLS = ["Age", "Experience", "EducationLevel"]  # Only these are used by the model
+
     def __init__(self, files, model_path, callbacks):
-        self.files = files
         self.model = joblib.load(model_path)
-        self.callbacks = callbacks
-        self._running = True
+        super().__init__(files, self.predict_chunk, callbacks,
+                         usecols=lambda c: c in self.FEATURE_COLS or c == "Name")
 
-    def stop(self):
-        self._running = False
-
-    def run(self):
-        total_files = len(self.files)
-        feature_cols = ["Age", "Experience", "EducationLevel"]  # Only these are used by the model
-        for i, path in enumerate(self.files):
-            if not self._running:
-                break
-            try:
-                df = pd.read_csv(path)
-                # Select only the model features
-                X = df[feature_cols]
-                df['PredictedSalary'] = self.model.predict(X)
-
-                for idx, row in df.iterrows():
-                    if not self._running:
-                        break
-                    row_data = row.to_dict()
-                    row_data['_row_id'] = idx
-                    if "found" in self.callbacks:
-                        self.callbacks["found"](path, row_data)
-
-            except Exception as e:
-                print(f"Error processing {path}: {e}")
-
-            if "progress" in self.callbacks:
-                self.callbacks["progress"](int((i + 1) / total_files * 100))
-
-        if "finished" in self.callbacks:
-            self.callbacks["finished"]()
+    def predict_chunk(self, chunk):
+        # Select only the model features
+        X = chunk[self.FEATURE_COLS]
+        names = chunk["Name"].fillna("") if "Name" in chunk else pd.Series("", index=chunk.index)
+        # The index keeps counting across chunks, so it stays a unique row id per file
+        return pd.DataFrame({"Name": names.astype(str), "PredictedSalary": self.model.predict(X)})
 
 # ---------------------- MAIN APP ----------------------
 class SalaryPredictApp:
@@ -239,35 +218,42 @@ class SalaryPredictApp:
             files,
             self.model_path.get(),
             callbacks={
-                "found": self.add_result,
+                "batch": lambda path, results: self.root.after(0, self.add_results, path, results),
                 "progress": self.set_target,
-                "finished": self.finish
+                "error": lambda path, e: print(f"Error processing {path}: {e}"),
+                "finished": lambda: self.root.after(0, self.finish)
             }
         )
         self.worker_obj.run()
 
-    def add_result(self, file, row_data):
-        row_key = f"{file}_{row_data.get('_row_id',0)}"
-        self.all_rows[row_key] = {
-            "selected": "☑️",
-            "filename": file,
-            "employee_name": row_data.get('Name',''),
-            "predicted_salary": row_data['PredictedSalary']
-        }
-        self.apply_filters()
+    def add_results(self, file, results):
+        """Store a predicted chunk and show the rows that pass the current filters"""
+        new_rows = {}
+        for idx, name, salary in zip(results.index, results["Name"], results["PredictedSalary"]):
+            new_rows[f"{file}_{idx}"] = {
+                "selected": "☑️",
+                "filename": file,
+                "employee_name": name,
+                "predicted_salary": float(salary)
+            }
+        self.all_rows.update(new_rows)
+        self._insert_filtered(new_rows)
 
-    def apply_filters(self):
+    def _insert_filtered(self, rows):
         min_salary = self.filter_min.get()
         max_salary = self.filter_max.get()
         search_text = self.search_var.get().lower()
-        self.tree.delete(*self.tree.get_children())
-        for key, row in self.all_rows.items():
+        for key, row in rows.items():
             if min_salary <= row['predicted_salary'] <= max_salary:
                 if search_text in row['employee_name'].lower():
                     self.tree.insert("", END, iid=key,
                                      values=(row['selected'], row['filename'], row['employee_name'], f"${row['predicted_salary']:,.2f}"))
         self.stats_label.config(text=f"EMPLOYEES DISPLAYED: {len(self.tree.get_children())}")
 
+    def apply_filters(self):
+        self.tree.delete(*self.tree.get_children())
+        self._insert_filtered(self.all_rows)
+
     def set_target(self, v):
         self.target_progress = v
 